@@ -1,7 +1,23 @@
 import os
 import re
 import json
-from ticket import Ticket
+import sys
+import argparse
+from ticket import Ticket, PRIORITIES, SECTIONS, DEFAULT_ISSUE_TYPE
+from retry import RetryPolicy
+from cache import ResponseCache
+from tokens import TokenMeter
+from journal import Journal
+from model import TicketDocument
+from renderers import render
+from export import ExportSink
+from duplicates import DuplicateIndex, DUPLICATE_POLICIES
+from jira_client import get_jira_client_manager
+from preflight import JiraMetadata
+from fewshot import ExampleIndex
+from ratelimit import scheduler
+from backends import BACKENDS
+from metrics import metrics
 
 
 def get_bard_api_key() -> str:
@@ -60,14 +76,549 @@ def get_jira_credentials() -> dict:
         raise RuntimeError("Failed to read jira credentials")
 
 
+def print_section(section: str, text: str) -> None:
+    """
+    Prints a section of the ticket as soon as it is generated.
+
+    Parameters
+    ----------
+    section : str
+        Name of the section.
+    text : str
+        Text of the section.
+
+    Returns
+    -------
+    None
+    """
+    print(f"\n{section.replace('_', ' ').title()}:\n{text}", flush=True)
+
+
+def print_item(section: str, title: str, descriptions: list) -> None:
+    """
+    Prints a list item of a section while the response is streamed.
+
+    Parameters
+    ----------
+    section : str
+        Name of the section.
+    title : str
+        Title of the item.
+    descriptions : list
+        Descriptions (subpoints) of the item.
+
+    Returns
+    -------
+    None
+    """
+    print(f"  [{section.replace('_', ' ')}] {title}: {' '.join(descriptions)}", flush=True)
+
+
+def read_title(title: str) -> str:
+    """
+    Returns the title given on the command line, read from stdin if it is "-", after checking its validity.
+
+    Parameters
+    ----------
+    title : str
+        Title provided with --title.
+
+    Returns
+    -------
+    title: str
+        The capitalized title. A ValueError is raised if the title is not valid.
+    """
+    if title == "-":
+        title = sys.stdin.readline()
+
+    title = title.strip()
+    error_message = Ticket.validate_title(title) if title else "The title is empty."
+    if error_message:
+        raise ValueError(error_message)
+
+    return title.title()
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parses the command line arguments of the program.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    args: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(description="Generate Jira tickets from titles.")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="CSV or JSONL file with 'title' and 'priority' columns. Runs without prompting the user.",
+    )
+    parser.add_argument(
+        "--title",
+        help="Title of the ticket ('-' reads it from stdin). Runs without prompting the user.",
+    )
+    parser.add_argument(
+        "--priority",
+        choices=PRIORITIES,
+        default="Medium",
+        help="Priority of the ticket given with --title.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the ticket given with --title instead of uploading it to Jira.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["jira", "markdown", "adf"],
+        default="jira",
+        help="Format of the ticket printed with --dry-run (Jira wiki markup, Markdown or ADF JSON).",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="FILE",
+        help="Append the structured tickets (--title or --batch) to FILE (JSONL), e.g. to render them again later "
+        "in another format.",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="FILE",
+        help="Write the tickets (--title or --batch) to a Jira bulk-import file (.csv or .json) "
+        "instead of uploading them. Jira is not contacted.",
+    )
+    parser.add_argument(
+        "--export-project",
+        metavar="KEY",
+        help="Key of the Jira project the exported issues are imported into (required for a .json export).",
+    )
+    parser.add_argument(
+        "--update",
+        metavar="ISSUE_KEY",
+        help="Regenerate sections of an existing issue (see --regenerate) and update it in place.",
+    )
+    parser.add_argument(
+        "--regenerate",
+        nargs="+",
+        choices=SECTIONS,
+        default=["subtasks"],
+        help="Sections regenerated with --update. The other sections are kept and used as context.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="With --update, also replace a description that was not generated by this program.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a service accepting tickets over HTTP instead of prompting the user.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address of the service.")
+    parser.add_argument("--port", type=int, default=8080, help="Port of the service.")
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=100,
+        help="Maximum number of tickets waiting in the queue of the service.",
+    )
+    parser.add_argument(
+        "--wait-timeout",
+        type=float,
+        default=60.0,
+        help="Maximum number of seconds the service holds a request that waits for its ticket.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of tickets generated concurrently in batch and service mode.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50,
+        help="Number of issues per Jira bulk-create request in batch mode.",
+    )
+
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=5,
+        help="Maximum number of Bard requests per section before giving up.",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=300.0,
+        help="Maximum number of seconds spent generating a single section.",
+    )
+    parser.add_argument(
+        "--hedge",
+        type=int,
+        default=1,
+        help="Number of concurrent Bard requests per attempt. The first valid response is used.",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=os.getenv("TICKET_CACHE_DIR"),
+        help="Directory of the persistent cache of Bard responses. No cache is used if not set.",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=30 * 24 * 3600,
+        help="Number of seconds a cached Bard response stays valid.",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=10000,
+        help="Maximum number of cached Bard responses (least recently used are evicted).",
+    )
+
+    parser.add_argument(
+        "--backend",
+        default=os.getenv("TICKET_LLM_BACKEND", "bard"),
+        help="LLM backend generating the tickets: 'bard', 'template' (deterministic, offline) or 'command:<command>' "
+        "(a local model reading the prompt on stdin and writing the response to stdout).",
+    )
+    parser.add_argument(
+        "--single-call",
+        action="store_true",
+        help="Request all sections of a ticket from Bard at once. Sections that cannot be parsed are requested separately.",
+    )
+
+    parser.add_argument(
+        "--llm-rate",
+        type=float,
+        help="Maximum number of Bard requests per second. Not limited if not set.",
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of concurrent Bard requests. The limit adapts to throttling and latency below it.",
+    )
+    parser.add_argument(
+        "--jira-rate",
+        type=float,
+        help="Maximum number of Jira requests per second. Not limited if not set.",
+    )
+    parser.add_argument(
+        "--jira-concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of concurrent Jira requests. The limit adapts to throttling and latency below it.",
+    )
+
+    parser.add_argument(
+        "--journal",
+        metavar="FILE",
+        help="Journal of the completed stages of every ticket. A rerun with the same journal resumes "
+        "where the previous run stopped and never creates an issue twice.",
+    )
+    parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        help="Check every title against the summaries of the existing issues of the project before it is generated, "
+        "and warn, skip it, or link the new issue to the most similar issue.",
+    )
+    parser.add_argument(
+        "--duplicate-index",
+        metavar="FILE",
+        default="duplicate_index.json",
+        help="File of the local index of existing issue summaries, refreshed incrementally from Jira on every run.",
+    )
+    parser.add_argument(
+        "--duplicate-threshold",
+        type=float,
+        default=0.75,
+        help="Minimum similarity (0 to 1) of a title and an issue summary to treat them as duplicates.",
+    )
+    parser.add_argument(
+        "--issue-type-model",
+        metavar="FILE",
+        help="Model trained with classifier.py that predicts the issue type (e.g. Bug, Task, Story) of every title. "
+        "Without it, issues are created as Tasks.",
+    )
+    parser.add_argument(
+        "--metadata-cache",
+        metavar="FILE",
+        default="jira_metadata.json",
+        help="File caching the project, issue types and priorities of Jira, used to validate every ticket before "
+        "it is generated.",
+    )
+    parser.add_argument(
+        "--metadata-ttl",
+        type=float,
+        default=24 * 3600,
+        help="Number of seconds the cached Jira metadata stays valid.",
+    )
+    parser.add_argument(
+        "--no-preflight",
+        action="store_true",
+        help="Do not validate the project, priority and issue type of the tickets before they are generated.",
+    )
+    parser.add_argument(
+        "--examples",
+        metavar="FILE",
+        help="JSONL file of accepted tickets (e.g. written by --archive). The tickets most similar to every title are "
+        "the examples of its prompts, and every generated ticket is appended to the file.",
+    )
+    parser.add_argument(
+        "--examples-count",
+        type=int,
+        default=2,
+        help="Maximum number of similar tickets used as examples in a prompt.",
+    )
+    parser.add_argument(
+        "--reuse-threshold",
+        type=float,
+        help="Reuse the sections of an accepted ticket as they are, without any LLM call, if the similarity (0 to 1) "
+        "of its title reaches this threshold. Sections are never reused if not set.",
+    )
+    parser.add_argument(
+        "--create-subtasks",
+        nargs="?",
+        const="Sub-task",
+        metavar="ISSUE_TYPE",
+        help="Also create every item of the Sub-tasks section as a Jira sub-task of the new issue "
+        "(issue type 'Sub-task' unless given). All sub-tasks are created with one bulk request.",
+    )
+
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Embed earlier sections in the chained prompts in a condensed form of at most TOKENS (estimated) tokens.",
+    )
+    parser.add_argument(
+        "--max-run-tokens",
+        type=int,
+        metavar="TOKENS",
+        help="Stop generating new sections once the LLM calls of the run have used TOKENS (estimated) tokens.",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print every section (and streamed list items) as soon as it is generated.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        metavar="FILE",
+        help="Write a JSON summary of the timings and counters of the run to FILE.",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="FILE",
+        help="Write the timings and counters of the run to FILE in the Prometheus textfile format.",
+    )
+
+    args = parser.parse_args()
+    if args.dry_run and args.title is None:
+        parser.error("--dry-run requires --title")
+    if args.title is not None and args.batch:
+        parser.error("--title cannot be combined with --batch (the titles are read from the batch file)")
+    if args.title is not None and (args.update or args.serve):
+        parser.error("--title cannot be combined with --update or --serve")
+    if args.export and (args.serve or args.update or args.dry_run):
+        parser.error("--export cannot be combined with --serve, --update or --dry-run")
+    if args.archive and (args.serve or args.update):
+        parser.error("--archive cannot be combined with --serve or --update")
+    if args.create_subtasks and args.dry_run:
+        parser.error("--create-subtasks cannot be combined with --dry-run (no issue is created)")
+    if args.reuse_threshold is not None and not args.examples:
+        parser.error("--reuse-threshold requires --examples")
+    if args.export and args.export.lower().endswith(".json") and not args.export_project:
+        parser.error("a .json export requires --export-project")
+    if args.backend.partition(":")[0] not in BACKENDS:
+        parser.error(f"unknown --backend '{args.backend}' (choose from {', '.join(BACKENDS)})")
+
+    return args
+
+
 if __name__ == "__main__":
-    # get Bard and Jira credentials
-    jira_credentials = get_jira_credentials()
-    bard_api_key = get_bard_api_key()
-
-    # generate ticket
-    ticket = Ticket(bard_api_key)
-    ticket.get_ticket_title()
-    ticket.get_ticket_prority()
-    ticket.create_ticket_body_text()
-    ticket.upload_ticket_to_jira(jira_credentials)
+    args = parse_arguments()
+    if args.metrics_json or args.metrics_prom:
+        metrics.enable()
+
+    if args.title is not None:
+        # check the title before anything is loaded or requested
+        try:
+            title = read_title(args.title)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+
+    # get Bard and Jira credentials (Jira is not needed for a dry run or an export, Bard only for its backend)
+    jira_credentials = None if args.dry_run or args.export else get_jira_credentials()
+    bard_api_key = get_bard_api_key() if args.backend == "bard" else None
+
+    scheduler.llm.configure(rate=args.llm_rate, max_concurrency=args.llm_concurrency)
+    scheduler.jira.configure(rate=args.jira_rate, max_concurrency=args.jira_concurrency)
+
+    retry_policy = RetryPolicy(
+        max_attempts=args.max_attempts, deadline=args.deadline, hedge=args.hedge
+    )
+    response_cache = None
+    if args.cache_dir:
+        response_cache = ResponseCache(
+            args.cache_dir, ttl=args.cache_ttl, max_entries=args.cache_max_entries
+        )
+
+    token_meter = TokenMeter(limit=args.max_run_tokens)
+
+    ticket_options = {
+        "retry_policy": retry_policy,
+        "response_cache": response_cache,
+        "single_call": args.single_call,
+        "context_budget": args.context_budget,
+        "token_meter": token_meter,
+        "journal": Journal(args.journal) if args.journal else None,
+        "subtask_issue_type": args.create_subtasks,
+        "backend": args.backend,
+    }
+
+    if args.issue_type_model:
+        # imported here, so runs without a model do not load NumPy
+        from classifier import IssueTypeClassifier
+
+        ticket_options["issue_type_classifier"] = IssueTypeClassifier.load(args.issue_type_model)
+
+    if jira_credentials is not None and not args.no_preflight:
+        # check the project once and every ticket before any LLM call is spent on it
+        jira_metadata = JiraMetadata(
+            get_jira_client_manager(jira_credentials), path=args.metadata_cache, ttl=args.metadata_ttl
+        )
+        try:
+            jira_metadata.load()
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        ticket_options["jira_metadata"] = jira_metadata
+
+    duplicate_index = None
+    if args.duplicates:
+        duplicate_index = DuplicateIndex(args.duplicate_index, threshold=args.duplicate_threshold)
+        if jira_credentials is not None:
+            # only the issues updated since the last run are fetched
+            fetched = duplicate_index.refresh(get_jira_client_manager(jira_credentials))
+            print(f"Duplicate index: {fetched} issues fetched, {len(duplicate_index)} issues indexed.")
+        ticket_options["duplicate_index"] = duplicate_index
+        ticket_options["duplicate_policy"] = args.duplicates
+
+    if args.examples:
+        ticket_options["example_index"] = ExampleIndex(
+            args.examples, examples=args.examples_count, reuse_threshold=args.reuse_threshold
+        )
+
+    export_sink = None
+    if args.export:
+        export_sink = ExportSink(args.export, project_key=args.export_project)
+
+    exit_code = 0
+    if args.serve:
+        # accept tickets over HTTP until the process is stopped
+        from service import TicketService, run_service
+
+        service = TicketService(
+            bard_api_key,
+            jira_credentials,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            ticket_options=ticket_options,
+            wait_timeout=args.wait_timeout,
+        )
+        run_service(service, host=args.host, port=args.port)
+    elif args.update:
+        # regenerate the selected sections of an existing issue and update it if its body changed
+        ticket = Ticket(bard_api_key, **ticket_options)
+        try:
+            ticket.load_from_jira(jira_credentials, args.update)
+        except Exception as e:
+            print(f"Failed to load Jira issue '{args.update}'. Error: {str(e)}")
+            sys.exit(1)
+        try:
+            ticket.regenerate_sections(args.regenerate, force=args.force)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+        # an unchanged body is not updated, which is not a failure
+        if not ticket.update_issue_in_jira() and ticket.ticket_body.split() != ticket.loaded_body.split():
+            exit_code = 1
+    elif args.batch:
+        # generate and upload (or export) all tickets of the batch file
+        from batch import run_batch
+
+        run_batch(
+            args.batch,
+            bard_api_key,
+            jira_credentials,
+            max_workers=args.workers,
+            chunk_size=args.chunk_size,
+            ticket_options=ticket_options,
+            export_sink=export_sink,
+            archive_path=args.archive,
+        )
+    else:
+        # generate ticket
+        if args.stream:
+            ticket_options["on_section"] = print_section
+            ticket_options["on_item"] = print_item
+        ticket = Ticket(bard_api_key, **ticket_options)
+        if args.title is not None:
+            # non-interactive: title and priority come from the command line
+            ticket.title = title
+            ticket.priority = args.priority
+            generate = ticket.check_duplicate()
+        else:
+            # the user is asked for another title if the title was already filed
+            ticket.get_ticket_title()
+            ticket.get_ticket_prority()
+            generate = True
+
+        if not generate:
+            print(f"The ticket '{ticket.title}' was not generated.")
+        else:
+            try:
+                ticket.create_ticket_body_text()
+            except ValueError as e:
+                print(e)
+                sys.exit(2)
+
+            if args.dry_run:
+                rendered = render(ticket.document, args.format)
+                if not isinstance(rendered, str):
+                    rendered = json.dumps(rendered, indent=2)
+                print(f"{ticket.title} ({ticket.priority}, {ticket.issue_type or DEFAULT_ISSUE_TYPE})\n\n{rendered}")
+            elif export_sink is not None:
+                export_sink.write(ticket)
+                print(f"The ticket '{ticket.title}' was exported to {export_sink.path}.")
+            elif ticket.upload_ticket_to_jira(jira_credentials) is None:
+                exit_code = 1
+
+            if args.archive:
+                TicketDocument.write_jsonl([ticket.document], args.archive)
+
+    if export_sink is not None:
+        export_sink.close()
+    if duplicate_index is not None:
+        duplicate_index.save()
+
+    if response_cache is not None:
+        print(f"Bard response cache: {response_cache.stats()}")
+    print(f"Estimated LLM tokens: {token_meter.stats()}")
+
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+
+    sys.exit(exit_code)
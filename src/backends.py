@@ -0,0 +1,446 @@
+import re
+import shlex
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Title of the ticket in the prompts of Ticket
+PROMPT_TITLE = re.compile(r"titled '(.+?)'")
+
+
+class LLMBackend:
+    """
+    A class used to represent the interface of the language models that generate the tickets.
+    A backend only has to implement generate(). Streaming, batches and the async methods have default
+    implementations on top of it, which backends override when they can do better.
+
+    Attributes
+    ----------
+    name : str
+        Name of the backend, used in the keys of the response cache.
+    supports_streaming : bool
+        True if stream() yields the response in several chunks as it is generated.
+
+    Methods
+    -------
+    generate(prompt: str) -> str
+        Returns the response to a prompt.
+
+    stream(prompt: str) -> iterator
+        Yields the response to a prompt in chunks of text.
+
+    generate_batch(prompts: list) -> list
+        Returns the responses to independent prompts.
+
+    agenerate(prompt: str) -> str
+        Returns the response to a prompt without blocking the event loop.
+
+    astream(prompt: str) -> async iterator
+        Yields the response to a prompt in chunks without blocking the event loop.
+
+    agenerate_batch(prompts: list) -> list
+        Returns the responses to independent prompts without blocking the event loop.
+
+    concurrent(count: int) -> list
+        Returns up to count backends that can answer prompts at the same time (used by hedged requests).
+
+    reset() -> None
+        Starts a new conversation, so the next ticket is not generated in the context of the previous one.
+    """
+
+    name = "base"
+    supports_streaming = False
+    # Number of prompts of a batch sent at the same time by the default generate_batch()
+    batch_concurrency = 4
+
+    def generate(self, prompt: str) -> str:
+        """
+        Returns the response to a prompt.
+
+        Parameters
+        ----------
+        prompt : str
+            Prompt sent to the model.
+
+        Returns
+        -------
+        response: str
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: str):
+        """
+        Yields the response to a prompt in chunks of text. By default, the whole response is one chunk.
+        """
+        yield self.generate(prompt)
+
+    def generate_batch(self, prompts: list) -> list:
+        """
+        Returns the responses to independent prompts, in the order of the prompts.
+        By default, up to batch_concurrency prompts are sent at the same time.
+
+        Parameters
+        ----------
+        prompts : list
+            Prompts sent to the model.
+
+        Returns
+        -------
+        responses: list
+        """
+        if len(prompts) <= 1:
+            return [self.generate(prompt) for prompt in prompts]
+
+        with ThreadPoolExecutor(max_workers=min(self.batch_concurrency, len(prompts))) as executor:
+            return list(executor.map(self.generate, prompts))
+
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Returns the response to a prompt. By default, generate() runs in a worker thread.
+        """
+        # Imported on first use, so synchronous runs do not pay for it
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.generate, prompt)
+
+    async def astream(self, prompt: str):
+        """
+        Yields the response to a prompt in chunks. By default, stream() is advanced in a worker thread.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        chunks = iter(self.stream(prompt))
+        done = object()
+
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+
+    async def agenerate_batch(self, prompts: list) -> list:
+        """
+        Returns the responses to independent prompts, in the order of the prompts.
+        """
+        import asyncio
+
+        return list(await asyncio.gather(*(self.agenerate(prompt) for prompt in prompts)))
+
+    def concurrent(self, count: int) -> list:
+        """
+        Returns up to count backends that can answer prompts at the same time.
+        Backends without conversations can be shared, so by default the backend itself is returned count times.
+
+        Parameters
+        ----------
+        count : int
+            Number of concurrent requests.
+
+        Returns
+        -------
+        backends: list
+            The backends of the requests. Fewer than count means the requests cannot be sent concurrently.
+        """
+        return [self] * count
+
+    def reset(self) -> None:
+        """
+        Starts a new conversation. Backends without conversations do nothing.
+        """
+
+
+class ClientBackend(LLMBackend):
+    """
+    Backend around a client with the interface of Bard: get_answer(prompt)["content"],
+    and optionally get_answer_stream(prompt) yielding chunks of text.
+
+    Attributes
+    ----------
+    client : object
+        The wrapped client.
+    """
+
+    name = "bard"
+
+    def __init__(self, client):
+        self.client = client
+
+    @property
+    def supports_streaming(self) -> bool:
+        return hasattr(self.client, "get_answer_stream")
+
+    def generate(self, prompt: str) -> str:
+        return self.client.get_answer(prompt)["content"]
+
+    def stream(self, prompt: str):
+        if not self.supports_streaming:
+            return super().stream(prompt)
+        return self.client.get_answer_stream(prompt)
+
+    def concurrent(self, count: int) -> list:
+        # The conversation of the client (conversation_id, response_id, choice_id) would be mixed up by
+        # concurrent requests, and an arbitrary client cannot be copied
+        return [self]
+
+    def reset(self) -> None:
+        for attribute in ["conversation_id", "response_id", "choice_id"]:
+            if hasattr(self.client, attribute):
+                setattr(self.client, attribute, "")
+
+
+class BardBackend(ClientBackend):
+    """
+    Backend of Google Bard through the bardapi package, connecting on first use.
+
+    Attributes
+    ----------
+    api_key : str
+        API token for the Bard model.
+    """
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._client = None
+        self._forks = []
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Imported on first use, so runs with other backends do not pay for it
+            from bardapi import Bard
+
+            self._client = Bard(token=self.api_key)
+        return self._client
+
+    @property
+    def supports_streaming(self) -> bool:
+        return False
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self._busy += 1
+        try:
+            return super().generate(prompt)
+        finally:
+            with self._lock:
+                self._busy -= 1
+
+    def concurrent(self, count: int) -> list:
+        # Every concurrent request gets its own Bard client (and conversation), which is kept for the next requests.
+        # Clients still answering an abandoned request of an earlier attempt are skipped.
+        idle = [backend for backend in [self] + self._forks if not backend._busy]
+        while len(idle) < count:
+            fork = BardBackend(self.api_key)
+            self._forks.append(fork)
+            idle.append(fork)
+        return idle[:count]
+
+    def reset(self) -> None:
+        if self._client is not None:
+            super().reset()
+        for fork in self._forks:
+            fork.reset()
+
+
+class TemplateBackend(LLMBackend):
+    """
+    Deterministic offline backend that answers the prompts of Ticket from templates filled with the title.
+    The same prompt always gets the same response, without any network access, so it is suited to tests,
+    demos and dry runs, and as the fast path for traffic that does not need a real model.
+    """
+
+    name = "template"
+    supports_streaming = True
+
+    SECTIONS = {
+        "acceptance criteria for": [
+            ("Core Behaviour", "The {title} works as described for all supported users."),
+            ("Error Handling", "Failures of the {title} are reported with a clear message."),
+            ("Documentation", "The {title} is described in the user documentation."),
+        ],
+        "independent subtasks": [
+            ("Implementation", "Implement the {title} behind a feature flag."),
+            ("Automated Tests", "Add unit and integration tests for the {title}."),
+            ("Rollout", "Enable the {title} for all users and remove the feature flag."),
+        ],
+        "assumptions to complete": [
+            ("Existing Infrastructure", "The current infrastructure can support the {title}."),
+            ("Stakeholder Approval", "The scope of the {title} is approved by the product owner."),
+        ],
+    }
+
+    def _title(self, prompt: str) -> str:
+        match = PROMPT_TITLE.search(prompt)
+        return match.group(1).strip().lower() if match else "feature"
+
+    def _list(self, items: list, title: str) -> str:
+        return "\n".join(
+            f"{number}. {item_title}: {description.format(title=title)}"
+            for number, (item_title, description) in enumerate(items, start=1)
+        )
+
+    def generate(self, prompt: str) -> str:
+        title = self._title(prompt)
+        description = f"Description: We need to deliver the {title} in order for users to work more efficiently."
+
+        if "four sections" in prompt:
+            acceptance_criteria, subtasks, assumptions = (self._list(items, title) for items in self.SECTIONS.values())
+            return (
+                f"=== DESCRIPTION ===\n{description}\n\n"
+                f"=== ACCEPTANCE CRITERIA ===\n{acceptance_criteria}\n\n"
+                f"=== SUBTASKS ===\n{subtasks}\n\n"
+                f"=== ASSUMPTIONS ===\n{assumptions}\n"
+            )
+
+        for marker, items in self.SECTIONS.items():
+            if marker in prompt:
+                return self._list(items, title)
+
+        return description
+
+    def stream(self, prompt: str):
+        # One chunk per line, like a model streaming its answer
+        for line in self.generate(prompt).splitlines(keepends=True):
+            yield line
+
+    def generate_batch(self, prompts: list) -> list:
+        return [self.generate(prompt) for prompt in prompts]
+
+
+class CommandBackend(LLMBackend):
+    """
+    Backend running a local command (e.g. a CPU model served by llama.cpp) for every prompt.
+    The prompt is written to the standard input of the command and its standard output is the response.
+
+    Attributes
+    ----------
+    command : list
+        The command and its arguments.
+    timeout : float
+        Maximum number of seconds a response may take.
+    """
+
+    name = "command"
+    supports_streaming = True
+
+    def __init__(self, command: str, timeout: float = 300):
+        self.command = shlex.split(command)
+        self.timeout = timeout
+        if not self.command:
+            raise ValueError("The command backend needs a command, e.g. 'command:llama-cli -m model.gguf'.")
+
+    def generate(self, prompt: str) -> str:
+        result = subprocess.run(
+            self.command, input=prompt, capture_output=True, text=True, timeout=self.timeout, check=False
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"The command {self.command[0]} failed ({result.returncode}): {result.stderr.strip()}")
+        return result.stdout
+
+    def stream(self, prompt: str):
+        process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        stderr = []
+        timed_out = threading.Event()
+
+        def write_prompt() -> None:
+            # Written by its own thread, so a command that answers before it has read a long prompt cannot deadlock
+            try:
+                process.stdin.write(prompt)
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+        def kill() -> None:
+            timed_out.set()
+            process.kill()
+
+        threads = [
+            threading.Thread(target=write_prompt, daemon=True),
+            threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        timer = threading.Timer(self.timeout, kill)
+        timer.start()
+
+        try:
+            for line in process.stdout:
+                yield line
+            process.wait()
+        finally:
+            timer.cancel()
+            # Also stops the command when the caller aborts the stream
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            for thread in threads:
+                thread.join()
+
+        if timed_out.is_set():
+            raise RuntimeError(f"The command {self.command[0]} did not finish within {self.timeout} seconds")
+        if process.returncode != 0:
+            raise RuntimeError(f"The command {self.command[0]} failed ({process.returncode}): {''.join(stderr).strip()}")
+
+
+# Factories of the backends by name. Other backends can be added with register_backend().
+BACKENDS = {
+    "bard": lambda argument, api_key: BardBackend(api_key),
+    "template": lambda argument, api_key: TemplateBackend(),
+    "command": lambda argument, api_key: CommandBackend(argument),
+}
+
+
+def register_backend(name: str, factory) -> None:
+    """
+    Adds a backend that can be selected by name.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend.
+    factory : callable
+        Function factory(argument: str, api_key: str) returning an LLMBackend. The argument is the text after
+        the first ':' of the backend specification (or None).
+
+    Returns
+    -------
+    None
+    """
+    BACKENDS[name] = factory
+
+
+def create_backend(spec: str = "bard", api_key: str = None) -> LLMBackend:
+    """
+    Returns the backend of a specification such as 'bard', 'template' or 'command:llama-cli -m model.gguf'.
+
+    Parameters
+    ----------
+    spec : str
+        Name of the backend, optionally followed by ':' and an argument.
+    api_key : str
+        API token of backends that need one (Bard).
+
+    Returns
+    -------
+    backend: LLMBackend
+    """
+    name, _, argument = spec.partition(":")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Choose one of {list(BACKENDS)}.")
+
+    return BACKENDS[name](argument or None, api_key)
+
+
+def as_backend(model) -> LLMBackend:
+    """
+    Returns the model as an LLMBackend, wrapping clients with the interface of Bard.
+    """
+    if isinstance(model, LLMBackend):
+        return model
+    return ClientBackend(model)
@@ -0,0 +1,422 @@
+import os
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ticket import Ticket, PRIORITIES
+from jira_client import get_jira_client_manager, JIRA_BULK_LIMIT
+from metrics import metrics
+from export import ExportSink
+from model import TicketDocument
+
+
+def read_ticket_rows(file_path: str) -> list:
+    """
+    Reads the (title, priority) rows of a batch from a CSV, JSONL or JSON file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to a .csv file with the columns 'title' and 'priority', a .jsonl file where every line is
+        an object with the keys 'title' and 'priority', or a .json file with an array of such objects.
+        An optional 'issue_type' column sets the issue type of a ticket.
+        A ValueError is raised for a line that is not such an object (with its line number, or its position
+        in the array of a .json file).
+
+    Returns
+    -------
+    rows: list
+        List of dictionaries with the keys 'title', 'priority' and 'issue_type' (None if not given).
+    """
+
+    extension = os.path.splitext(file_path)[1].lower()
+
+    with open(file_path, "r", newline="") as file:
+        if extension == ".csv":
+            # Line 1 is the header
+            records = list(enumerate(csv.DictReader(file), start=2))
+        elif extension == ".jsonl":
+            records = []
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append((line_number, json.loads(line)))
+                except ValueError as e:
+                    raise ValueError(f"Line {line_number} of {file_path} is not valid JSON: {str(e)}")
+        elif extension == ".json":
+            records = json.load(file)
+            if not isinstance(records, list):
+                raise ValueError(f"The batch file {file_path} must contain a JSON array of objects.")
+            records = list(enumerate(records, start=1))
+        else:
+            raise ValueError(f"Unsupported batch file format: '{extension}'")
+
+    rows = []
+    for line_number, record in records:
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} of {file_path} is not an object with 'title' and 'priority'.")
+
+        title = (record.get("title") or "").strip()
+        priority = (record.get("priority") or "Medium").strip().capitalize()
+
+        error_message = Ticket.validate_title(title) if title else "The title is empty."
+        if error_message:
+            print(f"Skipping line {line_number} ('{title}'): {error_message}")
+            continue
+        if priority not in PRIORITIES:
+            print(f"Skipping line {line_number} ('{title}'): unknown priority '{priority}'.")
+            continue
+
+        issue_type = (record.get("issue_type") or "").strip() or None
+        rows.append({"title": title, "priority": priority, "issue_type": issue_type})
+
+    return rows
+
+
+def generate_ticket(
+    bard_api_key: str,
+    title: str,
+    priority: str,
+    ticket_options: dict = None,
+    issue_type: str = None,
+) -> Ticket:
+    """
+    Generates the full ticket body for a single title without prompting the user.
+
+    Parameters
+    ----------
+    bard_api_key : str
+        API token for the Bard model.
+    title : str
+        Title of the ticket.
+    priority : str
+        Priority of the ticket.
+    ticket_options : dict
+        Keyword arguments passed to Ticket (e.g. retry_policy, response_cache, single_call).
+    issue_type : str
+        Issue type of the ticket. If None, it is predicted by the issue type classifier of the ticket options (if any).
+
+    Returns
+    -------
+    ticket: Ticket
+        The generated ticket. None is returned if the title duplicates an existing issue and must be skipped.
+    """
+
+    ticket = Ticket(bard_api_key, **(ticket_options or {}))
+    ticket.title = title.title()
+    ticket.priority = priority
+    ticket.issue_type = issue_type
+    # A title that was already filed is not generated again (duplicate policy 'skip')
+    if not ticket.check_duplicate():
+        return None
+    try:
+        ticket.create_ticket_body_text()
+    except Exception:
+        # The title was claimed by check_duplicate(), so a later row with the same title may still be generated
+        if ticket.duplicate_index is not None:
+            ticket.duplicate_index.release(ticket.title)
+        raise
+
+    return ticket
+
+
+def classify_rows(rows: list, classifier) -> None:
+    """
+    Sets the issue type of the rows without one, classifying all their titles with a single vectorized call.
+
+    Parameters
+    ----------
+    rows : list
+        List of dictionaries with the keys 'title', 'priority' and optionally 'issue_type'.
+    classifier : IssueTypeClassifier
+        Local issue type classifier. Nothing is done if it is None.
+
+    Returns
+    -------
+    None
+    """
+    unclassified = [row for row in rows if row.get("issue_type") is None]
+    if classifier is None or not unclassified:
+        return
+
+    with metrics.timer("classify_batch"):
+        issue_types = classifier.predict([row["title"] for row in unclassified])
+    for row, issue_type in zip(unclassified, issue_types):
+        row["issue_type"] = issue_type
+
+
+def generate_tickets(
+    bard_api_key: str,
+    rows: list,
+    max_workers: int = 4,
+    ticket_options: dict = None,
+    on_ticket=None,
+) -> list:
+    """
+    Generates tickets concurrently on a bounded thread pool.
+    The generation is dominated by the Bard round trips, so threads are enough to overlap them.
+
+    Parameters
+    ----------
+    bard_api_key : str
+        API token for the Bard model.
+    rows : list
+        List of dictionaries with the keys 'title' and 'priority'.
+    max_workers : int
+        Maximum number of tickets generated at the same time.
+    ticket_options : dict
+        Keyword arguments passed to every Ticket. Shared objects (e.g. the response cache) are used by all workers.
+    on_ticket : callable
+        Optional callback on_ticket(ticket), called in the calling thread as soon as a ticket is generated.
+        An error of the callback is printed, and the ticket is still returned.
+
+    Returns
+    -------
+    tickets: list
+        The successfully generated tickets, in the same order as the input rows.
+    """
+
+    results = [None] * len(rows)
+    classify_rows(rows, (ticket_options or {}).get("issue_type_classifier"))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                generate_ticket,
+                bard_api_key,
+                row["title"],
+                row["priority"],
+                ticket_options,
+                row.get("issue_type"),
+            ): index
+            for index, row in enumerate(rows)
+        }
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+                if results[index] is None:
+                    print(f"Skipped ticket {index + 1}/{len(rows)}: {rows[index]['title']}")
+                    continue
+                print(f"Generated ticket {index + 1}/{len(rows)}: {rows[index]['title']}")
+            except Exception as e:
+                print(f"Failed to generate ticket '{rows[index]['title']}'. Error: {str(e)}")
+                continue
+
+            if on_ticket is not None:
+                # The ticket is generated, so an error of the callback (e.g. an export write) is reported on its own
+                try:
+                    on_ticket(results[index])
+                except Exception as e:
+                    print(f"Failed to write ticket '{rows[index]['title']}'. Error: {str(e)}")
+
+    tickets = [ticket for ticket in results if ticket is not None]
+    return tickets
+
+
+def upload_tickets_to_jira(
+    tickets: list, jira_credentials: dict, chunk_size: int = JIRA_BULK_LIMIT
+) -> list:
+    """
+    Creates the tickets in Jira in chunks through the bulk-create API.
+    Tickets that the journal shows as already created are not sent again.
+
+    Parameters
+    ----------
+    tickets : list
+        List of generated Ticket instances.
+    jira_credentials: dict
+        A dictionary containing the credentials needed to connect with Jira.
+    chunk_size : int
+        Number of issues sent per bulk request (capped at the Jira limit of 50).
+
+    Returns
+    -------
+    issue_keys: list
+        The keys of the created issues. None is used for tickets that failed to be created.
+    """
+
+    # One connection is shared by all bulk requests
+    jira_manager = get_jira_client_manager(jira_credentials)
+
+    issue_keys = [None] * len(tickets)
+    pending = []
+    for index, ticket in enumerate(tickets):
+        try:
+            issue_keys[index] = ticket.journaled_issue_key(jira_manager)
+        except Exception as e:
+            print(str(e))
+            continue
+
+        if issue_keys[index] is None:
+            pending.append(index)
+        else:
+            ticket.issue_key = issue_keys[index]
+            print(f"Skipping '{ticket.title}': already created as {issue_keys[index]}.")
+
+    field_list = [tickets[index].issue_fields(jira_credentials) for index in pending]
+    for index in pending:
+        if tickets[index].journal is not None:
+            tickets[index].journal.record_upload(tickets[index].title)
+
+    results = jira_manager.create_issues(field_list, chunk_size=chunk_size)
+
+    for index, result in zip(pending, results):
+        ticket = tickets[index]
+        if result["key"] is not None:
+            metrics.increment("jira_issues_created")
+            issue_keys[index] = result["key"]
+            ticket.issue_key = issue_keys[index]
+            if ticket.journal is not None:
+                ticket.journal.record_issue(ticket.title, issue_keys[index])
+            print(f"Created {issue_keys[index]}: {ticket.title}")
+            ticket.record_duplicate(jira_manager)
+        else:
+            metrics.increment("jira_errors")
+            print(f"Failed to create Jira issue '{ticket.title}'. Error: {result['error']}")
+
+    upload_subtasks_to_jira(tickets, issue_keys, jira_credentials, chunk_size=chunk_size)
+
+    return issue_keys
+
+
+def upload_subtasks_to_jira(
+    tickets: list, issue_keys: list, jira_credentials: dict, chunk_size: int = JIRA_BULK_LIMIT
+) -> list:
+    """
+    Creates the sub-tasks of all created tickets in Jira. The sub-tasks of different tickets share
+    the same bulk requests, so a batch needs about one request per 50 sub-tasks.
+
+    Parameters
+    ----------
+    tickets : list
+        List of generated Ticket instances.
+    issue_keys : list
+        Keys of the issues of the tickets (None for tickets that failed to be created).
+    jira_credentials: dict
+        A dictionary containing the credentials needed to connect with Jira.
+    chunk_size : int
+        Number of issues sent per bulk request (capped at the Jira limit of 50).
+
+    Returns
+    -------
+    subtask_keys: list
+        The keys of the created sub-tasks of every ticket.
+    """
+    jira_manager = get_jira_client_manager(jira_credentials)
+
+    field_lists = []
+    for ticket, issue_key in zip(tickets, issue_keys):
+        if issue_key is None or ticket.subtask_issue_type is None:
+            field_lists.append([])
+            continue
+
+        try:
+            # sub-tasks of an interrupted run are found by their labels instead of being created again
+            ticket.journaled_subtask_keys(jira_manager)
+        except RuntimeError as e:
+            metrics.increment("jira_errors")
+            print(e)
+            field_lists.append([])
+            continue
+
+        ticket_fields = ticket.subtask_fields(jira_credentials, issue_key)
+        if ticket_fields and ticket.journal is not None:
+            ticket.journal.record_subtask_upload(ticket.title, [fields["summary"] for fields in ticket_fields])
+        field_lists.append(ticket_fields)
+
+    field_list = [fields for ticket_fields in field_lists for fields in ticket_fields]
+    if not field_list:
+        return [[] for _ in tickets]
+
+    results = jira_manager.create_issues(field_list, chunk_size=chunk_size)
+
+    # Hand the results back to the ticket each sub-task belongs to
+    subtask_keys = []
+    start = 0
+    for ticket, ticket_fields in zip(tickets, field_lists):
+        ticket_results = results[start : start + len(ticket_fields)]
+        start += len(ticket_fields)
+        subtask_keys.append(ticket.record_subtasks(ticket_fields, ticket_results) if ticket_fields else [])
+
+    return subtask_keys
+
+
+def run_batch(
+    file_path: str,
+    bard_api_key: str,
+    jira_credentials: dict,
+    max_workers: int = 4,
+    chunk_size: int = JIRA_BULK_LIMIT,
+    ticket_options: dict = None,
+    export_sink: ExportSink = None,
+    archive_path: str = None,
+) -> list:
+    """
+    Reads a batch file, generates all tickets concurrently and uploads them to Jira in bulk,
+    or streams them into a Jira bulk-import file if an export sink is given.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV or JSONL batch file.
+    bard_api_key : str
+        API token for the Bard model.
+    jira_credentials: dict
+        A dictionary containing the credentials needed to connect with Jira.
+    max_workers : int
+        Maximum number of tickets generated at the same time.
+    chunk_size : int
+        Number of issues sent per bulk request.
+    ticket_options : dict
+        Keyword arguments passed to every Ticket (e.g. retry_policy, response_cache, single_call).
+    export_sink : ExportSink
+        Optional bulk-import file that every ticket is written to as soon as it is generated, instead of Jira.
+    archive_path : str
+        Optional JSONL file that the structured content of every ticket is appended to as soon as it is generated.
+
+    Returns
+    -------
+    issue_keys: list
+        The keys of the created issues, or the ids of the tickets in the export file.
+    """
+
+    rows = read_ticket_rows(file_path)
+    print(f"Generating {len(rows)} tickets with {max_workers} workers. Please wait...")
+
+    def archive(ticket: Ticket) -> None:
+        # Called in the calling thread, so the lines of the tickets are never interleaved
+        if archive_path is not None:
+            TicketDocument.write_jsonl([ticket.document], archive_path)
+
+    if export_sink is not None:
+        issue_ids = []
+
+        def on_ticket(ticket: Ticket) -> None:
+            issue_ids.append(export_sink.write(ticket))
+            archive(ticket)
+
+        generate_tickets(
+            bard_api_key,
+            rows,
+            max_workers=max_workers,
+            ticket_options=ticket_options,
+            on_ticket=on_ticket,
+        )
+        print(f"Exported {len(issue_ids)} of {len(rows)} tickets to {export_sink.path}.")
+        return issue_ids
+
+    tickets = generate_tickets(
+        bard_api_key,
+        rows,
+        max_workers=max_workers,
+        ticket_options=ticket_options,
+        on_ticket=archive,
+    )
+    issue_keys = upload_tickets_to_jira(tickets, jira_credentials, chunk_size=chunk_size)
+
+    created = sum(key is not None for key in issue_keys)
+    print(f"Created {created} of {len(rows)} tickets in Jira.")
+
+    return issue_keys
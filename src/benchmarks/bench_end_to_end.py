@@ -0,0 +1,267 @@
+"""
+End-to-end benchmark of ticket generation and upload without credentials or network.
+
+Bard and Jira are replaced by the local servers of benchmarks/fakes.py, which inject a configurable
+latency, failure rate and rate of malformed list responses. The benchmark reports tickets/s,
+latency percentiles per stage, LLM calls and estimated tokens per ticket and parser throughput, and writes them as JSON
+so runs can be compared across commits.
+
+Run from the 'src' directory:
+
+    python -m benchmarks.bench_end_to_end --tickets 50 --workers 8 --llm-latency 0.2 --output results.json
+"""
+
+import json
+import time
+import argparse
+import platform
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from ticket import Ticket
+from retry import RetryPolicy
+from tokens import TokenMeter
+from ratelimit import scheduler
+from batch import upload_tickets_to_jira
+from benchmarks.bench_parser import load_corpus, measure
+from benchmarks.fakes import (
+    FaultConfig,
+    FakeLLMServer,
+    FakeJiraServer,
+    FakeLLMClient,
+    FakeStreamingLLMClient,
+)
+
+
+class StageTimer:
+    """
+    Thread-safe collection of the durations of each stage.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, duration: float) -> None:
+        with self._lock:
+            self.durations.setdefault(stage, []).append(duration)
+
+    def summary(self) -> dict:
+        return {stage: summarize(durations) for stage, durations in self.durations.items()}
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Returns the percentile of sorted values using the nearest-rank method.
+    """
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(durations: list) -> dict:
+    """
+    Returns the count, mean and percentiles (in milliseconds) of a list of durations in seconds.
+    """
+    values = sorted(durations)
+    return {
+        "count": len(values),
+        "mean_ms": 1000 * sum(values) / len(values),
+        "p50_ms": 1000 * percentile(values, 0.50),
+        "p90_ms": 1000 * percentile(values, 0.90),
+        "p99_ms": 1000 * percentile(values, 0.99),
+        "max_ms": 1000 * values[-1],
+    }
+
+
+def make_ticket_class(llm_url: str, timer: StageTimer, stream: bool = False):
+    """
+    Returns a Ticket subclass that talks to the fake LLM server and times its stages.
+    """
+    client_class = FakeStreamingLLMClient if stream else FakeLLMClient
+
+    class BenchmarkTicket(Ticket):
+        def bard_model(self):
+            self.llm_client = client_class(llm_url)
+            return self.llm_client
+
+        def concurrent_models(self, model) -> list:
+            # The fake client keeps no conversation, so the hedged requests can share it
+            return [model] * self.retry_policy.hedge
+
+        def response_to_dict(self, response: str) -> dict:
+            start_time = time.perf_counter()
+            try:
+                return super().response_to_dict(response)
+            finally:
+                timer.add("parse", time.perf_counter() - start_time)
+
+    return BenchmarkTicket
+
+
+def git_commit() -> str:
+    """
+    Returns the current git commit, or an empty string outside a git repository.
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return ""
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Generates and uploads args.tickets tickets against the fake servers and returns the results.
+    """
+    timer = StageTimer()
+    llm_faults = FaultConfig(
+        args.llm_latency,
+        args.llm_jitter,
+        args.llm_failure_rate,
+        args.llm_malformed_rate,
+        args.seed,
+        max_concurrency=args.llm_server_concurrency,
+        retry_after=args.retry_after,
+    )
+    scheduler.llm.configure(
+        rate=args.llm_rate, max_concurrency=args.llm_concurrency, adaptive=not args.no_adaptive
+    )
+    jira_faults = FaultConfig(args.jira_latency, args.jira_jitter, args.jira_failure_rate, seed=args.seed)
+
+    with FakeLLMServer(llm_faults) as llm_server, FakeJiraServer(jira_faults) as jira_server:
+        jira_credentials = {
+            "server": jira_server.url,
+            "email_address": "benchmark@example.com",
+            "token": "benchmark",
+            "key": jira_server.project_key,
+        }
+        ticket_class = make_ticket_class(llm_server.url, timer, stream=args.stream)
+        retry_policy = RetryPolicy(
+            max_attempts=args.max_attempts, base_delay=args.base_delay, hedge=args.hedge
+        )
+        token_meter = TokenMeter()
+
+        def generate(number: int):
+            ticket = ticket_class(
+                bard_api_key=None,
+                retry_policy=retry_policy,
+                single_call=args.single_call,
+                context_budget=args.context_budget,
+                token_meter=token_meter,
+            )
+            ticket.title = f"Benchmark Ticket Number {number}"
+            ticket.priority = "Medium"
+
+            start_time = time.perf_counter()
+            ticket.create_ticket_body_text()
+            timer.add("generate", time.perf_counter() - start_time)
+            for latency in ticket.llm_client.latencies:
+                timer.add("llm_call", latency)
+
+            if not args.bulk:
+                start_time = time.perf_counter()
+                ticket.upload_ticket_to_jira(jira_credentials)
+                timer.add("upload", time.perf_counter() - start_time)
+
+            return ticket
+
+        start_time = time.perf_counter()
+        tickets = []
+        failures = 0
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(generate, number) for number in range(args.tickets)]
+            for future in futures:
+                try:
+                    tickets.append(future.result())
+                except Exception as e:
+                    failures += 1
+                    print(f"Ticket failed: {e}")
+
+        if args.bulk:
+            upload_start_time = time.perf_counter()
+            upload_tickets_to_jira(tickets, jira_credentials)
+            timer.add("upload_bulk", time.perf_counter() - upload_start_time)
+
+        elapsed = time.perf_counter() - start_time
+        llm_requests = llm_server.requests
+        llm_throttled = llm_server.throttled
+        jira_requests = jira_server.requests
+        issues_created = len(jira_server.issues)
+
+    corpus = load_corpus()
+    parser_ticket = Ticket(bard_api_key=None)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "elapsed_seconds": elapsed,
+        "tickets_generated": len(tickets),
+        "tickets_failed": failures,
+        "issues_created": issues_created,
+        "tickets_per_second": issues_created / elapsed,
+        "llm_calls_per_ticket": llm_requests / max(1, args.tickets),
+        "input_tokens_per_ticket": token_meter.input_tokens / max(1, args.tickets),
+        "output_tokens_per_ticket": token_meter.output_tokens / max(1, args.tickets),
+        "jira_requests": jira_requests,
+        "llm_throttled": llm_throttled,
+        "limits": scheduler.status(),
+        "stages": timer.summary(),
+        "parser": measure(parser_ticket.response_to_dict, corpus, args.parser_repeat),
+    }
+    return results
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark.")
+    parser.add_argument("--tickets", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--single-call", action="store_true")
+    parser.add_argument("--stream", action="store_true", help="Stream the LLM responses.")
+    parser.add_argument("--context-budget", type=int, help="Token budget of the chained context.")
+    parser.add_argument("--bulk", action="store_true", help="Upload with the bulk-create API.")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--base-delay", type=float, default=0.05)
+    parser.add_argument("--hedge", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds.")
+    parser.add_argument("--llm-jitter", type=float, default=0.02, help="Seconds.")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--llm-server-concurrency", type=int, help="Requests in flight above which the fake LLM answers 429."
+    )
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After of a 429 in seconds.")
+    parser.add_argument("--llm-rate", type=float, help="Client-side limit of LLM requests per second.")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="Maximum concurrent LLM requests.")
+    parser.add_argument("--no-adaptive", action="store_true", help="Disable the adaptive concurrency.")
+    parser.add_argument("--llm-malformed-rate", type=float, default=0.1)
+    parser.add_argument("--jira-latency", type=float, default=0.02, help="Seconds.")
+    parser.add_argument("--jira-jitter", type=float, default=0.01, help="Seconds.")
+    parser.add_argument("--jira-failure-rate", type=float, default=0.0)
+    parser.add_argument("--parser-repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Optional path of a JSON file for the results.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    results = run_benchmark(args)
+
+    print(
+        f"{results['tickets_per_second']:.2f} tickets/s, "
+        f"{results['llm_calls_per_ticket']:.2f} LLM calls/ticket, "
+        f"{results['input_tokens_per_ticket']:.0f} input tokens/ticket, "
+        f"{results['tickets_failed']} failed, "
+        f"{results['llm_throttled']} LLM requests throttled"
+    )
+    for stage, summary in results["stages"].items():
+        print(
+            f"{stage:>12}: p50 {summary['p50_ms']:8.1f} ms  p90 {summary['p90_ms']:8.1f} ms  "
+            f"p99 {summary['p99_ms']:8.1f} ms  (n={summary['count']})"
+        )
+    print(f"{'parser':>12}: {results['parser']['responses_per_second']:.0f} responses/s")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,118 @@
+"""
+Import-time benchmark guarding the cold start of the program.
+
+Every module is imported in a fresh interpreter with 'python -X importtime'. The benchmark reports
+the median cumulative import time of each module and checks that none of the heavy backends
+(inquirer, jira, bardapi, requests) is loaded at import time. It exits with status 1 if a backend
+is loaded or if a module takes longer than --max-ms, so it can run as a regression check in CI.
+
+Run from the 'src' directory:
+
+    python -m benchmarks.bench_import --repeat 10 --max-ms 150 --output import_times.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+
+# Modules imported when the program starts
+MODULES = ["ticket", "app"]
+# Backends that may only be imported on first use
+HEAVY_MODULES = ["inquirer", "jira", "bardapi", "requests", "numpy"]
+
+SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_once(module: str) -> tuple:
+    """
+    Imports a module in a fresh interpreter.
+    Returns its cumulative import time in milliseconds and the heavy modules it loaded.
+    """
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SOURCE_DIRECTORY,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    # Lines have the format "import time: self [us] | cumulative | imported package"
+    cumulative_us = None
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module and not fields[2].startswith("   "):
+            cumulative_us = int(fields[1])
+
+    loaded = [name for name in completed.stdout.strip().split(",") if name]
+    return cumulative_us / 1000, loaded
+
+
+def run_benchmark(modules: list, repeat: int) -> dict:
+    """
+    Imports every module repeat times and returns the import times and loaded heavy modules.
+    """
+    results = {}
+    for module in modules:
+        times = []
+        loaded = set()
+        for _ in range(repeat):
+            milliseconds, heavy_modules = import_once(module)
+            times.append(milliseconds)
+            loaded.update(heavy_modules)
+
+        results[module] = {
+            "median_ms": statistics.median(times),
+            "min_ms": min(times),
+            "max_ms": max(times),
+            "heavy_modules": sorted(loaded),
+        }
+
+    return results
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import-time benchmark.")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-ms", type=float, help="Fail if the median import time of a module exceeds this."
+    )
+    parser.add_argument("--output", help="Optional path of a JSON file for the results.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    results = run_benchmark(args.modules, args.repeat)
+
+    failed = False
+    for module, summary in results.items():
+        print(
+            f"{module:>12}: median {summary['median_ms']:7.1f} ms  "
+            f"min {summary['min_ms']:7.1f} ms  max {summary['max_ms']:7.1f} ms"
+        )
+        if summary["heavy_modules"]:
+            failed = True
+            print(f"{'':>12}  loads {', '.join(summary['heavy_modules'])} at import time")
+        if args.max_ms is not None and summary["median_ms"] > args.max_ms:
+            failed = True
+            print(f"{'':>12}  exceeds the limit of {args.max_ms:.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {"python": platform.python_version(), "config": vars(args), "modules": results},
+                file,
+                indent=2,
+            )
+
+    sys.exit(1 if failed else 0)
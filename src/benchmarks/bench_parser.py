@@ -0,0 +1,130 @@
+"""
+Micro-benchmark of the parser of Bard list responses.
+
+Compares Ticket.response_to_dict with the original multi-pass implementation on a corpus of
+sample responses, checks that both return exactly the same dictionaries and reports the throughput.
+
+Run from the 'src' directory:
+
+    python -m benchmarks.bench_parser --repeat 2000
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from ticket import Ticket
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "data", "bard_responses.jsonl")
+
+
+def legacy_response_to_dict(response: str) -> dict:
+    """
+    The original implementation of Ticket.response_to_dict, kept as the reference for output and speed.
+    """
+    matches = re.findall(r"(\b[a-zA-Z]\.\s)", response)
+    for match in matches:
+        response = response.replace(match, " - ")
+    response = response.replace("*", "")
+
+    if " - " in response:
+        parsed_dict = {}
+        current_key = None
+        current_value = []
+        for line in response.strip().split("\n"):
+            match = re.match(r"^(\d+)\. (.+?)$", line.strip())
+            if match:
+                if current_key is not None:
+                    parsed_dict[current_key] = current_value
+                current_key = match.group(2)
+                current_value = []
+            elif current_key is not None and line.strip() != "":
+                current_value.append(line.strip().lstrip("-").strip())
+        if current_key is not None:
+            parsed_dict[current_key] = current_value
+        return parsed_dict
+
+    result_dict = {}
+    for line in [item for item in response.strip().split("\n") if item.strip()]:
+        if ":" in line:
+            title, description = map(str.strip, line.split(":", 1))
+            result_dict[title.split(".", 1)[-1].strip()] = [description]
+    return result_dict
+
+
+def load_corpus(file_path: str = CORPUS_FILE) -> list:
+    """
+    Returns the responses of the corpus file (one JSON object with the key 'response' per line).
+    """
+    with open(file_path, "r") as file:
+        return [json.loads(line)["response"] for line in file if line.strip()]
+
+
+def measure(parse, responses: list, repeat: int) -> dict:
+    """
+    Parses every response 'repeat' times and returns the throughput.
+    """
+    total_bytes = sum(len(response.encode("utf-8")) for response in responses) * repeat
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for response in responses:
+            parse(response)
+    elapsed = time.perf_counter() - start_time
+
+    result = {
+        "seconds": elapsed,
+        "responses_per_second": len(responses) * repeat / elapsed,
+        "megabytes_per_second": total_bytes / elapsed / 1e6,
+    }
+    return result
+
+
+def run_benchmark(repeat: int, long_copies: int) -> dict:
+    """
+    Checks that both parsers agree on the corpus and measures them on the corpus and on one long response.
+    """
+    ticket = Ticket(bard_api_key=None)
+    responses = load_corpus()
+    # Long outputs show the cost of the repeated whole-string replacements of the original parser
+    long_response = "\n".join(responses * long_copies)
+
+    for response in responses + [long_response]:
+        if ticket.response_to_dict(response) != legacy_response_to_dict(response):
+            raise AssertionError(f"Parsers disagree on response: {response[:80]!r}")
+
+    results = {
+        "corpus": {
+            "legacy": measure(legacy_response_to_dict, responses, repeat),
+            "current": measure(ticket.response_to_dict, responses, repeat),
+        },
+        "long_response": {
+            "legacy": measure(legacy_response_to_dict, [long_response], max(1, repeat // 100)),
+            "current": measure(ticket.response_to_dict, [long_response], max(1, repeat // 100)),
+        },
+    }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the parser of Bard list responses.")
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the corpus.")
+    parser.add_argument(
+        "--long-copies", type=int, default=50, help="Corpus copies in the long response."
+    )
+    parser.add_argument("--output", help="Optional path of a JSON file for the results.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat, args.long_copies)
+
+    for case, implementations in results.items():
+        for name, result in implementations.items():
+            print(
+                f"{case:>14} {name:>8}: {result['responses_per_second']:12.0f} responses/s "
+                f"{result['megabytes_per_second']:8.2f} MB/s"
+            )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,516 @@
+"""
+Local stand-ins for Bard and Jira used by the benchmarks.
+
+Both servers run in a background thread on 127.0.0.1 and inject a configurable latency,
+failure rate and (for the LLM) rate of malformed list responses. Like real backends, they can
+answer with 429 and a Retry-After header when too many requests are in flight.
+"""
+
+import re
+import json
+import time
+import random
+import threading
+import itertools
+from datetime import datetime, timezone
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIST_ITEMS = [
+    ("Button Placement", "The button is placed near the title of the post."),
+    ("Supported Platforms", "Sharing works for Facebook, Twitter and LinkedIn."),
+    ("Visual Design", "The design follows the style guide of the website."),
+    ("Analytics", "Every share sends an event to the analytics pipeline."),
+    ("Accessibility", "The button can be reached with the keyboard."),
+    ("Error Handling", "A clear message is shown when sharing fails."),
+]
+
+# Priorities of the fake Jira server and issue types of its project
+PRIORITY_NAMES = ["Highest", "High", "Medium", "Low", "Lowest"]
+ISSUE_TYPE_NAMES = ["Task", "Bug", "Story", "Epic", "Sub-task"]
+
+
+class FaultConfig:
+    """
+    A class used to represent the latency and faults injected by a fake server.
+
+    Attributes
+    ----------
+    latency : float
+        Mean latency of a request in seconds.
+    jitter : float
+        Maximum deviation from the mean latency in seconds.
+    failure_rate : float
+        Share of the requests answered with an HTTP 503 error.
+    malformed_rate : float
+        Share of the LLM requests answered with text that does not contain a list.
+    seed : int
+        Seed of the random generator, so runs are repeatable.
+    max_concurrency : int
+        Number of requests in flight above which requests are throttled with 429. None means no limit.
+    retry_after : float
+        Seconds sent in the Retry-After header of a throttled request.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+        max_concurrency: int = None,
+        retry_after: float = 1.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple:
+        """
+        Returns the (delay, failed, malformed) outcome of the next request.
+        """
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.failure_rate
+            malformed = self._random.random() < self.malformed_rate
+        return delay, failed, malformed
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """
+    Base request handler that applies the fault configuration of the server.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, status: int, payload, headers: dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def inject_faults(self) -> bool:
+        """
+        Sleeps for the drawn latency and answers with an error if the request failed or was throttled.
+        Returns True if the request may be served normally, and stores whether the answer is malformed.
+        """
+        delay, failed, self.malformed = self.server.fault_config.draw()
+        self.server.count_request()
+        if self.throttle():
+            return False
+
+        try:
+            time.sleep(delay)
+        finally:
+            self.server.leave()
+
+        if failed:
+            self.send_json(503, {"errorMessages": ["Injected failure"]})
+            return False
+        return True
+
+    def throttle(self) -> bool:
+        """
+        Enters the server and answers with 429 and a Retry-After header if too many requests are in flight.
+        Returns True if the request was throttled. Otherwise the caller must call server.leave() when done.
+        """
+        fault_config = self.server.fault_config
+        if self.server.enter():
+            return False
+
+        self.send_json(
+            429,
+            {"errorMessages": ["Too many requests"]},
+            headers={"Retry-After": str(fault_config.retry_after)},
+        )
+        return True
+
+
+class _FakeLLMHandler(_FakeHandler):
+    """
+    Answers POST /answer {"prompt": ...} with {"content": ...} in the shape Bard returns,
+    and POST /stream {"prompt": ...} with the plain text answer streamed line by line.
+    """
+
+    def do_POST(self):
+        prompt = self.read_json().get("prompt", "")
+
+        if self.path == "/stream":
+            self.stream_answer(prompt)
+            return
+
+        if not self.inject_faults():
+            return
+        self.send_json(200, {"content": fake_answer(prompt, self.malformed)})
+
+    def stream_answer(self, prompt: str) -> None:
+        """
+        Streams the answer line by line, spreading the drawn latency over the lines.
+        The body ends when the connection is closed.
+        """
+        delay, failed, malformed = self.server.fault_config.draw()
+        self.server.count_request()
+        if self.throttle():
+            return
+
+        try:
+            if failed:
+                self.send_json(503, {"errorMessages": ["Injected failure"]})
+                return
+
+            lines = fake_answer(prompt, malformed).split("\n")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+
+            for line in lines:
+                time.sleep(delay / len(lines))
+                self.wfile.write((line + "\n").encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client aborted the stream
+            pass
+        finally:
+            self.server.leave()
+
+
+class _FakeJiraHandler(_FakeHandler):
+    """
+    Implements the part of the Jira REST API v2 used by the program (search only supports queries
+    by label, or of all issues of the project optionally filtered by 'updated >=', with paging).
+    """
+
+    def do_GET(self):
+        if not self.inject_faults():
+            return
+
+        if self.path.startswith("/rest/api/2/serverInfo"):
+            self.send_json(
+                200,
+                {
+                    "baseUrl": self.server.url,
+                    "version": "9.4.0",
+                    "versionNumbers": [9, 4, 0],
+                    "deploymentType": "Server",
+                    "buildNumber": 940000,
+                    "serverTitle": "Fake Jira",
+                },
+            )
+            return
+
+        if self.path.startswith("/rest/api/2/search"):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            jql = query.get("jql", [""])[0]
+            label = re.search(r'labels (?:= "([^"]+)"|in \(([^)]*)\))', jql)
+            updated_since = re.search(r'updated >= "([^"]+)"', jql)
+            start = int(query.get("startAt", ["0"])[0])
+            max_results = int(query.get("maxResults", ["50"])[0])
+
+            issues = list(self.server.issues.items())
+            if label:
+                labels = {label.group(1)} if label.group(1) else set(re.findall(r'"([^"]+)"', label.group(2)))
+                keys = [key for key, issue in issues if labels & set(issue["fields"].get("labels", []))]
+            else:
+                since = updated_since.group(1).replace("/", "-") if updated_since else ""
+                issues.sort(key=lambda item: item[1]["fields"]["updated"])
+                keys = [key for key, issue in issues if issue["fields"]["updated"][:16].replace("T", " ") >= since]
+
+            page = [self.server.issue_json(key) for key in keys[start : start + max_results]]
+            self.send_json(200, {"startAt": start, "maxResults": max_results, "total": len(keys), "issues": page})
+            return
+
+        if self.path.startswith("/rest/api/2/priority"):
+            self.send_json(200, [{"id": str(index), "name": name} for index, name in enumerate(PRIORITY_NAMES, 1)])
+            return
+
+        match = re.match(r"^/rest/api/2/project/([^/?]+)", self.path)
+        if match:
+            if match.group(1) != self.server.project_key:
+                self.send_json(404, {"errorMessages": [f"No project could be found with key '{match.group(1)}'."]})
+                return
+            issue_types = [
+                {"id": str(index), "name": name, "subtask": name == "Sub-task"}
+                for index, name in enumerate(ISSUE_TYPE_NAMES, 1)
+            ]
+            self.send_json(
+                200,
+                {"id": "10000", "key": self.server.project_key, "name": "Benchmark", "issueTypes": issue_types},
+            )
+            return
+
+        match = re.match(r"^/rest/api/2/issue/([^/?]+)", self.path)
+        key = self.server.resolve_issue(match.group(1)) if match else None
+        if key is not None:
+            self.send_json(200, self.server.issue_json(key))
+            return
+
+        self.send_json(404, {"errorMessages": [f"Not found: {self.path}"]})
+
+    def do_POST(self):
+        payload = self.read_json()
+        if not self.inject_faults():
+            return
+
+        if self.path.startswith("/rest/api/2/issueLink"):
+            self.server.link_issues(payload)
+            self.send_response(201)
+            self.end_headers()
+            return
+
+        if self.path.startswith("/rest/api/2/issue/bulk"):
+            issues = [self.server.create_issue(update["fields"]) for update in payload["issueUpdates"]]
+            self.send_json(201, {"issues": issues, "errors": []})
+            return
+
+        if self.path.startswith("/rest/api/2/issue"):
+            self.send_json(201, self.server.create_issue(payload["fields"]))
+            return
+
+        self.send_json(404, {"errorMessages": [f"Not found: {self.path}"]})
+
+    def do_PUT(self):
+        payload = self.read_json()
+        if not self.inject_faults():
+            return
+
+        # jira.Issue.update() addresses the issue by its id, other clients by its key
+        match = re.match(r"^/rest/api/2/issue/([^/?]+)", self.path)
+        key = self.server.resolve_issue(match.group(1)) if match else None
+        if key is not None:
+            self.server.update_issue(key, payload.get("fields", {}))
+            self.send_response(204)
+            self.end_headers()
+            return
+
+        self.send_json(404, {"errorMessages": [f"Not found: {self.path}"]})
+
+
+class _FakeServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server on a free local port, serving in a daemon thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler, fault_config: FaultConfig):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.fault_config = fault_config
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self._counter_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def count_request(self) -> None:
+        with self._counter_lock:
+            self.requests += 1
+
+    def enter(self) -> bool:
+        """
+        Counts a request in flight. Returns False (and does not count it) if the server is at its concurrency limit.
+        """
+        with self._counter_lock:
+            max_concurrency = self.fault_config.max_concurrency
+            if max_concurrency is not None and self.in_flight >= max_concurrency:
+                self.throttled += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self) -> None:
+        with self._counter_lock:
+            self.in_flight -= 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeLLMServer(_FakeServer):
+    """
+    Local stand-in for the LLM, answering prompts with generated lists.
+    """
+
+    def __init__(self, fault_config: FaultConfig = None):
+        super().__init__(_FakeLLMHandler, fault_config or FaultConfig())
+
+
+class FakeJiraServer(_FakeServer):
+    """
+    Local stand-in for the Jira REST API, keeping the created issues in memory.
+    """
+
+    def __init__(self, fault_config: FaultConfig = None, project_key: str = "BENCH"):
+        super().__init__(_FakeJiraHandler, fault_config or FaultConfig())
+        self.project_key = project_key
+        self.issues = {}
+        self.updates = 0
+        self.links = []
+        self._keys_by_id = {}
+        self._ids = itertools.count(10000)
+
+    @staticmethod
+    def timestamp() -> str:
+        """
+        Returns the current time in the format of the 'updated' field of Jira.
+        """
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+0000"
+
+    def create_issue(self, fields: dict) -> dict:
+        with self._counter_lock:
+            issue_id = next(self._ids)
+            key = f"{self.project_key}-{issue_id - 9999}"
+            self.issues[key] = {"id": str(issue_id), "fields": {**fields, "updated": self.timestamp()}}
+            self._keys_by_id[str(issue_id)] = key
+        return {"id": str(issue_id), "key": key, "self": f"{self.url}/rest/api/2/issue/{issue_id}"}
+
+    def resolve_issue(self, key_or_id: str) -> str:
+        """
+        Returns the key of the issue with the given key or id, or None if there is no such issue.
+        """
+        if key_or_id in self.issues:
+            return key_or_id
+        return self._keys_by_id.get(key_or_id)
+
+    def update_issue(self, key: str, fields: dict) -> None:
+        with self._counter_lock:
+            self.issues[key]["fields"].update(fields, updated=self.timestamp())
+            self.updates += 1
+
+    def link_issues(self, link: dict) -> None:
+        with self._counter_lock:
+            self.links.append(link)
+
+    def issue_json(self, key: str) -> dict:
+        issue = self.issues[key]
+        return {
+            "id": issue["id"],
+            "key": key,
+            "self": f"{self.url}/rest/api/2/issue/{issue['id']}",
+            "fields": issue["fields"],
+        }
+
+
+class FakeLLMError(RuntimeError):
+    """
+    Error of a failed FakeLLMClient request, carrying the HTTP status and headers like the errors of real clients.
+    """
+
+    def __init__(self, status_code: int, headers: dict):
+        super().__init__(f"LLM request failed with status {status_code}")
+        self.status_code = status_code
+        self.headers = headers
+
+
+class FakeLLMClient:
+    """
+    Client of FakeLLMServer with the get_answer(prompt)["content"] interface of Bard.
+    Records the latency of every call.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latencies = []
+
+    def get_answer(self, prompt: str) -> dict:
+        request = urllib.request.Request(
+            f"{self.url}/answer",
+            data=json.dumps({"prompt": prompt}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+
+        start_time = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                answer = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise FakeLLMError(e.code, dict(e.headers))
+        finally:
+            self.latencies.append(time.perf_counter() - start_time)
+
+        return answer
+
+
+class FakeStreamingLLMClient(FakeLLMClient):
+    """
+    Client of FakeLLMServer that streams the answer with get_answer_stream(prompt).
+    """
+
+    def get_answer_stream(self, prompt: str):
+        request = urllib.request.Request(
+            f"{self.url}/stream",
+            data=json.dumps({"prompt": prompt}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+
+        start_time = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                for line in response:
+                    yield line.decode("utf-8")
+        except urllib.error.HTTPError as e:
+            raise FakeLLMError(e.code, dict(e.headers))
+        finally:
+            self.latencies.append(time.perf_counter() - start_time)
+
+
+def fake_list(count: int) -> str:
+    """
+    Returns a numbered list in the format requested by the prompts.
+    """
+    return "\n".join(
+        f"{number}. {title}: {description}"
+        for number, (title, description) in enumerate(LIST_ITEMS[:count], start=1)
+    )
+
+
+def fake_answer(prompt: str, malformed: bool) -> str:
+    """
+    Returns a Bard-like answer for one of the prompts of Ticket.
+    A malformed answer contains no list, so the parser rejects it.
+    """
+    if malformed:
+        return (
+            "I'm sorry, I cannot create this list.\n"
+            "The title does not describe a task that can be split up.\n"
+            "Could you provide more details about the work that is needed?\n"
+            "For example, describe the users and the expected outcome.\n"
+            "I will then gladly help you with the ticket.\n"
+            "Thank you for your understanding."
+        )
+
+    description = "Description: We need to add the feature in order for users to work faster."
+
+    if "four sections" in prompt:
+        return (
+            f"=== DESCRIPTION ===\n{description}\n\n"
+            f"=== ACCEPTANCE CRITERIA ===\n{fake_list(5)}\n\n"
+            f"=== SUBTASKS ===\n{fake_list(4)}\n\n"
+            f"=== ASSUMPTIONS ===\n{fake_list(3)}\n"
+        )
+    if "one-line description" in prompt:
+        return f"Sure, here is the description:\n\n{description}"
+
+    return f"Sure! Here is the list:\n\n{fake_list(4)}\n\nI hope this helps!"
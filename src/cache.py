@@ -0,0 +1,226 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class ResponseCache:
+    """
+    A class used to represent a persistent cache of LLM responses stored in a SQLite file.
+    Entries are keyed on a hash of the model name and the normalized prompt.
+
+    Attributes
+    ----------
+    path : str
+        Path to the SQLite file of the cache.
+    ttl : float
+        Number of seconds an entry stays valid. None means entries never expire.
+    max_entries : int
+        Maximum number of entries. The least recently used entries are evicted first.
+    max_bytes : int
+        Maximum total size of the stored responses in bytes. None means no limit.
+    hits: int
+        Number of lookups that returned a cached response.
+    misses: int
+        Number of lookups that did not find a (valid) cached response.
+
+    Methods
+    -------
+    make_key(model_name: str, prompt: str) -> str
+        Returns the cache key of a prompt sent to a model.
+
+    get(model_name: str, prompt: str) -> str
+        Returns the cached response, or None if there is no valid entry.
+
+    set(model_name: str, prompt: str, response: str) -> None
+        Stores a response and evicts entries if the cache is over its size limits.
+
+    stats() -> dict
+        Returns the hit/miss counters and the current size of the cache.
+    """
+
+    FILE_NAME = "responses.sqlite3"
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 30 * 24 * 3600,
+        max_entries: int = 10000,
+        max_bytes: int = None,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        # One connection shared by all threads, serialized by the lock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+            self._purge_expired()
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        """
+        Returns the cache key of a prompt sent to a model.
+        The prompt is normalized by collapsing whitespace, so indentation changes do not invalidate entries.
+
+        Parameters
+        ----------
+        model_name : str
+            Identity of the model the prompt is sent to.
+        prompt : str
+            Prompt sent to the model.
+
+        Returns
+        -------
+        key: str
+            Hex digest of the model name and the normalized prompt.
+        """
+        normalized_prompt = " ".join(prompt.split())
+        return hashlib.sha256(f"{model_name}\n{normalized_prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model_name: str, prompt: str) -> str:
+        """
+        Returns the cached response of a prompt.
+
+        Parameters
+        ----------
+        model_name : str
+            Identity of the model the prompt is sent to.
+        prompt : str
+            Prompt sent to the model.
+
+        Returns
+        -------
+        response: str
+            The cached response. None is returned if there is no entry or the entry expired.
+        """
+        key = self.make_key(model_name, prompt)
+        now = time.time()
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return response
+
+    def set(self, model_name: str, prompt: str, response: str) -> None:
+        """
+        Stores the response of a prompt and evicts the least recently used entries if the cache is full.
+
+        Parameters
+        ----------
+        model_name : str
+            Identity of the model the prompt is sent to.
+        prompt : str
+            Prompt sent to the model.
+        response : str
+            Response of the model.
+
+        Returns
+        -------
+        None
+        """
+        key = self.make_key(model_name, prompt)
+        now = time.time()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict()
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters and the current size of the cache.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        cache_stats: dict
+            - hits (int), misses (int), entries (int) and bytes (int).
+        """
+        with self._lock:
+            entries, total_bytes = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        cache_stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
+        return cache_stats
+
+    def _purge_expired(self) -> None:
+        """
+        Deletes all entries older than the TTL. Must be called while holding the lock.
+        """
+        if self.ttl is not None:
+            self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+
+    def _evict(self) -> None:
+        """
+        Deletes the least recently used entries until the cache is within its size limits.
+        Must be called while holding the lock.
+        """
+        if self.max_entries is not None:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+        if self.max_bytes is not None:
+            # Keep the most recently used entries whose cumulative size fits in max_bytes
+            rows = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at DESC"
+            ).fetchall()
+            total_bytes = 0
+            evicted_keys = []
+            for key, size in rows:
+                total_bytes += size
+                if total_bytes > self.max_bytes:
+                    evicted_keys.append((key,))
+            self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
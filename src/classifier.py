@@ -0,0 +1,318 @@
+import os
+import re
+import csv
+import json
+import zlib
+import argparse
+
+WORD = re.compile(r"[a-z0-9]+")
+# Issue types that are never predicted for a ticket (its sub-tasks get their own type)
+SUBTASK_TYPES = {"sub-task", "subtask"}
+
+
+def title_features(title: str, n_features: int) -> list:
+    """
+    Returns the hashed features of a title: its words and pairs of consecutive words,
+    each mapped to one of n_features columns with a stable hash (CRC32).
+
+    Parameters
+    ----------
+    title : str
+        Title of a ticket.
+    n_features : int
+        Number of columns of the hashed feature space.
+
+    Returns
+    -------
+    columns: list
+        Column of every feature of the title (with repetitions).
+    """
+    words = WORD.findall(title.lower())
+    features = [f"w:{word}" for word in words]
+    features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+
+    return [zlib.crc32(feature.encode("utf-8")) % n_features for feature in features]
+
+
+def read_training_data(file_path: str) -> tuple:
+    """
+    Reads the titles and issue types of existing issues, e.g. an export of the issue history of a project.
+    Sub-tasks are left out.
+
+    Parameters
+    ----------
+    file_path : str
+        A .csv file with the columns 'Summary' and 'Issue Type' (as exported by Jira) or 'title' and 'issue_type',
+        or a .jsonl file where every line is an object with the keys 'title' and 'issue_type'.
+
+    Returns
+    -------
+    (titles, labels): tuple
+        Lists of the titles and of their issue types.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    with open(file_path, "r", newline="", encoding="utf-8") as file:
+        if extension == ".csv":
+            records = list(csv.DictReader(file))
+        elif extension in (".jsonl", ".json"):
+            records = [json.loads(line) for line in file if line.strip()]
+        else:
+            raise ValueError(f"Unsupported training file format: '{extension}'")
+
+    titles, labels = [], []
+    for record in records:
+        title = (record.get("Summary") or record.get("title") or "").strip()
+        label = (record.get("Issue Type") or record.get("issue_type") or "").strip()
+        if title and label and label.lower() not in SUBTASK_TYPES:
+            titles.append(title)
+            labels.append(label)
+
+    return titles, labels
+
+
+class IssueTypeClassifier:
+    """
+    A class used to represent a local model that predicts the Jira issue type (e.g. Bug, Task, Story) of a title.
+    Titles are turned into hashed bags of words and pairs of words, and a softmax linear model is evaluated on them
+    with NumPy. A whole batch of titles is classified with a few array operations, without any LLM call.
+
+    The features of a batch are kept sparse (one (row, column, value) entry per feature), so the model never
+    builds a dense matrix of titles times columns.
+
+    NumPy is imported on first use, so runs that do not classify titles do not load it.
+
+    Attributes
+    ----------
+    labels : list
+        Issue types the model can predict.
+    n_features : int
+        Number of columns of the hashed feature space.
+    weights : numpy.ndarray
+        Weights of the model (n_features x number of labels).
+    bias : numpy.ndarray
+        Bias of every label.
+
+    Methods
+    -------
+    fit(titles: list, labels: list, epochs: int, learning_rate: float, l2: float) -> IssueTypeClassifier
+        Trains the model on the titles and issue types of existing issues.
+
+    predict_proba(titles: list) -> numpy.ndarray
+        Returns the probability of every issue type for every title.
+
+    predict(titles: list) -> list
+        Returns the most likely issue type of every title.
+
+    save(file_path: str) -> None
+        Writes the model to a .npz file.
+
+    load(file_path: str) -> IssueTypeClassifier
+        Reads a model written by save().
+    """
+
+    def __init__(self, labels: list = None, n_features: int = 1 << 14):
+        self.labels = list(labels or [])
+        self.n_features = n_features
+        self.weights = None
+        self.bias = None
+
+    def _features(self, titles: list) -> tuple:
+        """
+        Returns the sparse features of a batch of titles: row, column and value of every feature.
+        The features of a title are scaled to unit length, so long titles do not get larger scores.
+        """
+        import numpy as np
+
+        columns = [title_features(title, self.n_features) for title in titles]
+        lengths = np.fromiter((len(title_columns) for title_columns in columns), dtype=np.int64, count=len(titles))
+
+        rows = np.repeat(np.arange(len(titles)), lengths)
+        flat_columns = np.fromiter(
+            (column for title_columns in columns for column in title_columns), dtype=np.int64, count=int(lengths.sum())
+        )
+        values = 1.0 / np.sqrt(np.maximum(lengths, 1))[rows]
+
+        return rows, flat_columns, values.astype(np.float32)
+
+    def _scores(self, rows, columns, values, count: int):
+        """
+        Returns the scores (logits) of every label for a batch of titles: features times weights plus bias.
+        """
+        import numpy as np
+
+        scores = np.tile(self.bias, (count, 1))
+        np.add.at(scores, rows, self.weights[columns] * values[:, None])
+        return scores
+
+    @staticmethod
+    def _softmax(scores):
+        import numpy as np
+
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exponentials = np.exp(scores)
+        return exponentials / exponentials.sum(axis=1, keepdims=True)
+
+    def fit(
+        self, titles: list, labels: list, epochs: int = 200, learning_rate: float = 1.0, l2: float = 1e-4
+    ) -> "IssueTypeClassifier":
+        """
+        Trains the model with full-batch gradient descent on the cross-entropy loss.
+
+        Parameters
+        ----------
+        titles : list
+            Titles of existing issues.
+        labels : list
+            Issue type of every title.
+        epochs : int
+            Number of gradient steps.
+        learning_rate : float
+            Size of the gradient steps.
+        l2 : float
+            Strength of the L2 regularization of the weights.
+
+        Returns
+        -------
+        classifier: IssueTypeClassifier
+            The trained model itself.
+        """
+        import numpy as np
+
+        if not titles:
+            raise ValueError("The classifier needs at least one labelled title to be trained.")
+
+        self.labels = sorted(set(labels))
+        label_index = {label: index for index, label in enumerate(self.labels)}
+        targets = np.zeros((len(titles), len(self.labels)), dtype=np.float32)
+        targets[np.arange(len(titles)), [label_index[label] for label in labels]] = 1.0
+
+        rows, columns, values = self._features(titles)
+        self.weights = np.zeros((self.n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.log(targets.mean(axis=0) + 1e-6).astype(np.float32)
+
+        for _ in range(epochs):
+            errors = (self._softmax(self._scores(rows, columns, values, len(titles))) - targets) / len(titles)
+
+            gradient = l2 * self.weights
+            np.add.at(gradient, columns, errors[rows] * values[:, None])
+            self.weights -= learning_rate * gradient
+            self.bias -= learning_rate * errors.sum(axis=0)
+
+        return self
+
+    def predict_proba(self, titles: list):
+        """
+        Returns the probability of every issue type for every title.
+
+        Parameters
+        ----------
+        titles : list
+            Titles of tickets.
+
+        Returns
+        -------
+        probabilities: numpy.ndarray
+            One row per title and one column per issue type (in the order of labels).
+        """
+        if self.weights is None:
+            raise RuntimeError("The classifier has not been trained or loaded.")
+
+        rows, columns, values = self._features(titles)
+        return self._softmax(self._scores(rows, columns, values, len(titles)))
+
+    def predict(self, titles: list) -> list:
+        """
+        Returns the most likely issue type of every title, with one vectorized evaluation for the whole batch.
+
+        Parameters
+        ----------
+        titles : list
+            Titles of tickets.
+
+        Returns
+        -------
+        issue_types: list
+        """
+        if not titles:
+            return []
+
+        return [self.labels[index] for index in self.predict_proba(titles).argmax(axis=1)]
+
+    def save(self, file_path: str) -> None:
+        """
+        Writes the model to a .npz file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the model file.
+
+        Returns
+        -------
+        None
+        """
+        import numpy as np
+
+        np.savez_compressed(
+            file_path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+            n_features=np.array(self.n_features),
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> "IssueTypeClassifier":
+        """
+        Reads a model written by save().
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the model file.
+
+        Returns
+        -------
+        classifier: IssueTypeClassifier
+        """
+        import numpy as np
+
+        with np.load(file_path, allow_pickle=False) as data:
+            classifier = cls(labels=[str(label) for label in data["labels"]], n_features=int(data["n_features"]))
+            classifier.weights = data["weights"]
+            classifier.bias = data["bias"]
+
+        return classifier
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the issue-type classifier on the issue history of a project.")
+    parser.add_argument("history", help="CSV (Jira export) or JSONL file of existing issues with their issue types.")
+    parser.add_argument("--output", default="issue_type_model.npz", help="Path of the trained model.")
+    parser.add_argument("--epochs", type=int, default=200, help="Number of gradient steps.")
+    parser.add_argument(
+        "--holdout", type=float, default=0.2, help="Share of the issues kept out of the training to report the accuracy."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    titles, labels = read_training_data(args.history)
+
+    # every n-th issue is held out to estimate the accuracy of the model
+    step = int(1 / args.holdout) if args.holdout > 0 else 0
+    held_out = set(range(0, len(titles), step)) if step > 1 else set()
+    train = [index for index in range(len(titles)) if index not in held_out]
+
+    classifier = IssueTypeClassifier().fit(
+        [titles[index] for index in train], [labels[index] for index in train], epochs=args.epochs
+    )
+    if held_out:
+        predictions = classifier.predict([titles[index] for index in sorted(held_out)])
+        correct = sum(prediction == labels[index] for prediction, index in zip(predictions, sorted(held_out)))
+        print(f"Accuracy on {len(held_out)} held-out issues: {correct / len(held_out):.1%}")
+
+    classifier.save(args.output)
+    print(f"Trained on {len(train)} issues ({', '.join(classifier.labels)}). Model written to {args.output}.")
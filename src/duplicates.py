@@ -0,0 +1,361 @@
+import os
+import re
+import json
+import math
+import threading
+from datetime import datetime, timedelta
+from metrics import metrics
+
+# Words that say nothing about the work of a ticket
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "of", "on", "or",
+    "the", "to", "up", "with", "when", "new", "add", "adds", "update", "create",
+}
+TOKEN = re.compile(r"[a-z0-9]+")
+# Format of the 'updated' field of Jira issues, e.g. 2023-10-01T12:34:56.000+0000
+JIRA_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+# Format of dates in JQL (minutes precision)
+JQL_TIMESTAMP_FORMAT = "%Y/%m/%d %H:%M"
+# Issues updated this long before the last refresh are fetched again, since JQL dates are in
+# the time zone of the Jira user and only have minutes precision
+REFRESH_OVERLAP = timedelta(days=1)
+# Action taken for a title that duplicates an existing issue
+DUPLICATE_POLICIES = ["warn", "skip", "link"]
+# Type of the link from a new issue to the existing issue with a similar summary
+DUPLICATE_LINK_TYPE = "Relates"
+# Prefix of the keys of the titles claimed by the run, which have no issue yet (Jira keys never contain ':')
+CLAIM_PREFIX = "claim:"
+
+
+def title_tokens(title: str) -> set:
+    """
+    Returns the normalized tokens of a title: lowercase words without stopwords and plural endings.
+
+    Parameters
+    ----------
+    title : str
+        Title of a ticket or summary of an issue.
+
+    Returns
+    -------
+    tokens: set
+    """
+    tokens = set()
+    for word in TOKEN.findall(title.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+
+    return tokens
+
+
+class DuplicateIndex:
+    """
+    A class used to represent a local index of the summaries of the existing issues of a Jira project,
+    used to find titles that were already filed before any LLM call is spent on them.
+
+    Titles are compared by their normalized tokens, weighted by their inverse document frequency (IDF),
+    so matching rare words ('pdf', 'oauth') counts more than matching frequent ones ('page', 'user').
+    An inverted index maps every token to the issues containing it, so only issues sharing a token
+    with the title are scored.
+
+    The index is filled by a paged fetch of all issues of the project and then refreshed incrementally with
+    the issues updated since the last refresh. It is kept in a JSON file between runs.
+
+    A title that passes the check is claimed, so the titles checked after it in the same run are compared
+    with it before its issue exists (e.g. two rows of a batch with the same title). Claims are not saved.
+
+    Attributes
+    ----------
+    path : str
+        Path of the JSON file of the index. None keeps the index in memory only.
+    threshold : float
+        Minimum similarity (0 to 1) of a title and an issue summary to report the issue as a duplicate.
+    updated : str
+        Latest 'updated' timestamp of the fetched issues, or None before the first refresh.
+
+    Methods
+    -------
+    refresh(jira_manager: JiraClientManager) -> int
+        Fetches the issues created or updated since the last refresh, returning their number.
+
+    add(issue_key: str, summary: str, updated: str) -> None
+        Adds or replaces the summary of an issue.
+
+    find(title: str, limit: int) -> list
+        Returns the issues whose summary is similar to the title, most similar first.
+
+    claim(title: str, limit: int) -> list
+        Returns the issues and claimed titles similar to the title, claiming the title if there are none.
+
+    release(title: str) -> None
+        Releases the claim of a title whose ticket was not generated.
+
+    save() -> None
+        Writes the index to its JSON file.
+    """
+
+    def __init__(self, path: str = None, threshold: float = 0.75):
+        self.path = path
+        self.threshold = threshold
+        self.updated = None
+        self._summaries = {}
+        self._tokens = {}
+        self._postings = {}
+        self._claims = set()
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._summaries) - len(self._claims)
+
+    def _load(self) -> None:
+        """
+        Reads the index from its JSON file. A damaged file is ignored, so the index is fetched again.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring the duplicate index {self.path}. Error: {str(e)}")
+            return
+
+        self.updated = data.get("updated")
+        for issue_key, summary in data.get("issues", {}).items():
+            self._add(issue_key, summary)
+
+    def save(self) -> None:
+        """
+        Writes the index to its JSON file (atomically, through a temporary file).
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.path is None:
+            return
+
+        with self._lock:
+            issues = {key: summary for key, summary in self._summaries.items() if key not in self._claims}
+            data = {"updated": self.updated, "issues": issues}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary_path, self.path)
+
+    def _add(self, issue_key: str, summary: str) -> None:
+        """
+        Adds or replaces the summary of an issue in the inverted index. The lock must be held.
+        """
+        for token in self._tokens.get(issue_key, ()):
+            self._postings[token].discard(issue_key)
+
+        tokens = title_tokens(summary)
+        self._summaries[issue_key] = summary
+        self._tokens[issue_key] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(issue_key)
+
+    def _remove(self, issue_key: str) -> None:
+        """
+        Removes an issue (or claim) from the inverted index. The lock must be held.
+        """
+        for token in self._tokens.pop(issue_key, ()):
+            self._postings[token].discard(issue_key)
+        self._summaries.pop(issue_key, None)
+        self._claims.discard(issue_key)
+
+    def add(self, issue_key: str, summary: str, updated: str = None) -> None:
+        """
+        Adds or replaces the summary of an issue, e.g. of an issue created by this run.
+
+        Parameters
+        ----------
+        issue_key : str
+            Key of the issue.
+        summary : str
+            Summary of the issue.
+        updated : str
+            'updated' timestamp of the issue in the Jira format, if known.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._add(issue_key, summary)
+            # The issue of a claimed title replaces its claim
+            self._remove(_claim_key(summary))
+            if updated is not None and (self.updated is None or _parse(updated) > _parse(self.updated)):
+                self.updated = updated
+
+    def refresh(self, jira_manager) -> int:
+        """
+        Fetches the issues of the project created or updated since the last refresh (all issues the first time)
+        page by page and adds them to the index.
+
+        Parameters
+        ----------
+        jira_manager : JiraClientManager
+            The Jira client manager of the project.
+
+        Returns
+        -------
+        fetched: int
+            Number of fetched issues.
+        """
+        updated_since = None
+        if self.updated is not None:
+            updated_since = (_parse(self.updated) - REFRESH_OVERLAP).strftime(JQL_TIMESTAMP_FORMAT)
+
+        fetched = 0
+        with metrics.timer("duplicate_index_refresh"):
+            for issue_key, summary, updated in jira_manager.iter_issue_summaries(updated_since):
+                self.add(issue_key, summary, updated)
+                fetched += 1
+
+        return fetched
+
+    def _find(self, tokens: set, limit: int) -> list:
+        """
+        Returns the issues and claimed titles similar to the tokens of a title. The lock must be held.
+        """
+        document_count = len(self._summaries)
+
+        def weight(token: str) -> float:
+            return math.log((document_count + 1) / (len(self._postings.get(token, ())) + 1)) + 1
+
+        candidates = set()
+        for token in tokens:
+            candidates.update(self._postings.get(token, ()))
+
+        matches = []
+        for issue_key in candidates:
+            issue_tokens = self._tokens[issue_key]
+            common = sum(weight(token) for token in tokens & issue_tokens)
+            score = common / sum(weight(token) for token in tokens | issue_tokens)
+            if score >= self.threshold:
+                matches.append(
+                    {
+                        "key": None if issue_key in self._claims else issue_key,
+                        "summary": self._summaries[issue_key],
+                        "score": round(score, 3),
+                    }
+                )
+
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:limit]
+
+    def find(self, title: str, limit: int = 3) -> list:
+        """
+        Returns the issues whose summary is similar to the title: the IDF-weighted share of the tokens of both
+        that they have in common (weighted Jaccard similarity) is at least the threshold of the index.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        limit : int
+            Maximum number of issues returned.
+
+        Returns
+        -------
+        matches: list
+            Dicts with the key, summary and similarity (score) of the issues, most similar first.
+            The key of a title claimed by the run is None.
+        """
+        tokens = title_tokens(title)
+        if not tokens:
+            return []
+
+        with self._lock:
+            matches = self._find(tokens, limit)
+
+        if matches:
+            metrics.increment("duplicate_titles")
+        return matches
+
+    def claim(self, title: str, limit: int = 3) -> list:
+        """
+        Returns the issues and claimed titles similar to the title, like find(). If there are none, the title
+        is claimed in the same step, so concurrent workers checking the same title cannot both pass.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        limit : int
+            Maximum number of issues returned.
+
+        Returns
+        -------
+        matches: list
+            Dicts with the key (None for a claimed title), summary and similarity (score), most similar first.
+        """
+        tokens = title_tokens(title)
+        if not tokens:
+            return []
+
+        with self._lock:
+            matches = self._find(tokens, limit)
+            if not matches:
+                self._add(_claim_key(title), title)
+                self._claims.add(_claim_key(title))
+
+        if matches:
+            metrics.increment("duplicate_titles")
+        return matches
+
+    def release(self, title: str) -> None:
+        """
+        Releases the claim of a title, e.g. because its ticket failed to be generated.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if _claim_key(title) in self._claims:
+                self._remove(_claim_key(title))
+
+
+def _claim_key(title: str) -> str:
+    """
+    Returns the key under which a title claimed by the run is indexed.
+    """
+    return CLAIM_PREFIX + " ".join(title.lower().split())
+
+
+def _parse(timestamp: str) -> datetime:
+    """
+    Returns the datetime of an 'updated' timestamp of Jira.
+    """
+    return datetime.strptime(timestamp, JIRA_TIMESTAMP_FORMAT)
+
+
+def describe_matches(title: str, matches: list) -> str:
+    """
+    Returns the warning printed for a title that duplicates existing issues.
+    """
+    lines = [f"The title '{title}' is similar to existing issues:"]
+    lines.extend(
+        f"    {match['key'] or 'earlier title of this run'}: {match['summary']} (similarity {match['score']:.2f})"
+        for match in matches
+    )
+    return "\n".join(lines)
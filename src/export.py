@@ -0,0 +1,199 @@
+import os
+import csv
+import json
+import threading
+from metrics import metrics
+
+# Columns of the export for the Jira CSV importer. Sub-tasks refer to the Issue Id of their parent.
+CSV_COLUMNS = ["Issue Id", "Parent Id", "Summary", "Issue Type", "Priority", "Description", "Labels"]
+# Size of the write buffer of the export file in bytes
+FILE_BUFFER_BYTES = 1 << 20
+
+
+class ExportSink:
+    """
+    A class used to represent a Jira bulk-import file that generated tickets are streamed into, as an alternative
+    to uploading every ticket with its own REST calls. The format follows the extension of the file:
+    - .csv: the format of the Jira CSV importer (one row per issue, sub-tasks linked by 'Parent Id').
+    - .json: the format of the Jira JSON importer (issues of one project, sub-tasks linked by 'sub-task-link').
+
+    Rows are collected in memory and written in blocks of buffer_rows tickets through a large file buffer,
+    so a long migration does not pay a system call per ticket. The file is complete once close() is called.
+
+    Attributes
+    ----------
+    path : str
+        Path of the export file.
+    output_format : str
+        'csv' or 'json'.
+    project_key : str
+        Key of the Jira project the issues are imported into (required by the JSON format).
+    buffer_rows : int
+        Number of tickets collected before they are written to the file.
+    exported : int
+        Number of tickets exported so far.
+
+    Methods
+    -------
+    write(ticket: Ticket) -> str
+        Adds a generated ticket (and its sub-tasks) to the export, returning its id in the file.
+
+    flush() -> None
+        Writes the collected tickets to the file.
+
+    close() -> None
+        Writes the remaining tickets, completes the file and closes it.
+    """
+
+    def __init__(self, path: str, project_key: str = None, buffer_rows: int = 100):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in (".csv", ".json"):
+            raise ValueError(f"Unsupported export file format: '{extension}'")
+
+        self.path = path
+        self.output_format = extension[1:]
+        if self.output_format == "json" and not project_key:
+            raise ValueError("The JSON export needs the key of the Jira project the issues are imported into.")
+
+        self.project_key = project_key
+        self.buffer_rows = max(1, buffer_rows)
+        self.exported = 0
+        self._next_id = 1
+        self._buffer = []
+        self._written = 0
+        self._links = []
+        self._lock = threading.Lock()
+
+        self._file = open(path, "w", newline="", encoding="utf-8", buffering=FILE_BUFFER_BYTES)
+        if self.output_format == "csv":
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(CSV_COLUMNS)
+        else:
+            self._file.write(f'{{"projects": [{{"key": {json.dumps(project_key)}, "issues": [\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _issue_id(self) -> str:
+        issue_id = str(self._next_id)
+        self._next_id += 1
+        return issue_id
+
+    def _add_issue(self, fields: dict, parent_id: str = None) -> str:
+        """
+        Adds the fields of one issue (as returned by Ticket.issue_fields()) to the buffer, returning its id.
+        """
+        issue_id = self._issue_id()
+
+        if self.output_format == "csv":
+            self._buffer.append(
+                [
+                    issue_id,
+                    parent_id or "",
+                    fields["summary"],
+                    fields["issuetype"]["name"],
+                    fields["priority"]["name"],
+                    fields["description"],
+                    " ".join(fields.get("labels", [])),
+                ]
+            )
+        else:
+            issue = {
+                "externalId": issue_id,
+                "summary": fields["summary"],
+                "issueType": fields["issuetype"]["name"],
+                "priority": fields["priority"]["name"],
+                "description": fields["description"],
+            }
+            if fields.get("labels"):
+                issue["labels"] = fields["labels"]
+            self._buffer.append(json.dumps(issue, ensure_ascii=False))
+            if parent_id is not None:
+                self._links.append({"name": "sub-task-link", "sourceId": issue_id, "destinationId": parent_id})
+
+        return issue_id
+
+    def write(self, ticket) -> str:
+        """
+        Adds a generated ticket to the export, followed by its sub-tasks if the ticket creates sub-tasks.
+
+        Parameters
+        ----------
+        ticket : Ticket
+            A ticket whose body was generated.
+
+        Returns
+        -------
+        issue_id: str
+            Id of the issue of the ticket in the export file.
+        """
+        credentials = {"key": self.project_key}
+
+        with self._lock:
+            issue_id = self._add_issue(ticket.issue_fields(credentials))
+            if ticket.subtask_issue_type is not None:
+                for fields in ticket.subtask_fields(credentials, issue_id):
+                    self._add_issue(fields, parent_id=issue_id)
+
+            self.exported += 1
+            if self.exported % self.buffer_rows == 0:
+                self._flush()
+
+        metrics.increment("tickets_exported")
+        return issue_id
+
+    def _flush(self) -> None:
+        """
+        Writes the buffered rows to the file. The lock must be held.
+        """
+        if not self._buffer:
+            return
+
+        if self.output_format == "csv":
+            self._writer.writerows(self._buffer)
+        else:
+            # Issues are separated by commas, also from the ones of earlier blocks
+            separator = ",\n" if self._written else ""
+            self._file.write(separator + ",\n".join(self._buffer))
+        self._written += len(self._buffer)
+        self._buffer = []
+
+    def flush(self) -> None:
+        """
+        Writes the collected tickets to the file.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._flush()
+            self._file.flush()
+
+    def close(self) -> None:
+        """
+        Writes the remaining tickets, completes the file and closes it.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._flush()
+            if self.output_format == "json":
+                self._file.write(f'\n]}}], "links": {json.dumps(self._links)}}}\n')
+            self._file.close()
@@ -0,0 +1,264 @@
+import os
+import threading
+from classifier import title_features
+from metrics import metrics
+from model import TicketDocument
+
+# Sections of a ticket that are lists of items
+LIST_SECTIONS = ["acceptance_criteria", "subtasks", "assumptions"]
+
+
+class ExampleIndex:
+    """
+    A class used to represent a local vector index of previously accepted tickets, used to build the few-shot
+    examples of the prompts from the tickets most similar to the title instead of the same static example.
+    Above an optional threshold, the sections of a similar ticket are reused as they are, without any LLM call.
+
+    Titles are embedded as hashed TF-IDF vectors of their words and pairs of words (the features of the issue
+    type classifier), and compared by cosine similarity. The vectors are kept sparse and scored with NumPy,
+    so a search costs one pass over the non-zero entries of the index.
+
+    The tickets are kept in a JSONL file of TicketDocument lines (the format of --archive), to which every
+    ticket added by a run is appended. A later line for the same title replaces the earlier ones.
+
+    NumPy is imported on first use, so runs without an example index do not load it.
+
+    Attributes
+    ----------
+    path : str
+        Path of the JSONL file of the tickets. None keeps the index in memory only.
+    examples : int
+        Maximum number of similar tickets used as examples in a prompt.
+    min_similarity : float
+        Minimum cosine similarity (0 to 1) of a title and a ticket to use the ticket as an example.
+    reuse_threshold : float
+        Minimum similarity to reuse the sections of a ticket as they are. None never reuses sections.
+    n_features : int
+        Number of columns of the hashed feature space.
+
+    Methods
+    -------
+    add(document: TicketDocument) -> None
+        Adds an accepted ticket to the index (and to its file).
+
+    search(title: str, limit: int) -> list
+        Returns the (similarity, ticket) pairs most similar to the title, most similar first.
+
+    examples_for(title: str, section: str) -> list
+        Returns the similar tickets that can serve as examples of a section.
+
+    reusable(title: str) -> tuple
+        Returns the (similarity, ticket) pair whose sections can be reused for the title, or None.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        examples: int = 2,
+        min_similarity: float = 0.1,
+        reuse_threshold: float = None,
+        n_features: int = 1 << 16,
+    ):
+        self.path = path
+        self.examples = examples
+        self.min_similarity = min_similarity
+        self.reuse_threshold = reuse_threshold
+        self.n_features = n_features
+        self._documents = []
+        self._columns = []
+        self._positions = {}
+        self._vectors = None
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            for document in TicketDocument.read_jsonl(path):
+                self._add(document)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _add(self, document: TicketDocument) -> None:
+        """
+        Adds a ticket, replacing the ticket with the same title. The lock must be held.
+        """
+        key = document.title.strip().lower()
+        columns = title_features(document.title, self.n_features)
+        if key in self._positions:
+            self._documents[self._positions[key]] = document
+            self._columns[self._positions[key]] = columns
+        else:
+            self._positions[key] = len(self._documents)
+            self._documents.append(document)
+            self._columns.append(columns)
+        # The vectors are built again on the next search
+        self._vectors = None
+
+    def add(self, document: TicketDocument) -> None:
+        """
+        Adds an accepted ticket to the index and appends it to the file of the index.
+
+        Parameters
+        ----------
+        document : TicketDocument
+            Structured content of the ticket.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._add(document)
+            if self.path is not None:
+                TicketDocument.write_jsonl([document], self.path)
+
+    def _build(self) -> tuple:
+        """
+        Returns the sparse TF-IDF vectors of the titles (row, column and value of every non-zero entry,
+        with unit-length rows) and the IDF of every column. The lock must be held.
+        """
+        import numpy as np
+
+        if self._vectors is not None:
+            return self._vectors
+
+        n = self.n_features
+        columns = self._columns
+        lengths = np.fromiter((len(title_columns) for title_columns in columns), dtype=np.int64, count=len(columns))
+        rows = np.repeat(np.arange(len(columns), dtype=np.int64), lengths)
+        flat_columns = np.fromiter(
+            (column for title_columns in columns for column in title_columns), dtype=np.int64, count=int(lengths.sum())
+        )
+
+        # One entry per (title, column) with the number of occurrences of the feature in the title
+        entries, counts = np.unique(rows * n + flat_columns, return_counts=True)
+        rows, flat_columns = entries // n, entries % n
+
+        document_frequency = np.bincount(flat_columns, minlength=n)
+        idf = np.log((len(columns) + 1) / (document_frequency + 1)) + 1
+        values = counts * idf[flat_columns]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(columns)))
+        values = values / np.maximum(norms, 1e-12)[rows]
+
+        self._vectors = (rows, flat_columns, values, idf)
+        return self._vectors
+
+    def search(self, title: str, limit: int = None) -> list:
+        """
+        Returns the tickets whose title is most similar to the title (cosine similarity of their TF-IDF vectors).
+
+        Parameters
+        ----------
+        title : str
+            Title of the new ticket.
+        limit : int
+            Maximum number of tickets returned (by default the number of examples of the index).
+
+        Returns
+        -------
+        matches: list
+            (similarity, TicketDocument) pairs with a similarity of at least min_similarity, most similar first.
+        """
+        import numpy as np
+
+        limit = self.examples if limit is None else limit
+        query_columns = title_features(title, self.n_features)
+        if limit <= 0 or not query_columns:
+            return []
+
+        with self._lock:
+            if not self._documents:
+                return []
+
+            with metrics.timer("example_search"):
+                rows, columns, values, idf = self._build()
+
+                query = np.zeros(self.n_features)
+                np.add.at(query, query_columns, 1.0)
+                query *= idf
+                query /= np.linalg.norm(query)
+
+                scores = np.bincount(rows, weights=values * query[columns], minlength=len(self._documents))
+                best = np.argsort(-scores, kind="stable")[:limit]
+                matches = [
+                    (round(float(scores[index]), 3), self._documents[index])
+                    for index in best
+                    if scores[index] >= self.min_similarity
+                ]
+
+        return matches
+
+    def examples_for(self, title: str, section: str) -> list:
+        """
+        Returns the similar tickets that can serve as examples of a section: tickets with parsed items
+        for a list section, or with a text for the description.
+
+        Parameters
+        ----------
+        title : str
+            Title of the new ticket.
+        section : str
+            Name of the section (or 'all' for tickets with all sections).
+
+        Returns
+        -------
+        documents: list
+            TicketDocument instances, most similar first.
+        """
+        sections = ["description"] + LIST_SECTIONS if section == "all" else [section]
+
+        examples = [
+            document
+            for _, document in self.search(title, limit=self.examples * 2)
+            if all(_has_content(document, name) for name in sections)
+        ][: self.examples]
+
+        metrics.increment("few_shot_examples", len(examples), section=section)
+        return examples
+
+    def reusable(self, title: str) -> tuple:
+        """
+        Returns the most similar ticket if its similarity reaches the reuse threshold and all its sections
+        have content, so they can be reused for the title as they are.
+
+        Parameters
+        ----------
+        title : str
+            Title of the new ticket.
+
+        Returns
+        -------
+        match: tuple
+            (similarity, TicketDocument) pair, or None.
+        """
+        if self.reuse_threshold is None:
+            return None
+
+        for score, document in self.search(title, limit=1):
+            if score >= self.reuse_threshold and all(
+                _has_content(document, name) for name in ["description"] + LIST_SECTIONS
+            ):
+                return score, document
+
+        return None
+
+
+def _has_content(document: TicketDocument, section: str) -> bool:
+    """
+    Returns True if the section of the ticket has parsed items (list sections) or a text (description).
+    """
+    content = document.sections.get(section)
+    if content is None:
+        return False
+    if section == "description":
+        return bool(content.text)
+    return bool(content.items)
+
+
+def format_items(items) -> list:
+    """
+    Returns the lines of a list section in the format the prompts ask for: 'number. short title: description'.
+    """
+    return [
+        f"{number}. {title}: {' '.join(descriptions)}".rstrip(": ")
+        for number, (title, descriptions) in enumerate(items, start=1)
+    ]
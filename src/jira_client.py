@@ -0,0 +1,335 @@
+import threading
+from metrics import metrics
+from ratelimit import scheduler
+
+# Jira accepts at most 50 issues per bulk-create request
+JIRA_BULK_LIMIT = 50
+
+# Shared managers of this process, keyed on (server, email_address, project key), since the
+# metadata they cache (project, issue types, labels) belongs to the project of the credentials
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+class JiraClientManager:
+    """
+    A class used to represent a long-lived Jira client that is shared by all tickets of the process.
+    The client keeps its HTTP connections alive in the pool of its session (the default pool of
+    requests, up to 10 connections per host), so the connection setup and the server-info round trip
+    are only paid once, and it can be used by concurrent workers.
+
+    Attributes
+    ----------
+    jira_credentials : dict
+        A dictionary containing the credentials needed to connect with Jira.
+
+    Methods
+    -------
+    client() -> JIRA
+        Returns the shared Jira client, connecting on first use.
+
+    project(refresh: bool) -> dict
+        Returns the metadata of the project of the credentials (fetched once).
+
+    issue_types(refresh: bool) -> list
+        Returns the names of the issue types available in the project (fetched once).
+
+    priorities(refresh: bool) -> list
+        Returns the names of the priorities of the Jira server (fetched once).
+
+    find_issue_by_label(label: str) -> str
+        Returns the key of an issue of the project with the given label, or None.
+
+    create_issues(field_list: list, chunk_size: int) -> list
+        Creates issues with as few bulk requests as possible, returning the key or error of every issue.
+
+    iter_issue_summaries(updated_since: str, page_size: int) -> iterator
+        Yields the key, summary and update time of the issues of the project, fetched page by page.
+
+    link_issues(link_type: str, inward_key: str, outward_key: str) -> None
+        Links two issues.
+    """
+
+    def __init__(self, jira_credentials: dict):
+        self.jira_credentials = jira_credentials
+        self._client = None
+        self._metadata = {}
+        self._lock = threading.Lock()
+
+    def client(self):
+        """
+        Returns the shared Jira client, connecting on first use.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        jira: JIRA
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Imported on first use, so runs that never reach Jira do not pay for it
+                    from jira import JIRA
+
+                    with scheduler.jira.request():
+                        jira = JIRA(
+                            options={"server": self.jira_credentials["server"]},
+                            basic_auth=(
+                                self.jira_credentials["email_address"],
+                                self.jira_credentials["token"],
+                            ),
+                        )
+                    self._client = jira
+
+        return self._client
+
+    def _cached(self, name: str, fetch, refresh: bool = False):
+        """
+        Returns the cached metadata with the given name, calling fetch() the first time (or again if refresh is True).
+        """
+        if refresh or name not in self._metadata:
+            # Connect first, so the request below is the only one holding a Jira slot
+            self.client()
+            with self._lock:
+                if refresh or name not in self._metadata:
+                    with scheduler.jira.request():
+                        self._metadata[name] = fetch()
+
+        return self._metadata[name]
+
+    def project(self, refresh: bool = False) -> dict:
+        """
+        Returns the metadata of the project of the credentials (fetched once).
+
+        Parameters
+        ----------
+        refresh : bool
+            If True, the metadata is fetched again.
+
+        Returns
+        -------
+        project: dict
+            - id (str), key (str) and name (str) of the project.
+        """
+
+        def fetch() -> dict:
+            project = self.client().project(self.jira_credentials["key"])
+            return {"id": project.id, "key": project.key, "name": project.name}
+
+        return self._cached("project", fetch, refresh)
+
+    def issue_types(self, refresh: bool = False) -> list:
+        """
+        Returns the names of the issue types available in the project (fetched once).
+
+        Parameters
+        ----------
+        refresh : bool
+            If True, the issue types are fetched again.
+
+        Returns
+        -------
+        issue_types: list
+        """
+
+        def fetch() -> list:
+            project = self.client().project(self.jira_credentials["key"])
+            return [issue_type.name for issue_type in project.issueTypes]
+
+        return self._cached("issue_types", fetch, refresh)
+
+    def priorities(self, refresh: bool = False) -> list:
+        """
+        Returns the names of the priorities of the Jira server (fetched once).
+
+        Parameters
+        ----------
+        refresh : bool
+            If True, the priorities are fetched again.
+
+        Returns
+        -------
+        priorities: list
+        """
+
+        def fetch() -> list:
+            return [priority.name for priority in self.client().priorities()]
+
+        return self._cached("priorities", fetch, refresh)
+
+    def find_issue_by_label(self, label: str) -> str:
+        """
+        Returns the key of an issue of the project with the given label.
+
+        Parameters
+        ----------
+        label : str
+            Label of the issue.
+
+        Returns
+        -------
+        issue_key: str
+            Key of the first issue found. None is returned if there is no issue with the label.
+        """
+        jql = f'project = "{self.jira_credentials["key"]}" AND labels = "{label}"'
+        jira = self.client()
+        with scheduler.jira.request():
+            issues = jira.search_issues(jql, maxResults=1, fields="summary")
+
+        return issues[0].key if issues else None
+
+    def find_issues_by_labels(self, labels: list) -> dict:
+        """
+        Returns the keys of the issues of the project with any of the given labels, with one search per 100 labels.
+
+        Parameters
+        ----------
+        labels : list
+            Labels of the issues.
+
+        Returns
+        -------
+        issue_keys: dict
+            Key of the first issue found for every label that was found.
+        """
+        jira = self.client()
+        issue_keys = {}
+        wanted = set(labels)
+
+        for start in range(0, len(labels), 100):
+            chunk = ", ".join(f'"{label}"' for label in labels[start : start + 100])
+            jql = f'project = "{self.jira_credentials["key"]}" AND labels in ({chunk})'
+            with scheduler.jira.request():
+                issues = jira.search_issues(jql, maxResults=False, fields="labels")
+
+            for issue in issues:
+                for label in issue.fields.labels or []:
+                    if label in wanted:
+                        issue_keys.setdefault(label, issue.key)
+
+        return issue_keys
+
+    def iter_issue_summaries(self, updated_since: str = None, page_size: int = 100):
+        """
+        Yields the key, summary and update time of the issues of the project, oldest update first.
+        Issues are fetched page by page, so only one page is held at a time.
+
+        Parameters
+        ----------
+        updated_since : str
+            Only issues updated at or after this JQL date (e.g. '2023/10/01 12:34') are fetched. None fetches all issues.
+        page_size : int
+            Number of issues asked for per request (the server may return fewer).
+
+        Returns
+        -------
+        issues: iterator
+            Iterator of (key, summary, updated) tuples.
+        """
+        jql = f'project = "{self.jira_credentials["key"]}"'
+        if updated_since is not None:
+            jql += f' AND updated >= "{updated_since}"'
+        jql += " ORDER BY updated ASC"
+
+        jira = self.client()
+        start = 0
+        while True:
+            with scheduler.jira.request():
+                issues = jira.search_issues(jql, startAt=start, maxResults=page_size, fields="summary,updated")
+
+            for issue in issues:
+                yield issue.key, issue.fields.summary, issue.fields.updated
+
+            # The server may return fewer issues than asked for (it caps maxResults), so a short page
+            # is not the last one: the search ends on an empty page or once all issues were read
+            start += len(issues)
+            total = getattr(issues, "total", None)
+            if not issues or (total is not None and start >= total):
+                return
+
+    def link_issues(self, link_type: str, inward_key: str, outward_key: str) -> None:
+        """
+        Links two issues, e.g. a new issue to an existing issue with a similar summary.
+
+        Parameters
+        ----------
+        link_type : str
+            Name of the link type (e.g. 'Relates').
+        inward_key : str
+            Key of the inward issue of the link.
+        outward_key : str
+            Key of the outward issue of the link.
+
+        Returns
+        -------
+        None
+        """
+        jira = self.client()
+        with scheduler.jira.request():
+            jira.create_issue_link(type=link_type, inwardIssue=inward_key, outwardIssue=outward_key)
+
+    def create_issues(self, field_list: list, chunk_size: int = JIRA_BULK_LIMIT) -> list:
+        """
+        Creates issues through the bulk-create API, in chunks of at most chunk_size issues.
+        A chunk that fails as a whole reports its error for every issue of the chunk.
+
+        Parameters
+        ----------
+        field_list : list
+            Fields of every issue, as accepted by Jira when creating an issue.
+        chunk_size : int
+            Number of issues sent per bulk request (capped at the Jira limit of 50).
+
+        Returns
+        -------
+        results: list
+            One dict per issue, in the order of field_list:
+            - key (str): key of the created issue, or None.
+            - error (str): error of an issue that was not created, or None.
+        """
+        jira = self.client()
+        chunk_size = max(1, min(chunk_size, JIRA_BULK_LIMIT))
+        results = []
+
+        for start in range(0, len(field_list), chunk_size):
+            chunk = field_list[start : start + chunk_size]
+            try:
+                with metrics.timer("jira_bulk_create"), scheduler.jira.request():
+                    created = jira.create_issues(field_list=chunk, prefetch=False)
+            except Exception as e:
+                results.extend({"key": None, "error": str(e)} for _ in chunk)
+                continue
+
+            for result in created:
+                if result["status"] == "Success":
+                    results.append({"key": result["issue"].key, "error": None})
+                else:
+                    results.append({"key": None, "error": str(result["error"])})
+
+        return results
+
+
+def get_jira_client_manager(jira_credentials: dict) -> JiraClientManager:
+    """
+    Returns the Jira client manager of the process for the given credentials, creating it on first use.
+
+    Parameters
+    ----------
+    jira_credentials: dict
+        A dictionary containing the credentials needed to connect with Jira.
+
+    Returns
+    -------
+    jira_manager: JiraClientManager
+    """
+    key = (jira_credentials["server"], jira_credentials["email_address"], jira_credentials["key"])
+
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = JiraClientManager(jira_credentials)
+        jira_manager = _managers[key]
+
+    return jira_manager
@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Prefix of the Jira label that identifies the issue of a journaled ticket
+LABEL_PREFIX = "droid-"
+
+
+def ticket_label(title: str) -> str:
+    """
+    Returns the Jira label that identifies the issue of a ticket, so an upload that was interrupted
+    before its key was journaled can be found again instead of being created twice.
+
+    Parameters
+    ----------
+    title : str
+        Title of the ticket.
+
+    Returns
+    -------
+    label: str
+    """
+    digest = hashlib.sha256(title.strip().lower().encode("utf-8")).hexdigest()
+    return f"{LABEL_PREFIX}{digest[:16]}"
+
+
+def subtask_label(title: str, subtask_title: str) -> str:
+    """
+    Returns the Jira label that identifies a sub-task of a ticket, so a sub-task whose creation was interrupted
+    before its key was journaled can be found again instead of being created twice.
+
+    Parameters
+    ----------
+    title : str
+        Title of the ticket.
+    subtask_title : str
+        Title of the sub-task (its summary in Jira).
+
+    Returns
+    -------
+    label: str
+    """
+    return ticket_label(f"{title}\n{subtask_title}")
+
+
+def empty_state() -> dict:
+    """
+    Returns the state of a ticket without any completed stage.
+    """
+    return {
+        "sections": {},
+        "body": None,
+        "priority": None,
+        "upload_started": False,
+        "issue_key": None,
+        "subtasks_started": [],
+        "subtask_keys": {},
+    }
+
+
+class Journal:
+    """
+    A class used to represent an append-only journal of the completed stages of every ticket.
+    Every stage is written as one JSON line and flushed to disk before the next stage starts, so after a crash
+    a rerun with the same input skips the sections, bodies and issues that were already completed.
+
+    Stages recorded per title:
+    - section: a generated section (name and text)
+    - body: the rendered ticket body (with its priority)
+    - upload: an upload to Jira was started
+    - issue: the Jira issue was created (with its key)
+    - subtask_upload: the creation of Jira sub-tasks was started (with their titles)
+    - subtasks: Jira sub-tasks of the issue were created (with their titles and keys)
+
+    Attributes
+    ----------
+    path : str
+        Path of the JSONL journal file. It is created if it does not exist.
+
+    Methods
+    -------
+    state(title: str) -> dict
+        Returns the completed stages of a ticket.
+
+    record_section(title: str, section: str, text: str) -> None
+        Records a generated section.
+
+    record_body(title: str, priority: str, body: str) -> None
+        Records the rendered body of a ticket.
+
+    record_upload(title: str) -> None
+        Records that the upload of a ticket to Jira was started.
+
+    record_issue(title: str, issue_key: str) -> None
+        Records the key of the Jira issue created for a ticket.
+
+    record_subtask_upload(title: str, subtask_titles: list) -> None
+        Records that the creation of Jira sub-tasks of a ticket was started.
+
+    record_subtasks(title: str, subtask_keys: dict) -> None
+        Records the keys of Jira sub-tasks created for a ticket.
+
+    close() -> None
+        Closes the journal file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._states = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self) -> None:
+        """
+        Rebuilds the state of every ticket from the journal file.
+        A line that was only partly written when the process died is ignored.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(record)
+
+    def _apply(self, record: dict) -> None:
+        """
+        Applies one journal record to the state of its ticket.
+        """
+        state = self._states.setdefault(record["title"], empty_state())
+
+        if record["stage"] == "section":
+            state["sections"][record["section"]] = record["text"]
+        elif record["stage"] == "body":
+            state["body"] = record["body"]
+            state["priority"] = record["priority"]
+        elif record["stage"] == "upload":
+            state["upload_started"] = True
+        elif record["stage"] == "issue":
+            state["issue_key"] = record["issue_key"]
+        elif record["stage"] == "subtask_upload":
+            state["subtasks_started"] = state["subtasks_started"] + [
+                subtask_title for subtask_title in record["subtask_titles"] if subtask_title not in state["subtasks_started"]
+            ]
+        elif record["stage"] == "subtasks":
+            state["subtask_keys"] = {**state["subtask_keys"], **record["subtask_keys"]}
+
+    def _append(self, record: dict) -> None:
+        """
+        Appends a record to the journal and forces it to disk.
+        """
+        record["time"] = time.time()
+        line = json.dumps(record) + "\n"
+
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(record)
+
+    def state(self, title: str) -> dict:
+        """
+        Returns the completed stages of a ticket.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+
+        Returns
+        -------
+        state: dict
+            - sections (dict): generated sections keyed on their name.
+            - body (str): rendered body, or None.
+            - priority (str): priority the body was rendered with, or None.
+            - upload_started (bool): True if an upload to Jira was started.
+            - issue_key (str): key of the created Jira issue, or None.
+            - subtasks_started (list): titles of the sub-tasks whose creation was started.
+            - subtask_keys (dict): keys of the created Jira sub-tasks, keyed on their titles.
+        """
+        with self._lock:
+            state = self._states.get(title)
+            if state is None:
+                return empty_state()
+            return {**state, "sections": dict(state["sections"])}
+
+    def record_section(self, title: str, section: str, text: str) -> None:
+        """
+        Records a generated section of a ticket.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        section : str
+            Name of the section.
+        text : str
+            Text of the section.
+
+        Returns
+        -------
+        None
+        """
+        self._append({"title": title, "stage": "section", "section": section, "text": text})
+
+    def record_body(self, title: str, priority: str, body: str) -> None:
+        """
+        Records the rendered body of a ticket.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        priority : str
+            Priority the body was rendered with.
+        body : str
+            Rendered body of the ticket.
+
+        Returns
+        -------
+        None
+        """
+        self._append({"title": title, "stage": "body", "priority": priority, "body": body})
+
+    def record_upload(self, title: str) -> None:
+        """
+        Records that the upload of a ticket to Jira was started.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+
+        Returns
+        -------
+        None
+        """
+        self._append({"title": title, "stage": "upload"})
+
+    def record_issue(self, title: str, issue_key: str) -> None:
+        """
+        Records the key of the Jira issue created for a ticket.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        issue_key : str
+            Key of the created issue.
+
+        Returns
+        -------
+        None
+        """
+        self._append({"title": title, "stage": "issue", "issue_key": issue_key})
+
+    def record_subtask_upload(self, title: str, subtask_titles: list) -> None:
+        """
+        Records that the creation of Jira sub-tasks of a ticket was started.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        subtask_titles : list
+            Titles of the sub-tasks being created.
+
+        Returns
+        -------
+        None
+        """
+        self._append({"title": title, "stage": "subtask_upload", "subtask_titles": subtask_titles})
+
+    def record_subtasks(self, title: str, subtask_keys: dict) -> None:
+        """
+        Records the keys of Jira sub-tasks created for a ticket. Sub-tasks journaled before are kept.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        subtask_keys : dict
+            Keys of the created sub-tasks, keyed on their titles.
+
+        Returns
+        -------
+        None
+        """
+        self._append({"title": title, "stage": "subtasks", "subtask_keys": subtask_keys})
+
+    def close(self) -> None:
+        """
+        Closes the journal file.
+        """
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import random
+import threading
+
+# Number of values of a timer or observation kept to estimate its percentiles
+RESERVOIR_SIZE = 1024
+
+
+class _NullTimer:
+    """
+    Timer returned while the metrics are disabled. It does nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Series:
+    """
+    Running statistics of a timer or observation. The count, sum, min and max are exact, and the percentiles
+    are estimated from a uniform sample of at most RESERVOIR_SIZE values (reservoir sampling), so the memory
+    of a long-running process stays bounded however many values are recorded.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        self.reservoir = []
+
+    def add(self, value: float, rng: random.Random) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(value)
+        else:
+            # Every value recorded so far stays in the sample with the same probability
+            index = rng.randrange(self.count)
+            if index < RESERVOIR_SIZE:
+                self.reservoir[index] = value
+
+    def copy(self) -> "_Series":
+        series = _Series()
+        series.count, series.sum, series.min, series.max = self.count, self.sum, self.min, self.max
+        series.reservoir = list(self.reservoir)
+        return series
+
+
+class _Timer:
+    """
+    Context manager that records its duration in the metrics when it exits.
+    """
+
+    def __init__(self, metrics, name: str, labels: tuple):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start_time
+        self.metrics._record(self.metrics._timers, self.name, self.labels, duration)
+        return False
+
+
+class Metrics:
+    """
+    A class used to represent the timers, counters and size observations of a run.
+    While disabled (the default) every method returns immediately, so the instrumentation costs close to nothing.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether measurements are recorded.
+
+    Methods
+    -------
+    enable() -> None
+        Starts recording measurements.
+
+    timer(name: str, **labels) -> context manager
+        Returns a context manager that records the duration of its block in seconds.
+
+    increment(name: str, value: int, **labels) -> None
+        Adds value to a counter.
+
+    observe(name: str, value: float, **labels) -> None
+        Records a value, such as the size of a prompt or response.
+
+    gauge(name: str, value: float, **labels) -> None
+        Sets the current value of a gauge, such as a rate limit.
+
+    summary() -> dict
+        Returns the run summary with the statistics of every timer, counter and observation.
+
+    write_json(file_path: str) -> None
+        Writes the run summary as JSON.
+
+    write_prometheus(file_path: str) -> None
+        Writes all metrics in the Prometheus textfile format.
+    """
+
+    PREFIX = "ticket"
+
+    def __init__(self):
+        self.enabled = False
+        self._timers = {}
+        self._counters = {}
+        self._observations = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def enable(self) -> None:
+        """
+        Starts recording measurements.
+        """
+        self.enabled = True
+
+    def timer(self, name: str, **labels):
+        """
+        Returns a context manager that records the duration of its block in seconds.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage, e.g. 'llm_call'.
+        labels :
+            Labels of the measurement, e.g. section='subtasks'.
+
+        Returns
+        -------
+        timer: context manager
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def increment(self, name: str, value: int = 1, **labels) -> None:
+        """
+        Adds value to the counter with the given name and labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Records a value, such as the size of a prompt or response.
+        """
+        if not self.enabled:
+            return
+        self._record(self._observations, name, tuple(sorted(labels.items())), value)
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        """
+        Sets the current value of the gauge with the given name and labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def _record(self, store: dict, name: str, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = store.get((name, labels))
+            if series is None:
+                series = store[(name, labels)] = _Series()
+            series.add(value, self._random)
+
+    @staticmethod
+    def _statistics(series: _Series) -> dict:
+        """
+        Returns the count, sum, mean, min, max and percentiles of a series.
+        The percentiles are exact up to RESERVOIR_SIZE values and estimated from the sample above.
+        """
+        values = sorted(series.reservoir)
+
+        def percentile(fraction: float) -> float:
+            return values[min(len(values) - 1, int(fraction * len(values)))]
+
+        statistics = {
+            "count": series.count,
+            "sum": series.sum,
+            "mean": series.sum / series.count,
+            "min": series.min,
+            "max": series.max,
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p99": percentile(0.99),
+        }
+        return statistics
+
+    def summary(self) -> dict:
+        """
+        Returns the run summary with the statistics of every timer, counter and observation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        run_summary: dict
+            - timers (list), counters (list), observations (list) and gauges (list), each entry with its name and labels.
+        """
+        with self._lock:
+            timers = {key: series.copy() for key, series in self._timers.items()}
+            counters = dict(self._counters)
+            observations = {key: series.copy() for key, series in self._observations.items()}
+            gauges = dict(self._gauges)
+
+        run_summary = {
+            "timers": [
+                {"name": name, "labels": dict(labels), "seconds": self._statistics(values)}
+                for (name, labels), values in sorted(timers.items())
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            "observations": [
+                {"name": name, "labels": dict(labels), "values": self._statistics(values)}
+                for (name, labels), values in sorted(observations.items())
+            ],
+            "gauges": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(gauges.items())
+            ],
+        }
+        return run_summary
+
+    def write_json(self, file_path: str) -> None:
+        """
+        Writes the run summary as JSON.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the JSON file.
+
+        Returns
+        -------
+        None
+        """
+        with open(file_path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def write_prometheus(self, file_path: str) -> None:
+        """
+        Writes all metrics in the Prometheus textfile format (e.g. for the node exporter textfile collector).
+        Timers and observations are written as summaries, counters as counters and gauges as gauges.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the .prom file.
+
+        Returns
+        -------
+        None
+        """
+
+        def format_labels(labels: dict, **extra_labels) -> str:
+            labels = {**labels, **extra_labels}
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+        run_summary = self.summary()
+        lines = []
+        typed_metrics = set()
+
+        for kind, suffix in [("timers", "_seconds"), ("observations", "")]:
+            value_key = "seconds" if kind == "timers" else "values"
+            for entry in run_summary[kind]:
+                metric = f"{self.PREFIX}_{entry['name']}{suffix}"
+                if metric not in typed_metrics:
+                    typed_metrics.add(metric)
+                    lines.append(f"# TYPE {metric} summary")
+                statistics = entry[value_key]
+                for statistic, quantile in [("p50", "0.5"), ("p90", "0.9"), ("p99", "0.99")]:
+                    labels = format_labels(entry["labels"], quantile=quantile)
+                    lines.append(f"{metric}{labels} {statistics[statistic]}")
+                lines.append(f"{metric}_sum{format_labels(entry['labels'])} {statistics['sum']}")
+                lines.append(f"{metric}_count{format_labels(entry['labels'])} {statistics['count']}")
+
+        for entry in run_summary["counters"]:
+            metric = f"{self.PREFIX}_{entry['name']}_total"
+            if metric not in typed_metrics:
+                typed_metrics.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{format_labels(entry['labels'])} {entry['value']}")
+
+        for entry in run_summary["gauges"]:
+            metric = f"{self.PREFIX}_{entry['name']}"
+            if metric not in typed_metrics:
+                typed_metrics.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{format_labels(entry['labels'])} {entry['value']}")
+
+        # Write to a temporary file first, so the collector never reads a partial file
+        temporary_path = f"{file_path}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, file_path)
+
+
+# Metrics of the process, shared by all tickets
+metrics = Metrics()
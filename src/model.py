@@ -0,0 +1,219 @@
+import re
+import json
+
+# Item of a list in Jira wiki markup, as rendered by renderers.render_jira_list():
+# *number. title*: description, or *number. title* followed by subpoints
+JIRA_ITEM = re.compile(r"^\*\d+\. (.+?)\*(?:: ?(.*)| ?)$")
+# Subpoint of a list in Jira wiki markup
+JIRA_SUBPOINT = re.compile(r"^\s+- (.*)$")
+
+
+class Section:
+    """
+    A class used to represent one section of a ticket.
+    List sections keep their parsed items, so they can be rendered in any format without parsing them again.
+    Sections that are not lists (the description), or whose text could not be parsed, keep their text.
+
+    Attributes
+    ----------
+    name : str
+        Name of the section (e.g. 'subtasks').
+    items : tuple
+        The (title, descriptions) items of a list section, descriptions being a tuple of strings. None for text sections.
+    text : str
+        The text of a section without items. None for list sections.
+
+    Methods
+    -------
+    from_items(name: str, items) -> Section
+        Returns a list section from (title, descriptions) pairs, e.g. the items of a parsed response dict.
+
+    from_jira_text(name: str, text: str) -> Section
+        Returns a section from its text in Jira wiki markup, keeping the items if the text is a list.
+
+    to_record() -> list
+        Returns the compact JSON representation of the section.
+
+    from_record(record: list) -> Section
+        Returns the section of a compact JSON representation.
+    """
+
+    __slots__ = ("name", "items", "text")
+
+    def __init__(self, name: str, items: tuple = None, text: str = None):
+        self.name = name
+        self.items = items
+        self.text = text
+
+    @classmethod
+    def from_items(cls, name: str, items) -> "Section":
+        """
+        Returns a list section from (title, descriptions) pairs, e.g. response_dict.items().
+        """
+        return cls(name, items=tuple((title, tuple(descriptions)) for title, descriptions in items))
+
+    @classmethod
+    def from_jira_text(cls, name: str, text: str) -> "Section":
+        """
+        Returns a section from its text in Jira wiki markup. The items of a list are kept only if they describe
+        the whole text, so text that was edited by hand is never lost.
+
+        Parameters
+        ----------
+        name : str
+            Name of the section.
+        text : str
+            Text of the section in Jira wiki markup.
+
+        Returns
+        -------
+        section: Section
+        """
+        items = []
+        # Subpoints follow an item without a description on its own line
+        accepts_subpoints = False
+
+        for line in text.split("\n"):
+            if not line.strip():
+                continue
+
+            item = JIRA_ITEM.match(line)
+            if item:
+                description = item.group(2)
+                items.append((item.group(1), [description] if description is not None else []))
+                accepts_subpoints = description is None
+                continue
+
+            subpoint = JIRA_SUBPOINT.match(line)
+            if subpoint and accepts_subpoints:
+                items[-1][1].append(subpoint.group(1))
+                continue
+
+            # A line that is not part of a list: keep the text as it is
+            return cls(name, text=text.strip())
+
+        if not items:
+            return cls(name, text=text.strip())
+
+        return cls.from_items(name, items)
+
+    def to_record(self) -> list:
+        """
+        Returns the compact JSON representation of the section: [name, items] or [name, text].
+        """
+        if self.items is not None:
+            return [self.name, [[title, list(descriptions)] for title, descriptions in self.items]]
+        return [self.name, self.text]
+
+    @classmethod
+    def from_record(cls, record: list) -> "Section":
+        """
+        Returns the section of a compact JSON representation.
+        """
+        name, content = record
+        if isinstance(content, list):
+            return cls.from_items(name, content)
+        return cls(name, text=content)
+
+
+class TicketDocument:
+    """
+    A class used to represent the structured content of a ticket, which any renderer can turn into text.
+
+    Attributes
+    ----------
+    title : str
+        Title of the ticket.
+    priority : str
+        Priority of the ticket.
+    sections : dict
+        The Section of every section name, in the order of the ticket.
+    issue_key : str
+        Key of the Jira issue of the ticket, or None.
+
+    Methods
+    -------
+    to_json() -> str
+        Returns the ticket as one compact line of JSON.
+
+    from_json(line: str) -> TicketDocument
+        Returns the ticket of a line of JSON.
+
+    write_jsonl(documents: list, file_path: str) -> None
+        Appends tickets to a JSONL file, one line per ticket.
+
+    read_jsonl(file_path: str) -> iterator
+        Yields the tickets of a JSONL file one by one.
+    """
+
+    __slots__ = ("title", "priority", "sections", "issue_key")
+
+    def __init__(self, title: str, priority: str, sections: dict, issue_key: str = None):
+        self.title = title
+        self.priority = priority
+        self.sections = sections
+        self.issue_key = issue_key
+
+    def to_json(self) -> str:
+        """
+        Returns the ticket as one compact line of JSON.
+        """
+        record = {
+            "title": self.title,
+            "priority": self.priority,
+            "issue_key": self.issue_key,
+            "sections": [section.to_record() for section in self.sections.values()],
+        }
+        return json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> "TicketDocument":
+        """
+        Returns the ticket of a line of JSON written by to_json().
+        """
+        record = json.loads(line)
+        sections = {}
+        for section_record in record["sections"]:
+            section = Section.from_record(section_record)
+            sections[section.name] = section
+
+        return cls(record["title"], record["priority"], sections, record.get("issue_key"))
+
+    @staticmethod
+    def write_jsonl(documents: list, file_path: str) -> None:
+        """
+        Appends tickets to a JSONL file, one line per ticket.
+
+        Parameters
+        ----------
+        documents : list
+            List of TicketDocument instances.
+        file_path : str
+            Path of the JSONL file.
+
+        Returns
+        -------
+        None
+        """
+        with open(file_path, "a", encoding="utf-8") as file:
+            file.write("".join(f"{document.to_json()}\n" for document in documents))
+
+    @classmethod
+    def read_jsonl(cls, file_path: str):
+        """
+        Yields the tickets of a JSONL file one by one, so large archives are never loaded at once.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the JSONL file.
+
+        Returns
+        -------
+        documents: iterator
+            Iterator of TicketDocument instances.
+        """
+        with open(file_path, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield cls.from_json(line)
@@ -0,0 +1,57 @@
+import re
+
+# Alphabetic enumerations (a., b., c., etc.) used by Bard for sublists
+ALPHA_ENUMERATION = re.compile(r"\b[a-zA-Z]\.\s")
+# Pattern of a numbered list item: number. title
+NUMBERED_ITEM = re.compile(r"(\d+)\. (.+?)")
+
+
+def replace_alpha_numerals(text: str, remove_bold: bool = False) -> str:
+    """
+    Replaces the alphabetic enumerations (a., b., c., etc.) of a text generated by Bard with dashes "-".
+
+    Parameters
+    ----------
+    text : str
+        The text generated by Bard (a full response, or one line of a streamed response).
+    remove_bold : bool
+        If True, all "*" (bold markup) are removed as well.
+
+    Returns
+    -------
+    cleaned_text : str
+    """
+    # Find all occurrences of alphabetic enumerations (a., b., c., etc.)
+    matches = ALPHA_ENUMERATION.findall(text)
+
+    # Replace each occurrence with a dash. The matches are replaced one after the other, as replacing
+    # "g. " in "e.g. " creates "e. ", which is replaced as well if it is one of the later matches
+    for match in matches:
+        text = text.replace(match, " - ")
+
+    cleaned_text = text.replace("*", "") if remove_bold else text
+    return cleaned_text
+
+
+def numbered_item_title(line: str) -> str:
+    """
+    Returns the title of a stripped line of the form 'number. title', or None if the line is not a numbered item.
+    """
+    match = NUMBERED_ITEM.fullmatch(line)
+    return match.group(2) if match else None
+
+
+def subpoint(line: str) -> str:
+    """
+    Returns the text of a stripped subpoint line, without its leading hyphen.
+    """
+    return line.lstrip("-").strip()
+
+
+def split_item(line: str) -> tuple:
+    """
+    Returns the (title, description) of a line of the form '[number.] title: description'.
+    The line must contain a colon.
+    """
+    title, description = line.split(":", 1)
+    return title.split(".", 1)[-1].strip(), description.strip()
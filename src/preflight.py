@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import threading
+from metrics import metrics
+
+
+class JiraMetadata:
+    """
+    A class used to represent the metadata of a Jira project (the project itself, its issue types and the priorities
+    of the server) that the fields of every ticket are validated against before any LLM call is spent on it.
+
+    The metadata is fetched once and kept in a JSON file with a time to live, so later runs do not fetch it again.
+    If a field is rejected by cached metadata, the metadata is fetched again once before the field is reported
+    as invalid, so a priority or issue type added in Jira since the last fetch is accepted.
+
+    Attributes
+    ----------
+    jira_manager : JiraClientManager
+        The Jira client manager of the project.
+    path : str
+        Path of the JSON cache file. None keeps the metadata in memory only.
+    ttl : float
+        Number of seconds the cached metadata stays valid.
+
+    Methods
+    -------
+    load(refresh: bool) -> dict
+        Returns the metadata, from the cache file if it is still valid.
+
+    validate(priority: str, issue_type: str, subtask_issue_type: str) -> list
+        Returns the reasons Jira would reject the fields of a ticket (an empty list if they are valid).
+    """
+
+    def __init__(self, jira_manager, path: str = None, ttl: float = 24 * 3600):
+        self.jira_manager = jira_manager
+        self.path = path
+        self.ttl = ttl
+        self._metadata = None
+        self._from_cache = False
+        self._lock = threading.Lock()
+
+    @property
+    def _cache_key(self) -> str:
+        credentials = self.jira_manager.jira_credentials
+        return f"{credentials['server']}|{credentials['key']}"
+
+    def _read_cache(self) -> dict:
+        """
+        Returns the cached metadata of the project if it is still valid, or None.
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                entry = json.load(file).get(self._cache_key)
+        except (OSError, ValueError):
+            return None
+
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry
+
+    def _write_cache(self, entry: dict) -> None:
+        """
+        Stores the metadata of the project in the cache file, keeping the entries of other projects.
+        """
+        if self.path is None:
+            return
+
+        entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    entries = json.load(file)
+            except (OSError, ValueError):
+                entries = {}
+        entries[self._cache_key] = entry
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(entries, file, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def load(self, refresh: bool = False) -> dict:
+        """
+        Returns the metadata of the project. It is read from the cache file if it is still valid,
+        otherwise it is fetched from Jira and written to the cache file.
+
+        Parameters
+        ----------
+        refresh : bool
+            If True, the metadata is fetched from Jira even if the cache is valid.
+
+        Returns
+        -------
+        metadata: dict
+            - project (dict): id, key and name of the project.
+            - issue_types (list): names of the issue types of the project.
+            - priorities (list): names of the priorities of the server.
+            - fetched_at (float): time the metadata was fetched.
+        """
+        with self._lock:
+            if self._metadata is not None and not refresh:
+                return self._metadata
+
+            entry = None if refresh else self._read_cache()
+            self._from_cache = entry is not None
+            if entry is not None:
+                metrics.increment("jira_metadata_cache_hits")
+            else:
+                key = self.jira_manager.jira_credentials["key"]
+                try:
+                    with metrics.timer("jira_metadata"):
+                        entry = {
+                            "project": self.jira_manager.project(refresh=refresh),
+                            "issue_types": self.jira_manager.issue_types(refresh=refresh),
+                            "priorities": self.jira_manager.priorities(refresh=refresh),
+                            "fetched_at": time.time(),
+                        }
+                except Exception as e:
+                    raise RuntimeError(f"Failed to read the metadata of the Jira project '{key}'. Error: {str(e)}")
+                self._write_cache(entry)
+
+            self._metadata = entry
+            return entry
+
+    def _errors(self, metadata: dict, priority: str, issue_type: str, subtask_issue_type: str) -> list:
+        errors = []
+        if priority is not None and priority not in metadata["priorities"]:
+            errors.append(f"Unknown priority '{priority}'. Jira accepts: {', '.join(metadata['priorities'])}.")
+
+        for name in (issue_type, subtask_issue_type):
+            if name is not None and name not in metadata["issue_types"]:
+                errors.append(
+                    f"Unknown issue type '{name}' in project {metadata['project']['key']}. "
+                    f"The project has: {', '.join(metadata['issue_types'])}."
+                )
+
+        return errors
+
+    def validate(self, priority: str = None, issue_type: str = None, subtask_issue_type: str = None) -> list:
+        """
+        Returns the reasons Jira would reject the fields of a ticket.
+
+        Parameters
+        ----------
+        priority : str
+            Priority of the ticket.
+        issue_type : str
+            Issue type of the ticket.
+        subtask_issue_type : str
+            Issue type of the sub-tasks of the ticket, if sub-tasks are created.
+
+        Returns
+        -------
+        errors: list
+            One message per invalid field. The list is empty if all fields are valid.
+        """
+        errors = self._errors(self.load(), priority, issue_type, subtask_issue_type)
+        if errors and self._from_cache:
+            # The cached metadata may be out of date: check again with fresh metadata
+            errors = self._errors(self.load(refresh=True), priority, issue_type, subtask_issue_type)
+
+        if errors:
+            metrics.increment("preflight_errors", len(errors))
+        return errors
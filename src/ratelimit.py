@@ -0,0 +1,347 @@
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from metrics import metrics
+
+# Statuses that mean the backend is overloaded and the caller must slow down
+THROTTLE_STATUSES = {429, 502, 503, 504}
+# Latencies below this number of seconds never count as a spike, so noise of very fast requests is ignored
+MIN_SPIKE_LATENCY = 0.1
+# Number of successful requests needed before the smoothed latency is used to detect spikes
+SPIKE_WARMUP_REQUESTS = 10
+
+
+def error_status(error: Exception) -> tuple:
+    """
+    Returns the HTTP status and the Retry-After delay of a failed request, if the exception carries them.
+    Exceptions of the jira package (status_code and response), of requests and urllib (code and headers)
+    and of the benchmark fakes are understood.
+
+    Parameters
+    ----------
+    error : Exception
+        Exception raised by the request.
+
+    Returns
+    -------
+    (status, retry_after): tuple
+        The HTTP status (None if unknown) and the Retry-After delay in seconds (None if not given).
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    headers = getattr(error, "headers", None)
+
+    if response is not None:
+        status = status or getattr(response, "status_code", None)
+        headers = headers or getattr(response, "headers", None)
+
+    retry_after = None
+    value = headers.get("Retry-After") if headers is not None else None
+    if value:
+        try:
+            retry_after = float(value)
+        except ValueError:
+            try:
+                retry_after = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                retry_after = None
+
+    status = status if isinstance(status, int) else None
+    return status, retry_after
+
+
+class _Request:
+    """
+    Context manager around one request of an AdaptiveLimiter. It waits for a slot when entered
+    and reports the latency or the failure of the request when it exits.
+    """
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+
+    def __enter__(self):
+        self.limiter._acquire()
+        self.start_time = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        latency = time.monotonic() - self.start_time
+        self.limiter._release(latency, exc_value)
+        return False
+
+
+class AdaptiveLimiter:
+    """
+    A class used to represent the rate and concurrency limits of the requests to one backend (the LLM or Jira).
+    Requests take a token from a token bucket (if a rate is set) and a concurrency slot. The concurrency limit
+    adapts with AIMD: starting at initial_concurrency it grows by one slot per success until the backend first
+    pushes back (slow start), then by one slot per limit's worth of successes, and it is halved when the
+    backend throttles (429/5xx) or the latency spikes. A Retry-After delay pauses all requests to the backend.
+
+    Attributes
+    ----------
+    name : str
+        Name of the backend, used as metrics label.
+    rate : float
+        Maximum number of requests per second. None means no rate limit.
+    burst : int
+        Number of requests that may be sent at once before the rate applies.
+    initial_concurrency : int
+        Concurrency limit before any request finished.
+    max_concurrency : int
+        Upper bound of the concurrency limit.
+    min_concurrency : int
+        Lower bound of the concurrency limit.
+    latency_factor : float
+        A request slower than latency_factor times the smoothed latency counts as a latency spike.
+    adaptive : bool
+        If False, the concurrency limit stays at max_concurrency and Retry-After is ignored.
+    concurrency : float
+        Current concurrency limit.
+
+    Methods
+    -------
+    configure(rate: float, max_concurrency: int, adaptive: bool) -> None
+        Changes the rate, the maximum concurrency and the adaptivity of the limiter.
+
+    request() -> context manager
+        Returns a context manager that waits for a slot and reports the outcome of the request.
+
+    pause(seconds: float) -> None
+        Holds all requests to the backend for the given number of seconds.
+
+    status() -> dict
+        Returns the current limits and load of the backend.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = None,
+        burst: int = 1,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        latency_factor: float = 3.0,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.initial_concurrency = max(1, initial_concurrency)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.latency_factor = latency_factor
+        self.adaptive = True
+        self.concurrency = float(min(self.initial_concurrency, self.max_concurrency))
+        self._slow_start = True
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased_at = 0.0
+        self._latency = None
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def configure(self, rate: float = None, max_concurrency: int = None, adaptive: bool = True) -> None:
+        """
+        Changes the rate, the maximum concurrency and the adaptivity of the limiter.
+
+        Parameters
+        ----------
+        rate : float
+            Maximum number of requests per second. None means no rate limit.
+        max_concurrency : int
+            Upper bound of the concurrency limit. None keeps the current bound.
+        adaptive : bool
+            If False, the concurrency limit stays at max_concurrency and Retry-After is ignored.
+            Otherwise the limit starts again from initial_concurrency.
+
+        Returns
+        -------
+        None
+        """
+        with self._condition:
+            self.rate = rate
+            self.adaptive = adaptive
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, max_concurrency)
+                self.min_concurrency = min(self.min_concurrency, self.max_concurrency)
+            initial_concurrency = self.initial_concurrency if adaptive else self.max_concurrency
+            self.concurrency = float(min(initial_concurrency, self.max_concurrency))
+            self._slow_start = True
+            self._publish()
+            self._condition.notify_all()
+
+    def request(self):
+        """
+        Returns a context manager that waits for a slot (and a token of the bucket) when entered
+        and adapts the limits to the outcome of the request when it exits.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        request: context manager
+        """
+        return _Request(self)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds all requests to the backend for the given number of seconds (e.g. the Retry-After of a response).
+
+        Parameters
+        ----------
+        seconds : float
+            Duration of the pause.
+
+        Returns
+        -------
+        None
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def status(self) -> dict:
+        """
+        Returns the current limits and load of the backend.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        status: dict
+            rate, concurrency limit, requests in flight and remaining pause in seconds.
+        """
+        with self._condition:
+            return {
+                "rate": self.rate,
+                "concurrency": int(self.concurrency),
+                "in_flight": self._in_flight,
+                "paused_seconds": max(0.0, self._paused_until - time.monotonic()),
+            }
+
+    def _acquire(self) -> None:
+        """
+        Waits until the backend is not paused, a concurrency slot is free and the bucket holds a token.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wait_time = self._paused_until - now
+
+                if wait_time <= 0 and self._in_flight < int(self.concurrency):
+                    if self.rate is None:
+                        break
+
+                    # Refill the bucket for the time passed since the last refill
+                    self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                    self._refilled_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    wait_time = (1 - self._tokens) / self.rate
+
+                # Woken early when a slot is released or the limits change
+                self._condition.wait(timeout=wait_time if wait_time > 0 else None)
+
+            self._in_flight += 1
+            self._publish()
+
+    def _release(self, latency: float, error: Exception) -> None:
+        """
+        Frees the slot of a finished request and adapts the concurrency limit to its outcome.
+        """
+        status, retry_after = error_status(error) if error is not None else (None, None)
+        throttled = status in THROTTLE_STATUSES
+
+        with self._condition:
+            self._in_flight -= 1
+
+            if throttled:
+                metrics.increment("throttled_requests", backend=self.name, status=status)
+
+            if not self.adaptive:
+                pass
+            elif throttled:
+                self._decrease()
+                if retry_after is not None:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            elif error is None:
+                spike = (
+                    self._successes >= SPIKE_WARMUP_REQUESTS
+                    and latency > MIN_SPIKE_LATENCY
+                    and latency > self.latency_factor * self._latency
+                )
+                self._successes += 1
+                # Smoothed latency of the successful requests
+                self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+                if spike:
+                    metrics.increment("latency_spikes", backend=self.name)
+                    self._decrease()
+                else:
+                    # Additive increase: one slot per success during slow start,
+                    # afterwards one slot per concurrency limit's worth of successes
+                    step = 1 if self._slow_start else 1 / self.concurrency
+                    self.concurrency = min(self.max_concurrency, self.concurrency + step)
+
+            self._publish()
+            self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        """
+        Halves the concurrency limit, at most once per smoothed latency, so a burst of failures
+        of requests that were sent together only counts once.
+        """
+        now = time.monotonic()
+        if now - self._decreased_at < (self._latency or 0.0):
+            return
+
+        self._decreased_at = now
+        self._slow_start = False
+        self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+
+    def _publish(self) -> None:
+        """
+        Exposes the current limits as gauges.
+        """
+        metrics.gauge("rate_limit_concurrency", int(self.concurrency), backend=self.name)
+        metrics.gauge("rate_limit_in_flight", self._in_flight, backend=self.name)
+        metrics.gauge("rate_limit_rate", self.rate or 0, backend=self.name)
+
+
+class Scheduler:
+    """
+    A class used to represent the limiters of the backends, shared by all tickets and workers of the process.
+
+    Attributes
+    ----------
+    llm : AdaptiveLimiter
+        Limits of the requests to the LLM.
+    jira : AdaptiveLimiter
+        Limits of the requests to Jira.
+
+    Methods
+    -------
+    status() -> dict
+        Returns the current limits and load of every backend.
+    """
+
+    def __init__(self):
+        self.llm = AdaptiveLimiter("llm")
+        self.jira = AdaptiveLimiter("jira")
+
+    def status(self) -> dict:
+        """
+        Returns the current limits and load of every backend.
+        """
+        return {"llm": self.llm.status(), "jira": self.jira.status()}
+
+
+# Limiters of the process, shared by all tickets
+scheduler = Scheduler()
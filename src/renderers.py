@@ -0,0 +1,262 @@
+from model import Section, TicketDocument
+
+# Indentation of the lines of the Jira body (kept for compatibility with the issues created so far)
+JIRA_INDENT = " " * 12
+
+# Headers of the sections, in the order they are rendered
+SECTION_HEADERS = [
+    ("acceptance_criteria", "Acceptance Criteria"),
+    ("subtasks", "Sub-tasks"),
+    ("assumptions", "Assumptions"),
+]
+
+
+def render_jira_list(items) -> str:
+    """
+    Returns a formatted text with sections and subpoints from (title, subpoints) items for Jira.
+
+    Parameters
+    ----------
+    items : iterable
+        The (title, subpoints) items, e.g. response_dict.items().
+
+    Returns
+    -------
+    formatted_text: str
+        A formatted text with sections and subpoints for Jira
+    """
+    parts = []
+
+    for num, (title, subpoints) in enumerate(items, start=1):
+        if len(subpoints) == 1:
+            parts.append(f"*{num}. {title}*: {subpoints[0]}\n")
+        else:
+            parts.append(f"*{num}. {title}* \n")
+            parts.extend(f"    - {subpoint}\n" for subpoint in subpoints)
+            # Add double spacing after the last subpoint
+            if subpoints:
+                parts.append("\n")
+
+    return "".join(parts)
+
+
+def jira_section_text(section: Section) -> str:
+    """
+    Returns the text of a section in Jira wiki markup.
+    """
+    if section is None:
+        return ""
+    if section.items is not None:
+        return render_jira_list(section.items)
+    return section.text
+
+
+def render_jira_wiki(document: TicketDocument) -> str:
+    """
+    Returns the body of the Jira issue of a ticket in Jira wiki markup.
+
+    Parameters
+    ----------
+    document : TicketDocument
+        The structured ticket.
+
+    Returns
+    -------
+    ticket_body: str
+    """
+    sections = document.sections
+    indent = JIRA_INDENT
+    lines = [
+        "",
+        "",
+        f"{indent}h2. Task Scope:",
+        f"{indent}{{panel:bgColor=#deebff}}",
+        f"{indent}{jira_section_text(sections.get('description'))}",
+        f"{indent}{{panel}}",
+        "",
+        f"{indent}h2. Importance/Urgancy:",
+        f"{indent}{{panel:bgColor=#fefae6}}",
+        f"{indent}Priority: {document.priority}",
+        f"{indent}{{panel}}",
+        "",
+    ]
+    for name, header in SECTION_HEADERS:
+        # The trailing space of the last header is kept, so bodies are identical to the earlier ones
+        lines.append(f"{indent}h2. {header}: " if name == "assumptions" else f"{indent}h2. {header}:")
+        lines.append(f"{indent}{jira_section_text(sections.get(name))}")
+        lines.append("")
+    lines.append(indent)
+
+    return "\n".join(lines)
+
+
+def render_markdown(document: TicketDocument) -> str:
+    """
+    Returns the ticket in Markdown.
+
+    Parameters
+    ----------
+    document : TicketDocument
+        The structured ticket.
+
+    Returns
+    -------
+    markdown: str
+    """
+    sections = document.sections
+    description = sections.get("description")
+    lines = [
+        f"# {document.title}",
+        "",
+        "## Task Scope",
+        "",
+        f"> {description.text if description is not None else ''}",
+        "",
+        "## Importance/Urgency",
+        "",
+        f"Priority: **{document.priority}**",
+        "",
+    ]
+
+    for name, header in SECTION_HEADERS:
+        lines.append(f"## {header}")
+        lines.append("")
+
+        section = sections.get(name)
+        if section is None:
+            pass
+        elif section.items is None:
+            lines.append(section.text)
+        else:
+            for num, (title, subpoints) in enumerate(section.items, start=1):
+                if len(subpoints) == 1:
+                    lines.append(f"{num}. **{title}**: {subpoints[0]}")
+                else:
+                    lines.append(f"{num}. **{title}**")
+                    lines.extend(f"    - {subpoint}" for subpoint in subpoints)
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def _adf_text(text: str, strong: bool = False) -> dict:
+    node = {"type": "text", "text": text}
+    if strong:
+        node["marks"] = [{"type": "strong"}]
+    return node
+
+
+def _adf_paragraph(*nodes) -> dict:
+    return {"type": "paragraph", "content": [node for node in nodes if node["text"]]}
+
+
+def _adf_section(section: Section) -> dict:
+    """
+    Returns the ADF node of a list section (an ordered list) or of a text section (a paragraph).
+    """
+    if section.items is None:
+        return _adf_paragraph(_adf_text(section.text))
+
+    list_items = []
+    for title, subpoints in section.items:
+        if len(subpoints) == 1:
+            content = [_adf_paragraph(_adf_text(title, strong=True), _adf_text(f": {subpoints[0]}"))]
+        else:
+            content = [_adf_paragraph(_adf_text(title, strong=True))]
+            if subpoints:
+                bullets = [
+                    {"type": "listItem", "content": [_adf_paragraph(_adf_text(subpoint))]}
+                    for subpoint in subpoints
+                ]
+                content.append({"type": "bulletList", "content": bullets})
+        list_items.append({"type": "listItem", "content": content})
+
+    return {"type": "orderedList", "content": list_items}
+
+
+def render_adf(document: TicketDocument) -> dict:
+    """
+    Returns the body of the ticket in the Atlassian Document Format (used by the Jira Cloud REST API v3).
+
+    Parameters
+    ----------
+    document : TicketDocument
+        The structured ticket.
+
+    Returns
+    -------
+    adf: dict
+    """
+    sections = document.sections
+
+    def heading(text: str) -> dict:
+        return {"type": "heading", "attrs": {"level": 2}, "content": [_adf_text(text)]}
+
+    content = [heading("Task Scope")]
+    if "description" in sections:
+        content.append(
+            {"type": "panel", "attrs": {"panelType": "info"}, "content": [_adf_section(sections["description"])]}
+        )
+
+    content.append(heading("Importance/Urgency"))
+    content.append(
+        {
+            "type": "panel",
+            "attrs": {"panelType": "note"},
+            "content": [_adf_paragraph(_adf_text("Priority: "), _adf_text(document.priority, strong=True))],
+        }
+    )
+
+    for name, header in SECTION_HEADERS:
+        content.append(heading(header))
+        if name in sections:
+            content.append(_adf_section(sections[name]))
+
+    return {"version": 1, "type": "doc", "content": content}
+
+
+# Renderers by output format. Other formats can be added with register_renderer().
+RENDERERS = {
+    "jira": render_jira_wiki,
+    "markdown": render_markdown,
+    "adf": render_adf,
+}
+
+
+def register_renderer(name: str, renderer) -> None:
+    """
+    Adds a renderer for an output format.
+
+    Parameters
+    ----------
+    name : str
+        Name of the format.
+    renderer : callable
+        Function renderer(document: TicketDocument) returning the rendered ticket.
+
+    Returns
+    -------
+    None
+    """
+    RENDERERS[name] = renderer
+
+
+def render(document: TicketDocument, output_format: str = "jira"):
+    """
+    Renders a ticket in the given output format.
+
+    Parameters
+    ----------
+    document : TicketDocument
+        The structured ticket.
+    output_format : str
+        Name of a registered format ('jira', 'markdown' or 'adf' by default).
+
+    Returns
+    -------
+    rendered: str or dict
+    """
+    if output_format not in RENDERERS:
+        raise ValueError(f"Unknown output format '{output_format}'. Choose one of {list(RENDERERS)}.")
+
+    return RENDERERS[output_format](document)
@@ -0,0 +1,178 @@
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class RetryPolicy:
+    """
+    A class used to represent how often, and for how long, a request to the LLM is retried.
+
+    Attributes
+    ----------
+    max_attempts : int
+        Maximum number of requests sent in total (hedged requests included).
+    deadline : float
+        Maximum number of seconds spent on all attempts together.
+    base_delay : float
+        Upper bound in seconds of the backoff before the first retry. It doubles for every following retry.
+    max_delay : float
+        Upper bound in seconds of the backoff between two retries.
+    hedge : int
+        Number of concurrent requests fired per attempt. The first one that is accepted is used.
+
+    Methods
+    -------
+    backoff(retry: int) -> float
+        Returns the jittered delay in seconds before the given retry.
+
+    run(request: callable, accept: callable, hedge: int)
+        Calls request(candidate) until accept() returns a non-empty result, within the limits of the policy.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        deadline: float = 300.0,
+        base_delay: float = 1.0,
+        max_delay: float = 20.0,
+        hedge: int = 1,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = max(1, hedge)
+
+    def backoff(self, retry: int) -> float:
+        """
+        Returns the delay before the given retry using exponential backoff with full jitter.
+
+        Parameters
+        ----------
+        retry : int
+            Number of the retry, starting at 1.
+
+        Returns
+        -------
+        delay: float
+            Delay in seconds.
+        """
+        upper_bound = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return random.uniform(0, upper_bound)
+
+    def run(self, request, accept, hedge: int = None):
+        """
+        Calls request(candidate) until accept() returns a non-empty result, the attempts run out or the deadline
+        passes. With hedge > 1 several requests are fired concurrently and the first accepted one wins.
+
+        Parameters
+        ----------
+        request : callable
+            Function request(candidate) that sends the request and returns the response. candidate is the index
+            of the request among the concurrent requests of an attempt (always 0 without hedging), so every
+            concurrent request can use its own client.
+        accept : callable
+            Function that converts a response into the result. An empty result means the response is rejected.
+        hedge : int
+            Number of concurrent requests per attempt, at most the hedge of the policy
+            (e.g. 1 for a client that cannot send concurrent requests). None uses the hedge of the policy.
+
+        Returns
+        -------
+        result
+            The first non-empty result returned by accept().
+        """
+
+        hedge = self.hedge if hedge is None else max(1, min(hedge, self.hedge))
+        start_time = time.monotonic()
+        attempts = 0
+        retry = 0
+        last_error = None
+
+        while attempts < self.max_attempts:
+            remaining = self.deadline - (time.monotonic() - start_time)
+            if remaining <= 0:
+                break
+
+            if retry > 0:
+                time.sleep(min(self.backoff(retry), remaining))
+                remaining = self.deadline - (time.monotonic() - start_time)
+                if remaining <= 0:
+                    break
+
+            candidates = min(hedge, self.max_attempts - attempts)
+            attempts += candidates
+            retry += 1
+
+            if candidates == 1:
+                try:
+                    result = accept(request(0))
+                    if result:
+                        return result
+                except Exception as e:
+                    last_error = e
+                continue
+
+            result, error = self._run_hedged(request, accept, candidates, remaining)
+            if result:
+                return result
+            last_error = error or last_error
+
+        message = (
+            f"No valid response after {attempts} attempts "
+            f"in {time.monotonic() - start_time:.1f} seconds"
+        )
+        if last_error is not None:
+            message += f" (last error: {last_error})"
+        raise RuntimeError(message)
+
+    @staticmethod
+    def _run_hedged(request, accept, candidates: int, timeout: float) -> tuple:
+        """
+        Fires several requests concurrently and returns the first accepted result.
+        Requests that are still running when a result is accepted are abandoned.
+
+        Parameters
+        ----------
+        request : callable
+            Function request(candidate) that sends the request and returns the response.
+        accept : callable
+            Function that converts a response into the result.
+        candidates : int
+            Number of concurrent requests.
+        timeout : float
+            Maximum number of seconds to wait for an accepted result.
+
+        Returns
+        -------
+        (result, last_error): tuple
+            The accepted result (None if no response was accepted) and the last raised exception.
+        """
+
+        executor = ThreadPoolExecutor(max_workers=candidates)
+        pending = {
+            executor.submit(lambda candidate: accept(request(candidate)), candidate)
+            for candidate in range(candidates)
+        }
+        deadline = time.monotonic() + timeout
+        last_error = None
+
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                        if result:
+                            return result, None
+                    except Exception as e:
+                        last_error = e
+        finally:
+            # Do not wait for slower candidates once a result is found
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return None, last_error
@@ -0,0 +1,364 @@
+import json
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ticket import Ticket, PRIORITIES
+from jira_client import get_jira_client_manager
+from ratelimit import scheduler
+from backends import LLMBackend
+
+# Number of finished jobs kept so their status can still be requested
+FINISHED_JOBS_LIMIT = 1000
+
+
+class TicketService:
+    """
+    A class used to represent a long-running ticket service.
+    Submitted tickets wait in a bounded queue and are generated and uploaded by worker threads.
+    Every worker keeps its own connected model, and all workers share the pooled Jira client,
+    so no connection is set up per ticket.
+
+    Attributes
+    ----------
+    bard_api_key : str
+        API token for the Bard model.
+    jira_credentials : dict
+        A dictionary containing the credentials needed to connect with Jira.
+    workers : int
+        Number of worker threads.
+    queue_size : int
+        Maximum number of tickets waiting to be processed.
+    ticket_options : dict
+        Keyword arguments passed to every Ticket (e.g. retry_policy, response_cache, single_call).
+    wait_timeout : float
+        Maximum number of seconds a request that waits for its ticket is kept open.
+
+    Methods
+    -------
+    start() -> None
+        Connects to Jira and starts the worker threads.
+
+    submit(title: str, priority: str) -> dict
+        Validates a ticket and adds it to the queue, returning its job.
+
+    job_status(job_id: str) -> dict
+        Returns the status of a job, or None if the job is unknown.
+
+    status() -> dict
+        Returns the queue depth and the job counters of the service.
+    """
+
+    def __init__(
+        self,
+        bard_api_key: str,
+        jira_credentials: dict,
+        workers: int = 4,
+        queue_size: int = 100,
+        ticket_options: dict = None,
+        wait_timeout: float = 60.0,
+    ):
+        self.bard_api_key = bard_api_key
+        self.jira_credentials = jira_credentials
+        self.workers = workers
+        self.queue_size = queue_size
+        self.ticket_options = ticket_options or {}
+        self.wait_timeout = wait_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "running": 0, "done": 0, "failed": 0, "skipped": 0}
+
+    def start(self) -> None:
+        """
+        Connects to Jira and starts the worker threads.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        # Connect to Jira once before the first ticket arrives
+        get_jira_client_manager(self.jira_credentials).client()
+
+        for number in range(self.workers):
+            worker = threading.Thread(target=self._work, name=f"ticket-worker-{number}", daemon=True)
+            worker.start()
+
+    def submit(self, title: str, priority: str) -> dict:
+        """
+        Validates a ticket and adds it to the queue.
+
+        Parameters
+        ----------
+        title : str
+            Title of the ticket.
+        priority : str
+            Priority of the ticket.
+
+        Returns
+        -------
+        job: dict
+            The job of the ticket. A ValueError is raised for an invalid ticket and queue.Full if the queue is full.
+        """
+        title = (title or "").strip()
+        error_message = Ticket.validate_title(title) if title else "The title is empty."
+        if error_message:
+            raise ValueError(error_message)
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Choose one of {PRIORITIES}.")
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "title": title.title(),
+            "priority": priority,
+            "status": "queued",
+            "issue_key": None,
+            "error": None,
+            "finished": threading.Event(),
+        }
+
+        with self._lock:
+            self._jobs[job["id"]] = job
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job["id"])
+            raise
+
+        with self._lock:
+            self._counters["submitted"] += 1
+
+        return job
+
+    def job_status(self, job_id: str) -> dict:
+        """
+        Returns the status of a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Id returned when the ticket was submitted.
+
+        Returns
+        -------
+        job_status: dict
+            The id, title, priority, status, issue key and error of the job. None if the job is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is None:
+            return None
+
+        return {key: value for key, value in job.items() if key != "finished"}
+
+    def status(self) -> dict:
+        """
+        Returns the queue depth, the job counters and the current rate limits of the service.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        service_status: dict
+        """
+        with self._lock:
+            counters = dict(self._counters)
+
+        service_status = {
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+            **counters,
+            "limits": scheduler.status(),
+        }
+        return service_status
+
+    def _work(self) -> None:
+        """
+        Processes queued tickets with a model that is kept for the lifetime of the worker.
+        """
+        model = None
+
+        while True:
+            job = self._queue.get()
+            self._update(job, status="running", running=1)
+            ticket = None
+
+            try:
+                ticket = Ticket(self.bard_api_key, model=model, **self.ticket_options)
+                ticket.title = job["title"]
+                ticket.priority = job["priority"]
+
+                # A title that was already filed is not generated again (duplicate policy 'skip')
+                if not ticket.check_duplicate():
+                    self._update(
+                        job, status="skipped", error="The title is similar to an existing issue", running=-1, skipped=1
+                    )
+                    continue
+
+                try:
+                    ticket.create_ticket_body_text()
+                except Exception:
+                    # Release the title claimed by check_duplicate(), so it can be submitted again
+                    if ticket.duplicate_index is not None:
+                        ticket.duplicate_index.release(ticket.title)
+                    raise
+
+                issue_key = ticket.upload_ticket_to_jira(self.jira_credentials)
+                if issue_key is None:
+                    raise RuntimeError("Failed to create Jira issue")
+
+                self._update(job, status="done", issue_key=issue_key, running=-1, done=1)
+            except Exception as e:
+                self._update(job, status="failed", error=str(e), running=-1, failed=1)
+            finally:
+                # Keep the connected model for the next tickets, in a new conversation
+                if ticket is not None:
+                    model = ticket.model
+                    reset_conversation(model)
+                job["finished"].set()
+                self._queue.task_done()
+
+    def _update(
+        self, job: dict, running: int = 0, done: int = 0, failed: int = 0, skipped: int = 0, **fields
+    ) -> None:
+        """
+        Updates the fields of a job and the counters, dropping the oldest finished jobs.
+        """
+        with self._lock:
+            job.update(fields)
+            self._counters["running"] += running
+            self._counters["done"] += done
+            self._counters["failed"] += failed
+            self._counters["skipped"] += skipped
+
+            while len(self._jobs) > FINISHED_JOBS_LIMIT:
+                oldest_id = next(iter(self._jobs))
+                if not self._jobs[oldest_id]["finished"].is_set():
+                    break
+                self._jobs.pop(oldest_id)
+
+
+def reset_conversation(model) -> None:
+    """
+    Starts a new conversation on a model, so the next ticket is not generated in the context of the previous one.
+
+    Parameters
+    ----------
+    model : LLMBackend
+        Instance of the model (or None). Clients with the interface of Bard are accepted as well.
+
+    Returns
+    -------
+    None
+    """
+    if isinstance(model, LLMBackend):
+        model.reset()
+        return
+
+    for attribute in ["conversation_id", "response_id", "choice_id"]:
+        if hasattr(model, attribute):
+            setattr(model, attribute, "")
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API of the ticket service:
+
+    POST /tickets        {"title": ..., "priority": ..., "wait": false} -> 202 with the job
+                         (200 when waiting, 202 if the ticket is not finished within the wait timeout)
+    GET  /tickets/<id>   -> the job, including the issue key once it is created
+    GET  /status         -> queue depth, job counters and current rate limits
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.server.service
+
+        if self.path == "/status":
+            self.send_json(200, service.status())
+        elif self.path.startswith("/tickets/"):
+            job_status = service.job_status(self.path[len("/tickets/") :])
+            if job_status is None:
+                self.send_json(404, {"error": "Unknown ticket"})
+            else:
+                self.send_json(200, job_status)
+        else:
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+
+        if self.path != "/tickets":
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = service.submit(request.get("title"), request.get("priority", "Medium"))
+        except (ValueError, AttributeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except queue.Full:
+            self.send_json(503, {"error": "The queue is full, try again later"})
+            return
+
+        # A waiting request is not held open longer than the wait timeout, so stuck tickets do not pile up
+        # handler threads: the client gets the job id and polls it instead
+        if request.get("wait") and job["finished"].wait(timeout=service.wait_timeout):
+            self.send_json(200, service.job_status(job["id"]))
+        else:
+            self.send_json(202, service.job_status(job["id"]))
+
+
+def run_service(service: TicketService, host: str = "127.0.0.1", port: int = 8080) -> None:
+    """
+    Starts the workers of the service and serves its HTTP API until the process is stopped.
+
+    Parameters
+    ----------
+    service : TicketService
+        The ticket service.
+    host : str
+        Address the API listens on.
+    port : int
+        Port the API listens on.
+
+    Returns
+    -------
+    None
+    """
+    service.start()
+
+    server = ThreadingHTTPServer((host, port), _ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+
+    print(f"Ticket service listening on http://{host}:{port} with {service.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,134 @@
+from parsing import replace_alpha_numerals, numbered_item_title, subpoint, split_item
+
+
+class ListStreamParser:
+    """
+    A class used to represent an incremental parser of a streamed Bard list response.
+    Lines are parsed as soon as they are complete with the line rules of Ticket.parser_sublists() and
+    Ticket.parser_no_sublists() (module parsing), so list items can be shown before the response is finished.
+    The final section is still built from the full response with Ticket.response_to_dict().
+
+    Attributes
+    ----------
+    abort_after_chars : int
+        Number of characters received without any list item after which the response is considered malformed.
+        Preambles ('Sure! Here is the list...') are much shorter, so only a response that clearly is not a list
+        is aborted.
+    items : list
+        The (title, descriptions) items parsed so far.
+
+    Methods
+    -------
+    feed(chunk: str) -> list
+        Adds a chunk of the response and returns the items completed by it.
+
+    close() -> list
+        Ends the response and returns the remaining item.
+
+    is_malformed() -> bool
+        Returns True if enough text was received to know the response does not contain a list.
+    """
+
+    def __init__(self, abort_after_chars: int = 1000):
+        self.abort_after_chars = abort_after_chars
+        self.items = []
+        self._buffer = ""
+        self._chars = 0
+        self._list_lines = 0
+        self._current_item = None
+
+    def feed(self, chunk: str) -> list:
+        """
+        Adds a chunk of the response and returns the items completed by it.
+
+        Parameters
+        ----------
+        chunk : str
+            Next part of the response.
+
+        Returns
+        -------
+        completed_items: list
+            List of (title, descriptions) tuples.
+        """
+        self._chars += len(chunk)
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+
+        completed_items = []
+        for line in lines:
+            completed_items.extend(self._parse_line(line))
+
+        return completed_items
+
+    def close(self) -> list:
+        """
+        Ends the response and returns the remaining item.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        completed_items: list
+            List of (title, descriptions) tuples.
+        """
+        completed_items = self._parse_line(self._buffer)
+        self._buffer = ""
+
+        if self._current_item is not None:
+            completed_items.append(self._current_item)
+            self.items.append(self._current_item)
+            self._current_item = None
+
+        return completed_items
+
+    def is_malformed(self) -> bool:
+        """
+        Returns True if abort_after_chars characters were received and no line can be parsed as a list item.
+        """
+        return self._list_lines == 0 and self._chars >= self.abort_after_chars
+
+    def _parse_line(self, line: str) -> list:
+        """
+        Parses one completed line and returns the items it completes.
+        """
+        line = replace_alpha_numerals(line, remove_bold=True).strip()
+        if not line:
+            return []
+
+        completed_items = []
+        title = numbered_item_title(line)
+
+        if title is not None:
+            self._list_lines += 1
+            # A new numbered item completes the previous one
+            if self._current_item is not None:
+                completed_items.append(self._current_item)
+                self.items.append(self._current_item)
+                self._current_item = None
+
+            item_title, description = split_item(line) if ":" in title else (title, "")
+            if description:
+                # number. title: description (no subpoints)
+                completed_items.append((item_title, [description]))
+                self.items.append((item_title, [description]))
+            else:
+                # number. title followed by subpoints
+                self._current_item = (title.rstrip(":").strip(), [])
+
+        elif self._current_item is not None:
+            # Subpoints found (remove leading hyphen)
+            self._list_lines += 1
+            self._current_item[1].append(subpoint(line))
+
+        elif ":" in line:
+            # title: description without a number
+            self._list_lines += 1
+            title, description = split_item(line)
+            if description:
+                completed_items.append((title, [description]))
+                self.items.append((title, [description]))
+
+        return completed_items
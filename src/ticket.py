@@ -1,7 +1,46 @@
 import re
-import inquirer
-from jira import JIRA
-from bardapi import Bard
+from jira_client import get_jira_client_manager, JIRA_BULK_LIMIT
+from retry import RetryPolicy
+from cache import ResponseCache
+from metrics import metrics
+from streaming import ListStreamParser
+from parsing import replace_alpha_numerals, numbered_item_title, subpoint, split_item
+from tokens import TokenMeter, estimate_tokens, compact_list
+from journal import Journal, ticket_label, subtask_label
+from ratelimit import scheduler
+from backends import create_backend, as_backend
+from duplicates import DuplicateIndex, DUPLICATE_LINK_TYPE, describe_matches
+from fewshot import ExampleIndex, format_items
+from model import Section, TicketDocument
+from renderers import render_jira_list, render_jira_wiki
+
+# Issue type of a ticket that was not classified
+DEFAULT_ISSUE_TYPE = "Task"
+
+# Maximum length of the summary of a Jira issue
+SUMMARY_MAX_CHARS = 255
+
+# Separator of the lines of the examples embedded in the prompts (which are indented)
+PROMPT_LINE = "\n        "
+
+# Priorities a ticket can be assigned
+PRIORITIES = ["Highest", "High", "Medium", "Low", "Lowest"]
+# Sections of a ticket, in the order they are generated
+SECTIONS = ["description", "acceptance_criteria", "subtasks", "assumptions"]
+# Headers of the sections in the body of the Jira issue
+BODY_HEADERS = {
+    "Task Scope": "description",
+    "Acceptance Criteria": "acceptance_criteria",
+    "Sub-tasks": "subtasks",
+    "Assumptions": "assumptions",
+}
+BODY_HEADER = re.compile(r"^\s*h2\. (.+?):\s*$", re.MULTILINE)
+
+# Header of a section in a response containing all sections (e.g. "=== SUBTASKS ===" or "**Subtasks:**")
+SECTION_HEADER = re.compile(
+    r"^[\s#*=]*(description|acceptance criteria|sub-?tasks|assumptions)[\s#*=:]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
 
 
 class Ticket:
@@ -16,21 +55,90 @@ class Ticket:
         User-provided title of the ticket.
     priority: str
         Ticket priority assigned by the user.
+    issue_type: str
+        Jira issue type of the ticket. If None, it is predicted by the issue type classifier, or 'Task' without one.
     ticket_body: str
         Final text of the ticket.
+    retry_policy: RetryPolicy
+        Limits, backoff and hedging used when Bard has to be asked again for a section.
+    response_cache: ResponseCache
+        Optional persistent cache of accepted Bard responses, keyed on the prompt.
+    single_call: bool
+        If True, all sections are requested from Bard in a single response.
+    backend: str
+        Specification of the LLM backend the model is created from, e.g. 'bard', 'template' or 'command:<command>'.
+    model: LLMBackend
+        Instance of the language model. Created on first use unless an already connected model is provided.
+        Clients with the interface of Bard (get_answer and optionally get_answer_stream) are accepted as well.
+    on_section: callable
+        Optional callback on_section(section, text), called as soon as a section is generated.
+    on_item: callable
+        Optional callback on_item(section, title, descriptions), called for every list item while a response is streamed.
+        With hedged requests, the items of the accepted response are passed once it is accepted.
+    context_budget: int
+        If set, earlier sections are embedded in the chained prompts in a condensed form of at most this many tokens.
+    token_meter: TokenMeter
+        Optional token meter shared by the tickets of a run, whose limit stops the generation of new sections.
+    token_usage: TokenMeter
+        Estimated tokens spent on the LLM calls of this ticket.
+    journal: Journal
+        Optional journal of completed stages. Journaled sections, bodies and issues are reused instead of created again.
+    subtask_issue_type: str
+        If set, every item of the subtasks section is also created as a Jira issue of this type (e.g. 'Sub-task')
+        under the issue of the ticket.
+    duplicate_index: DuplicateIndex
+        Optional index of the existing issues of the project, checked for the title before the ticket is generated.
+    duplicate_policy: str
+        Action for a title similar to an existing issue: 'warn', 'skip' (do not generate it) or 'link'
+        (link the new issue to the existing one).
+    duplicate_of: str
+        Key of the existing issue the new issue is linked to, or None.
+    issue_type_classifier: IssueTypeClassifier
+        Optional local model predicting the issue type of the ticket from its title.
+    jira_metadata: JiraMetadata
+        Optional (cached) metadata of the Jira project, used to validate the fields of the ticket before it is generated.
+    example_index: ExampleIndex
+        Optional index of accepted tickets. The most similar tickets are the examples of the prompts instead of the
+        static example, their sections may be reused as they are, and the generated ticket is added to it.
+    sections: dict
+        Text sections of the ticket, once generated or loaded from Jira.
+    section_items: dict
+        Parsed items of the list sections generated in this run, keyed on the section.
+    document: TicketDocument
+        Structured content of the ticket, from which the body is rendered.
+    issue_key: str
+        Key of the Jira issue the ticket was created as or loaded from, or None.
 
     Methods
     -------
-    bard_model() -> Bard
-        Returns an instance of the language model (Bard).
+    bard_model() -> LLMBackend
+        Returns an instance of the language model (by default Bard).
 
     get_ticket_title(self) -> str
         Prompts the user to enter a title for a ticket and checks its validity before saving it as an attribute.
 
+    validate_title(ticket_title: str) -> str
+        Returns the reason a title is rejected, or an empty string if the title is valid.
+
+    check_duplicate() -> bool
+        Looks the title up in the duplicate index, returning False if the ticket must not be generated.
+
+    classify_issue_type() -> str
+        Predicts the issue type of the ticket from its title, unless it is already set.
+
+    check_fields() -> None
+        Raises a ValueError if Jira would reject the priority or issue type of the ticket.
+
+    few_shot(section: str) -> list
+        Returns the lines of the examples of a section from the most similar accepted tickets.
+
+    reused_sections() -> dict
+        Returns the sections of a very similar accepted ticket, which are reused without asking the model.
+
     clean_description(response: str) -> str
        Returns a cleaned response for describe section by removing unnecessary text generated by Bard.
 
-    replace_alpha_numerals(response: str) -> str
+    replace_alpha_numerals(response: str, remove_bold: bool) -> str
        Returns a string made of a list where all alpha numerals are replaced by dashes "-"
 
     parser_sublists(input_string:str) -> dict
@@ -45,27 +153,145 @@ class Ticket:
     dict_to_str(text_dict: dict) -> str:
         Returns a numbered list from the content of the dict
 
-    get_section_text(model:Bard, prompt:str) -> str:
+    get_cached_response(prompt: str) -> str
+        Returns the cached Bard response for a prompt, or None if it is not cached.
+
+    cache_response(prompt: str, response: str) -> None
+        Stores an accepted Bard response in the cache.
+
+    ask_model(model:LLMBackend, prompt:str, section:str, parse_list:bool, emit_items:bool) -> str:
+        Sends a prompt to Bard and returns the text of the response, recording the call in the metrics.
+
+    stream_answer(model:LLMBackend, prompt:str, section:str, parse_list:bool, emit_items:bool) -> str:
+        Streams the response of the model, parsing list items as they arrive and aborting malformed lists early.
+
+    concurrent_models(model:LLMBackend) -> list
+        Returns the models of the concurrent requests of a hedged attempt, so no client is shared by two requests.
+
+    check_token_limit() -> None
+        Raises a RuntimeError if the token limit of the run has been reached.
+
+    compact_context(section_text: str, sections: int) -> str
+        Returns the text of an earlier section as it is embedded in a chained prompt.
+
+    section_ready(section: str, text: str, record: bool) -> None
+        Journals a generated section and passes it to the on_section callback.
+
+    get_section_text(model:LLMBackend, prompt:str, section:str) -> str:
         Generates text from Bard based on a given prompt.
 
-    generate_response() -> dict
+    get_description_text(model:LLMBackend, prompt:str) -> str:
+        Generates the description from Bard based on a given prompt.
+
+    split_sections(response: str) -> dict
+        Splits a response containing all sections of the ticket at the section headers.
+
+    get_all_sections_text(model:LLMBackend) -> dict:
+        Generates all sections of the ticket with a single Bard request, leaving out sections that cannot be parsed.
+
+    generate_response(existing_sections: dict) -> dict
         Calls using get_section_text() to get all sections of the ticket, returning all text sections in a dictionary.
 
+    build_document(text_sections: dict) -> TicketDocument
+        Returns the structured ticket, keeping the parsed items of the list sections.
+
+    render_body(text_sections: dict) -> str
+        Renders the text sections as the body of the Jira issue.
+
+    body_to_sections(body: str) -> dict
+        Splits the body of a Jira issue back into its text sections.
+
     create_ticket_body_text() -> str
         Calls generate_response() and concatenates the text sections into a single text.
 
+    load_from_jira(jira_credentials: dict, issue_key: str) -> None
+        Loads the title, priority and sections of an existing Jira issue.
+
+    regenerate_sections(sections: list) -> None
+        Generates the selected sections again, reusing the other sections as prompt context.
+
+    update_issue_in_jira() -> bool
+        Updates the body of the loaded Jira issue if it changed.
+
     get_ticket_priority() -> None
         Provides the user with ticket priority options in the terminal and saves the response.
 
-    upload_ticket_to_jira() -> None
-        Creates and uploads the ticket in Jira
+    issue_fields(jira_credentials: dict) -> dict
+        Returns the fields of the Jira issue that represents the ticket.
+
+    journaled_issue_key(jira_manager: JiraClientManager) -> str
+        Returns the key of the issue already created for the ticket according to the journal, or None.
+
+    upload_ticket_to_jira() -> str
+        Creates and uploads the ticket in Jira, returning the key of the issue
+
+    journaled_subtask_keys(jira_manager: JiraClientManager) -> dict
+        Returns the keys of the sub-tasks already created for the ticket according to the journal.
+
+    subtask_fields(jira_credentials: dict, parent_key: str) -> list
+        Returns the fields of the Jira sub-tasks still to be created from the subtasks section.
+
+    record_subtasks(field_list: list, results: list) -> list
+        Journals and reports the outcome of the creation of the sub-tasks, returning their keys.
+
+    create_subtasks_in_jira(jira_credentials: dict, parent_key: str) -> list
+        Creates the items of the subtasks section as Jira sub-tasks with bulk requests, returning their keys.
+
+    record_duplicate(jira_manager: JiraClientManager) -> None
+        Adds the created issue to the duplicate index and links it to the issue it duplicates.
     """
 
-    def __init__(self, bard_api_key: str):
+    def __init__(
+        self,
+        bard_api_key: str,
+        retry_policy: RetryPolicy = None,
+        response_cache: ResponseCache = None,
+        single_call: bool = False,
+        model=None,
+        on_section=None,
+        on_item=None,
+        context_budget: int = None,
+        token_meter: TokenMeter = None,
+        journal: Journal = None,
+        subtask_issue_type: str = None,
+        duplicate_index: DuplicateIndex = None,
+        duplicate_policy: str = "warn",
+        issue_type_classifier=None,
+        jira_metadata=None,
+        backend: str = "bard",
+        example_index: ExampleIndex = None,
+    ):
         self.bard_api_key = bard_api_key
+        self.backend = backend
+        # Responses of different backends are cached separately
+        self.model_name = backend
         self.title = None
         self.priority = None
+        self.issue_type = None
         self.ticket_body = None
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.response_cache = response_cache
+        self.single_call = single_call
+        self.model = model
+        self.on_section = on_section
+        self.on_item = on_item
+        self.context_budget = context_budget
+        self.token_meter = token_meter
+        self.token_usage = TokenMeter()
+        self.journal = journal
+        self.subtask_issue_type = subtask_issue_type
+        self.duplicate_index = duplicate_index
+        self.duplicate_policy = duplicate_policy
+        self.duplicate_of = None
+        self.issue_type_classifier = issue_type_classifier
+        self.jira_metadata = jira_metadata
+        self.example_index = example_index
+        self.sections = None
+        self.section_items = {}
+        self.document = None
+        self.issue_key = None
+        self.jira_issue = None
+        self.loaded_body = None
 
     def get_ticket_title(self) -> None:
         """
@@ -83,28 +309,132 @@ class Ticket:
         while True:
             # Get ticket title from the user
             ticket_title = input("Enter the title of the ticket: ")
-            words_in_title = ticket_title.split()
+            error_message = self.validate_title(ticket_title)
 
             # Error handling of provided title
-            if len(words_in_title) == 1:
-                print("The title provided contains only a single word.")
-                print(
-                    "To improve the final ticket quality, provide a more descriptive title."
-                )
-            elif bool(re.match(r"^\d+$", ticket_title)):
-                print(
-                    "Invalid input. Unable to create a ticket from a title that only contains digits."
-                )
-            else:
-                # Valid title, capitalize and set as an attribute
-                self.title = ticket_title.title()
+            if error_message:
+                print(error_message)
+                continue
+
+            # Valid title, capitalize and set as an attribute
+            self.title = ticket_title.title()
+            if self.check_duplicate():
                 break
+            print("Please enter the title of a ticket that was not filed yet.")
+
+    def classify_issue_type(self) -> str:
+        """
+        Predicts the issue type of the ticket from its title with the local classifier (no LLM call),
+        unless the issue type is already set (e.g. by the batch file or a batch classification).
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        issue_type: str
+            The issue type of the ticket, or None if it is not set and there is no classifier.
+        """
+        if self.issue_type is None and self.issue_type_classifier is not None:
+            with metrics.timer("classify"):
+                self.issue_type = self.issue_type_classifier.predict([self.title])[0]
+
+        return self.issue_type
+
+    def check_fields(self) -> None:
+        """
+        Validates the priority and issue type of the ticket (and the issue type of its sub-tasks)
+        against the metadata of the Jira project, so an issue Jira would reject is not generated.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.jira_metadata is None:
+            return
+
+        errors = self.jira_metadata.validate(
+            priority=self.priority,
+            issue_type=self.issue_type or DEFAULT_ISSUE_TYPE,
+            subtask_issue_type=self.subtask_issue_type,
+        )
+        if errors:
+            raise ValueError(f"The ticket '{self.title}' would be rejected by Jira. " + " ".join(errors))
+
+    def check_duplicate(self) -> bool:
+        """
+        Looks the title up in the duplicate index (if any) before any LLM call is spent on the ticket.
+        Similar existing issues are printed, and depending on the duplicate policy the ticket is skipped
+        or its issue will be linked to the most similar one.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        generate: bool
+            False if the ticket must not be generated (policy 'skip' and a similar issue exists).
+        """
+        if self.duplicate_index is None:
+            return True
+
+        # A title without match is claimed, so the titles checked after it in the run are compared with it
+        matches = self.duplicate_index.claim(self.title)
+        if not matches:
+            return True
+
+        print(describe_matches(self.title, matches))
+        if self.duplicate_policy == "skip":
+            metrics.increment("duplicate_titles_skipped")
+            return False
+        if self.duplicate_policy == "link":
+            # A title of this run has no issue yet, so the most similar existing issue is linked (if any)
+            existing = [match["key"] for match in matches if match["key"] is not None]
+            self.duplicate_of = existing[0] if existing else None
+
+        return True
+
+    @staticmethod
+    def validate_title(ticket_title: str) -> str:
+        """
+        Checks whether a title is descriptive enough to generate a ticket from.
+
+        Parameters
+        ----------
+        ticket_title : str
+            Title provided by the user.
+
+        Returns
+        -------
+        error_message: str
+            Reason why the title was rejected. An empty string is returned if the title is valid.
+        """
+        words_in_title = ticket_title.split()
+
+        if len(words_in_title) == 1:
+            return (
+                "The title provided contains only a single word.\n"
+                "To improve the final ticket quality, provide a more descriptive title."
+            )
+        if bool(re.match(r"^\d+$", ticket_title)):
+            return "Invalid input. Unable to create a ticket from a title that only contains digits."
+
+        return ""
 
     def bard_model(self):
         """
-        Returns an instance of the language model (Bard).
+        Returns an instance of the language model, creating the backend of the ticket on first use.
+        The Bard backend only imports bardapi when it sends its first prompt.
         """
-        return Bard(token=self.bard_api_key)
+        if self.model is None:
+            self.model = create_backend(self.backend, self.bard_api_key)
+        return self.model
 
     @staticmethod
     def clean_description(response: str) -> str:
@@ -129,7 +459,7 @@ class Ticket:
         return ""
 
     @staticmethod
-    def replace_alpha_numerals(response: str) -> str:
+    def replace_alpha_numerals(response: str, remove_bold: bool = False) -> str:
         """
         Cleans the input text generated by Bard, replacing all alphanumeric characters with dashes "-".
 
@@ -137,20 +467,16 @@ class Ticket:
         ----------
         response : str
             The text generated by Bard.
+        remove_bold : bool
+            If True, all "*" (bold markup) are removed as well.
 
         Returns
         -------
         cleaned_text : str
             A new string where all alphanumeric characters are replaced by dashes.
         """
-        # Find all occurrences of alphabetic enumerations (a., b., c., etc.)
-        matches = re.findall(r"(\b[a-zA-Z]\.\s)", response)
-
-        # Replace each occurrence with a dash
-        for match in matches:
-            response = response.replace(match, " - ")
-
-        return response
+        cleaned_text = replace_alpha_numerals(response, remove_bold)
+        return cleaned_text
 
     @staticmethod
     def parser_sublists(input_string: str) -> dict:
@@ -179,24 +505,21 @@ class Ticket:
         """
 
         parsed_dict = {}
-        current_key = None
-        current_value = []
-        lines = input_string.strip().split("\n")
-        for line in lines:
+        current_value = None
+        for line in input_string.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+
             # Find pattern: number. title
-            match = re.match(r"^(\d+)\. (.+?)$", line.strip())
-            if match:
-                if current_key is not None:
-                    parsed_dict[current_key] = current_value
-                current_key = match.group(2)
+            title = numbered_item_title(line)
+            if title is not None:
+                # The list is filled in place by the following subpoints
                 current_value = []
-            elif current_key is not None and line.strip() != "":
+                parsed_dict[title] = current_value
+            elif current_value is not None:
                 # Subpoints found (remove leading hyphen)
-                current_value.append(line.strip().lstrip("-").strip())
-
-        # Adding the last section to the dictionary
-        if current_key is not None:
-            parsed_dict[current_key] = current_value
+                current_value.append(subpoint(line))
 
         return parsed_dict
 
@@ -224,19 +547,14 @@ class Ticket:
                 }
             }
         """
-        lines = input_string.strip().split("\n")
-        filtered_list = [
-            item for item in lines if item.strip()
-        ]  # Remove entries with ""
         result_dict = {}
 
-        for line in filtered_list:
+        for line in input_string.split("\n"):
             # Check if the line contains a colon
             if ":" in line:
                 # Split each line into title and description based on the colon
-                title, description = map(str.strip, line.split(":", 1))
-                title_no_number = title.split(".", 1)[-1].strip()
-                result_dict[title_no_number] = [description]
+                title, description = split_item(line)
+                result_dict[title] = [description]
 
         return result_dict
 
@@ -254,10 +572,9 @@ class Ticket:
         list_dict: dict
             Dictionary representation of the input list. An empty dict is returned if Bard does not return a list
         """
-        # List enumerated with numerals are now enumerated with a dash
-        response_no_numerals = self.replace_alpha_numerals(response)
-        # For consistency remove the bold 
-        response_no_bold = response_no_numerals.replace("*", "")
+        # List enumerated with numerals are now enumerated with a dash and
+        # for consistency the bold is removed
+        response_no_bold = self.replace_alpha_numerals(response, remove_bold=True)
 
         # If contains a dash indictaes is has sublists
         if " - " in response_no_bold:
@@ -282,52 +599,317 @@ class Ticket:
         formatted_text: str
             A formatted text with sections and subpoints for Jira
         """
-        formatted_text = ""
+        formatted_text = render_jira_list(text_dict.items())
+
+        return formatted_text
 
-        for num, (title, subpoints) in enumerate(text_dict.items(), start=1):
-            if len(subpoints) == 1:
-                formatted_text += f"*{num}. {title}*: {subpoints[0]}\n"
+    def get_cached_response(self, prompt: str) -> str:
+        """
+        Returns the cached Bard response for a prompt.
+
+        Parameters
+        ----------
+        prompt: str
+            Prompt provided to Bard
+
+        Returns
+        -------
+        response: str
+            The cached response. None is returned if there is no cache or the prompt is not cached.
+        """
+        if self.response_cache is None:
+            return None
+
+        return self.response_cache.get(self.model_name, prompt)
+
+    def cache_response(self, prompt: str, response: str) -> None:
+        """
+        Stores a Bard response in the cache. Only responses that were accepted by the parser are stored,
+        so a rejected response is never replayed.
+
+        Parameters
+        ----------
+        prompt: str
+            Prompt provided to Bard
+        response: str
+            Accepted response of Bard
+
+        Returns
+        -------
+        None
+        """
+        if self.response_cache is not None:
+            self.response_cache.set(self.model_name, prompt, response)
+
+    def ask_model(self, model, prompt: str, section: str, parse_list: bool = False, emit_items: bool = True) -> str:
+        """
+        Sends a prompt to the model and returns the text of the response.
+        Models that support streaming are streamed with stream_answer().
+        The call, its duration, the prompt/response sizes and their estimated tokens are recorded
+        in the metrics and in the token usage of the ticket (and of the run).
+
+        Parameters
+        ----------
+        model : LLMBackend
+            Instance of the model
+        prompt: str
+            Prompt provided to Bard
+        section: str
+            Name of the section the prompt is for (used as metrics label)
+        parse_list: bool
+            If True, the response is expected to be a list (used when streaming).
+        emit_items: bool
+            If False, the streamed list items are not passed to on_item (used by hedged requests).
+
+        Returns
+        -------
+        bard_text: str
+        """
+        metrics.increment("llm_calls", section=section)
+        metrics.observe("prompt_chars", len(prompt), section=section)
+
+        # Waits for the rate and concurrency limits of the LLM, which adapt to throttling and latency
+        with metrics.timer("llm_call", section=section), scheduler.llm.request():
+            backend = as_backend(model)
+            if backend.supports_streaming:
+                bard_text = self.stream_answer(backend, prompt, section, parse_list, emit_items)
             else:
-                formatted_text += f"*{num}. {title}* \n"
-                for i, subpoint in enumerate(subpoints):
-                    formatted_text += f"    - {subpoint}\n"
-                    # Add double spacing if its the last subpoint
-                    if i == len(subpoints) - 1:
-                        formatted_text += "\n"
+                bard_text = backend.generate(prompt)
 
-        return formatted_text
+        metrics.observe("response_chars", len(bard_text), section=section)
+
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(bard_text)
+        metrics.increment("llm_input_tokens", input_tokens, section=section)
+        metrics.increment("llm_output_tokens", output_tokens, section=section)
+        self.token_usage.record(input_tokens, output_tokens)
+        if self.token_meter is not None:
+            self.token_meter.record(input_tokens, output_tokens)
+
+        return bard_text
+
+    def stream_answer(
+        self, model, prompt: str, section: str, parse_list: bool = False, emit_items: bool = True
+    ) -> str:
+        """
+        Streams the response of the model. If parse_list is set, list items are parsed as soon as their
+        lines are complete and passed to on_item, and the stream is aborted as soon as it is clear the
+        response does not contain a list, so the retry can start without waiting for the full response.
+
+        Parameters
+        ----------
+        model : LLMBackend
+            Instance of the model, whose stream(prompt) yields chunks of text
+        prompt: str
+            Prompt provided to the model
+        section: str
+            Name of the section the prompt is for
+        parse_list: bool
+            If True, the response is parsed incrementally as a list.
+        emit_items: bool
+            If False, the parsed items are not passed to on_item, e.g. while concurrent hedged requests stream
+            the same section and only the items of the accepted response must be shown.
+
+        Returns
+        -------
+        bard_text: str
+            The streamed text (only the part received before an abort).
+        """
+        parser = ListStreamParser() if parse_list else None
+        on_item = self.on_item if emit_items else None
+        chunks = []
+        stream = as_backend(model).stream(prompt)
+
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                if parser is None:
+                    continue
+
+                for title, descriptions in parser.feed(chunk):
+                    if on_item is not None:
+                        on_item(section, title, descriptions)
+
+                if parser.is_malformed():
+                    metrics.increment("aborted_responses", section=section)
+                    break
+            else:
+                if parser is not None:
+                    for title, descriptions in parser.close():
+                        if on_item is not None:
+                            on_item(section, title, descriptions)
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+
+        bard_text = "".join(chunks)
+        return bard_text
+
+    def concurrent_models(self, model) -> list:
+        """
+        Returns the models of the concurrent requests of a hedged attempt.
+        A model that keeps a conversation (e.g. Bard) is never shared by concurrent requests: every request
+        gets its own client, or the requests are not hedged if the client cannot be copied.
 
-    def get_section_text(self, model, prompt: str) -> str:
+        Parameters
+        ----------
+        model : LLMBackend
+            Instance of the model
+
+        Returns
+        -------
+        models: list
+            Between 1 and retry_policy.hedge models.
+        """
+        return as_backend(model).concurrent(self.retry_policy.hedge)
+
+    def check_token_limit(self) -> None:
+        """
+        Raises a RuntimeError if the token limit of the run has been reached.
+        Checked before a section is requested, so a section that is in progress is always finished.
+        """
+        if self.token_meter is not None:
+            self.token_meter.check()
+
+    def compact_context(self, section_text: str, sections: int = 1) -> str:
+        """
+        Returns the text of an earlier section as it is embedded in a chained prompt.
+        Without a context budget the full text is used. Otherwise the text is condensed to item titles
+        and truncated descriptions, within the share of the budget of the section.
+
+        Parameters
+        ----------
+        section_text : str
+            Text of the section, as returned by dict_to_str().
+        sections : int
+            Number of earlier list sections embedded in the same prompt, which share the budget.
+
+        Returns
+        -------
+        context_text: str
+        """
+        if self.context_budget is None:
+            return section_text
+
+        return compact_list(section_text, self.context_budget // sections)
+
+    def section_ready(self, section: str, text: str, record: bool = True) -> None:
+        """
+        Journals a generated section (unless record is False, e.g. because it comes from the journal)
+        and passes it to the on_section callback, if there is one.
+        """
+        if record and self.journal is not None:
+            self.journal.record_section(self.title, section, text)
+        if self.on_section is not None:
+            self.on_section(section, text)
+
+    def get_section_text(self, model, prompt: str, section: str = "section") -> str:
         """
         Generates text from Bard based on a given prompt.
-        Continues generating responses until a valid dictionary can be extracted from Bard's output.
+        Generates new responses until a valid dictionary can be extracted from Bard's output,
+        within the attempts and deadline of the retry policy (a RuntimeError is raised otherwise).
 
         Parameters
         ----------
-        model : Bard
-            Instance of Bard
+        model : LLMBackend
+            Instance of the model
         prompt: str
             Prompt provided to Bard
+        section: str
+            Name of the section the prompt is for (used as metrics label)
 
         Returns
         -------
         clean_section_text: str
         """
 
-        bard_text = model.get_answer(prompt)["content"]
-        bard_dict = self.response_to_dict(bard_text)
+        # Reuse the response of a previous run if it is cached
+        cached_text = self.get_cached_response(prompt)
+        if cached_text is not None:
+            bard_dict = self.response_to_dict(cached_text)
+            if bard_dict:
+                metrics.increment("cache_hits", section=section)
+                self.section_items[section] = bard_dict
+                return self.dict_to_str(bard_dict)
+
+        self.check_token_limit()
+        attempts = []
+        models = self.concurrent_models(model)
+        # Hedged requests stream at the same time, so their items would be interleaved:
+        # only the items of the accepted response are passed to on_item, once it is accepted
+        hedged = len(models) > 1
+
+        def request(candidate: int) -> str:
+            attempts.append(1)
+            return self.ask_model(models[candidate], prompt, section, parse_list=True, emit_items=not hedged)
+
+        def accept(bard_text: str) -> dict:
+            with metrics.timer("parse", section=section):
+                bard_dict = self.response_to_dict(bard_text)
+            if bard_dict:
+                self.cache_response(prompt, bard_text)
+            else:
+                metrics.increment("rejected_responses", section=section)
+            return bard_dict
 
         # If Bard does not return a valid response (a list) then generate a new response
-        while bard_dict == {}:
-            bard_text = model.get_answer(prompt)["content"]
-            bard_dict = self.response_to_dict(bard_text)
+        try:
+            bard_dict = self.retry_policy.run(request, accept, hedge=len(models))
+        finally:
+            metrics.increment("retries", max(0, len(attempts) - 1), section=section)
 
-        clean_section_text = self.dict_to_str(bard_dict)
+        if hedged and self.on_item is not None:
+            for title, descriptions in bard_dict.items():
+                self.on_item(section, title, descriptions)
+
+        self.section_items[section] = bard_dict
+        with metrics.timer("render", section=section):
+            clean_section_text = self.dict_to_str(bard_dict)
         return clean_section_text
 
-    def generate_response(self) -> dict:
+    def few_shot(self, section: str) -> list:
+        """
+        Returns the lines of the examples of a section, taken from the accepted tickets most similar to the title.
+
+        Parameters
+        ----------
+        section : str
+            Name of the section, or 'all' for the example of the prompt of all sections.
+
+        Returns
+        -------
+        lines: list
+            Lines of the examples (without indentation). Empty if there is no example index or no similar ticket,
+            in which case the prompt keeps its static example.
+        """
+        if self.example_index is None:
+            return []
+
+        examples = self.example_index.examples_for(self.title, section)
+        lines = []
+
+        if section == "description":
+            for number, document in enumerate(examples, start=1):
+                lines.append(f"{number}. Description: {document.sections['description'].text}")
+        elif section == "all" and examples:
+            # A single complete ticket, in the format of the response
+            document = examples[0]
+            lines.extend(["=== DESCRIPTION ===", f"Description: {document.sections['description'].text}"])
+            for name in SECTIONS[1:]:
+                lines.extend(["", f"=== {name.upper().replace('_', ' ')} ===", *format_items(document.sections[name].items)])
+        else:
+            for document in examples:
+                if lines:
+                    lines.append("")
+                lines.append(f"Example for the ticket '{document.title}':")
+                lines.extend(format_items(document.sections[section].items))
+
+        return lines
+
+    def reused_sections(self) -> dict:
         """
-        Uses the Bard model to generate all text sections of the ticket
+        Returns the sections of the most similar accepted ticket if its similarity reaches the reuse threshold
+        of the example index, so they are used without asking the model. Their parsed items are kept as well.
 
         Parameters
         ----------
@@ -336,80 +918,327 @@ class Ticket:
         Returns
         -------
         text_section: dict
-            Dictionary which contains the text sections of the ticket
+            The reused sections in Jira wiki markup, or an empty dict.
         """
+        if self.example_index is None:
+            return {}
 
-        print("Generating Ticket. Please wait...")
+        match = self.example_index.reusable(self.title)
+        if match is None:
+            return {}
+
+        score, document = match
+        print(f"Reusing the sections of the similar ticket '{document.title}' (similarity {score:.2f}).")
+        metrics.increment("reused_tickets")
+
+        text_section = {"description": document.sections["description"].text}
+        for name in SECTIONS[1:]:
+            self.section_items[name] = dict(document.sections[name].items)
+            text_section[name] = self.dict_to_str(self.section_items[name])
 
-        # Prompt for description
+        return text_section
+
+    def prompt_description(self) -> str:
+        """
+        Returns the prompt for the description section.
+        """
+        examples = PROMPT_LINE.join(self.few_shot("description")) or """1. Description: We need a modal to assist users in renaming and describing a policy.
+        2. Description: We want to establish distinct alarms for production and staging for 'cust-data-classifier' so that developers can identify the environment and respond to issues accordingly."""
         prompt_description = f"""
         Only provode a one-line description for the Jira Ticket titled '{self.title}'.
 
         Description in the following format: 'Description: We need to [TASK] from [RESOURCE] in order for [USER] to [ACTION]'.
 
         Examples:
-        1. Description: We need a modal to assist users in renaming and describing a policy.
-        2. Description: We want to establish distinct alarms for production and staging for 'cust-data-classifier' so that developers can identify the environment and respond to issues accordingly.
+        {examples}
         """
-        model = self.bard_model()
+        return prompt_description
 
-        description_text = model.get_answer(prompt_description)["content"]
-        description_text_clean = self.clean_description(description_text)
-
-        # Prompt for acceptance criteria
+    def prompt_acceptance_criteria(self, description_text_clean: str) -> str:
+        """
+        Returns the prompt for the acceptance criteria section.
+        """
+        examples = PROMPT_LINE.join(self.few_shot("acceptance_criteria")) or """1. Button Placement: The social media sharing button should be prominently positioned within the blog post section, preferably near the post title or at the end of the post.
+        2. Supported Platforms: The button must support sharing on popular social media platforms, including but not limited to Facebook, Twitter, and LinkedIn.
+        3. Visual Design: The button's design should align with the overall aesthetics of the website. Implement hover effects to enhance the user experience."""
         prompt_acceptance_criteria = f"""Return a numbered list outlining the acceptance criteria for the Jira Ticket titled '{self.title}'.
         Emphasize the key goals and functionalities as indicated in the following description: '{description_text_clean}'.
         
         The response must follow this structured format:
 
-        1. Button Placement: The social media sharing button should be prominently positioned within the blog post section, preferably near the post title or at the end of the post.
-        2. Supported Platforms: The button must support sharing on popular social media platforms, including but not limited to Facebook, Twitter, and LinkedIn.
-        3. Visual Design: The button's design should align with the overall aesthetics of the website. Implement hover effects to enhance the user experience.
+        {examples}
 
         Response must adhere to this structure: number. short title: a single line description.
         """
+        return prompt_acceptance_criteria
 
-        acceptance_criteria_text_clean = self.get_section_text(
-            model, prompt_acceptance_criteria
-        )
-
-        # Prompt for subtasks
+    def prompt_subtasks(
+        self, description_text_clean: str, acceptance_criteria_text_clean: str
+    ) -> str:
+        """
+        Returns the prompt for the subtasks section.
+        """
+        examples = PROMPT_LINE.join(self.few_shot("subtasks")) or """1. Implementation of Button Component: Create a reusable component for the social media sharing button.
+        2. Integration with Social Media APIs: Integrate the button with the APIs of selected social media platforms for sharing functionality.
+        3. Styling and Responsiveness: Apply consistent styling to the button and ensure it looks good on all devices."""
         prompt_subtasks = f"""Return a numbered list outlining independent subtasks to complete the Jira ticket titled '{self.title}' 
         with a description {description_text_clean} and acceptance criteria {acceptance_criteria_text_clean}. 
         Each subtask must be self-contained and mutually exclusive.
 
         The response should follow this structured format:
 
-        1. Implementation of Button Component: Create a reusable component for the social media sharing button.
-        2. Integration with Social Media APIs: Integrate the button with the APIs of selected social media platforms for sharing functionality.
-        3. Styling and Responsiveness: Apply consistent styling to the button and ensure it looks good on all devices.
+        {examples}
 
         Response must adhere to this structure: number. short title: a single line description.
         """
-
-        subtasks_text_clean = self.get_section_text(model, prompt_subtasks)
-
-        # Prompt for assumptions
+        return prompt_subtasks
+
+    def prompt_assumptions(
+        self,
+        description_text_clean: str,
+        acceptance_criteria_text_clean: str,
+        subtasks_text_clean: str,
+    ) -> str:
+        """
+        Returns the prompt for the assumptions section.
+        """
+        examples = PROMPT_LINE.join(self.few_shot("assumptions")) or """1. Backend Support: It is assumed that the backend infrastructure already supports generating shareable links for blog posts,
+        2. API Availability: The availability and stability of the social media platform APIs are assumed for the sharing functionality,
+        3. Design Assets: Necessary design assets, such as icons for social media platforms, are assumed to be available for implementation"""
         prompt_assumptions = f"""Return a numbered list outlining the assumptions to complete the Jira ticket titled '{self.title}',
         with a description {description_text_clean}, acceptance criteria {acceptance_criteria_text_clean} and subtasks '{subtasks_text_clean}'.
 
         The response should follow this structured format:
 
-        1. Backend Support: It is assumed that the backend infrastructure already supports generating shareable links for blog posts,
-        2. API Availability: The availability and stability of the social media platform APIs are assumed for the sharing functionality,
-        3. Design Assets: Necessary design assets, such as icons for social media platforms, are assumed to be available for implementation
+        {examples}
         
         Response must adhere to this structure: number. short title: a single line description.
         """
+        return prompt_assumptions
 
-        assumptions_text_clean = self.get_section_text(model, prompt_assumptions)
+    def prompt_all_sections(self) -> str:
+        """
+        Returns the prompt asking for all sections of the ticket in one response, each under its own header.
+        """
+        example = PROMPT_LINE.join(self.few_shot("all")) or """=== DESCRIPTION ===
+        Description: We need to [TASK] from [RESOURCE] in order for [USER] to [ACTION].
 
-        text_section = {
-            "description": description_text_clean,
-            "acceptance_criteria": acceptance_criteria_text_clean,
-            "subtasks": subtasks_text_clean,
-            "assumptions": assumptions_text_clean,
-        }
+        === ACCEPTANCE CRITERIA ===
+        1. Button Placement: The social media sharing button should be prominently positioned within the blog post section, preferably near the post title or at the end of the post.
+        2. Supported Platforms: The button must support sharing on popular social media platforms, including but not limited to Facebook, Twitter, and LinkedIn.
+        3. Visual Design: The button's design should align with the overall aesthetics of the website. Implement hover effects to enhance the user experience.
+
+        === SUBTASKS ===
+        1. Implementation of Button Component: Create a reusable component for the social media sharing button.
+        2. Integration with Social Media APIs: Integrate the button with the APIs of selected social media platforms for sharing functionality.
+        3. Styling and Responsiveness: Apply consistent styling to the button and ensure it looks good on all devices.
+
+        === ASSUMPTIONS ===
+        1. Backend Support: It is assumed that the backend infrastructure already supports generating shareable links for blog posts.
+        2. API Availability: The availability and stability of the social media platform APIs are assumed for the sharing functionality.
+        3. Design Assets: Necessary design assets, such as icons for social media platforms, are assumed to be available for implementation."""
+        prompt_all_sections = f"""Write the content of the Jira ticket titled '{self.title}' in four sections.
+        Start every section with its header on a separate line, exactly as in the example below, and do not add any other text.
+
+        {example}
+
+        The subtasks must be self-contained and mutually exclusive.
+        Every list must adhere to this structure: number. short title: a single line description.
+        """
+        return prompt_all_sections
+
+    @staticmethod
+    def split_sections(response: str) -> dict:
+        """
+        Splits a response containing all sections of the ticket at the section headers.
+
+        Parameters
+        ----------
+        response : str
+            Text generated by Bard for the prompt of prompt_all_sections().
+
+        Returns
+        -------
+        sections: dict
+            The raw text of each section found, keyed on 'description', 'acceptance_criteria', 'subtasks' and 'assumptions'.
+        """
+        sections = {}
+        headers = list(SECTION_HEADER.finditer(response))
+
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            end = next_header.start() if next_header is not None else len(response)
+            name = header.group(1).lower().replace("-", "").replace(" ", "_")
+            sections[name] = response[header.end() : end]
+
+        return sections
+
+    def get_description_text(self, model, prompt: str) -> str:
+        """
+        Generates the description from Bard based on a given prompt.
+
+        Parameters
+        ----------
+        model : LLMBackend
+            Instance of the model
+        prompt: str
+            Prompt provided to Bard
+
+        Returns
+        -------
+        description_text_clean: str
+        """
+        description_text = self.get_cached_response(prompt)
+        cache_hit = description_text is not None
+        if not cache_hit:
+            self.check_token_limit()
+            # Failed requests (e.g. throttled ones) are retried, any text is accepted
+            models = self.concurrent_models(model)
+            description_text = self.retry_policy.run(
+                lambda candidate: self.ask_model(models[candidate], prompt, "description"),
+                lambda text: text,
+                hedge=len(models),
+            )
+        else:
+            metrics.increment("cache_hits", section="description")
+
+        description_text_clean = self.clean_description(description_text)
+        # Only new responses are stored, so a cached entry keeps its age and expires after its TTL
+        if description_text_clean and not cache_hit:
+            self.cache_response(prompt, description_text)
+
+        return description_text_clean
+
+    def get_all_sections_text(self, model) -> dict:
+        """
+        Generates all sections of the ticket with a single Bard request.
+        Sections that cannot be parsed are left out, so they can be generated with their own prompt.
+
+        Parameters
+        ----------
+        model : LLMBackend
+            Instance of the model
+
+        Returns
+        -------
+        text_section: dict
+            Dictionary which contains the text sections that were parsed successfully
+        """
+        with metrics.timer("prompt_build", section="all_sections"):
+            prompt = self.prompt_all_sections()
+
+        bard_text = self.get_cached_response(prompt)
+        cache_hit = bard_text is not None
+        if not cache_hit:
+            try:
+                self.check_token_limit()
+                bard_text = self.ask_model(model, prompt, "all_sections")
+            except Exception as e:
+                print(f"Failed to generate all sections at once. Error: {str(e)}")
+                return {}
+        else:
+            metrics.increment("cache_hits", section="all_sections")
+
+        with metrics.timer("parse", section="all_sections"):
+            sections = self.split_sections(bard_text)
+            text_section = {}
+
+            description_text_clean = self.clean_description(sections.get("description", ""))
+            if description_text_clean:
+                text_section["description"] = description_text_clean
+
+            for name in ["acceptance_criteria", "subtasks", "assumptions"]:
+                bard_dict = self.response_to_dict(sections.get(name, ""))
+                if bard_dict:
+                    self.section_items[name] = bard_dict
+                    text_section[name] = self.dict_to_str(bard_dict)
+                else:
+                    metrics.increment("rejected_responses", section=name)
+
+        # Only new responses are stored, so a cached entry keeps its age and expires after its TTL
+        if text_section and not cache_hit:
+            self.cache_response(prompt, bard_text)
+
+        return text_section
+
+    def generate_response(self, existing_sections: dict = None) -> dict:
+        """
+        Uses the Bard model to generate all text sections of the ticket.
+        If single_call is set and no section exists yet, all sections are requested at once and only
+        the sections that could not be parsed are generated with their own (chained) prompt.
+        With a context budget, the chained prompts embed a condensed form of the earlier sections.
+        Existing sections (or else the sections found in the journal) are reused and serve as context
+        of the missing ones, and every new section is journaled as soon as it is generated.
+
+        Parameters
+        ----------
+        existing_sections : dict
+            Sections that are kept as they are. If None, the sections of the journal are used.
+
+        Returns
+        -------
+        text_section: dict
+            Dictionary which contains the text sections of the ticket
+        """
+
+        print("Generating Ticket. Please wait...")
+
+        self.section_items = {}
+        text_section = {}
+        if existing_sections is not None:
+            text_section = dict(existing_sections)
+        elif self.journal is not None:
+            text_section = self.journal.state(self.title)["sections"]
+        for section, text in text_section.items():
+            self.section_ready(section, text, record=False)
+
+        if existing_sections is None:
+            # sections of a very similar accepted ticket are reused without asking the model
+            for section, text in self.reused_sections().items():
+                if section not in text_section:
+                    text_section[section] = text
+                    self.section_ready(section, text)
+
+        # The model is only created if a section is missing
+        model = self.bard_model() if len(text_section) < len(SECTIONS) else None
+
+        if self.single_call and not text_section:
+            for section, text in self.get_all_sections_text(model).items():
+                if section not in text_section:
+                    text_section[section] = text
+                    self.section_ready(section, text)
+
+        if "description" not in text_section:
+            with metrics.timer("prompt_build", section="description"):
+                prompt = self.prompt_description()
+            text_section["description"] = self.get_description_text(model, prompt)
+            self.section_ready("description", text_section["description"])
+
+        if "acceptance_criteria" not in text_section:
+            with metrics.timer("prompt_build", section="acceptance_criteria"):
+                prompt = self.prompt_acceptance_criteria(text_section["description"])
+            text_section["acceptance_criteria"] = self.get_section_text(
+                model, prompt, "acceptance_criteria"
+            )
+            self.section_ready("acceptance_criteria", text_section["acceptance_criteria"])
+
+        if "subtasks" not in text_section:
+            with metrics.timer("prompt_build", section="subtasks"):
+                prompt = self.prompt_subtasks(
+                    text_section["description"],
+                    self.compact_context(text_section["acceptance_criteria"]),
+                )
+            text_section["subtasks"] = self.get_section_text(model, prompt, "subtasks")
+            self.section_ready("subtasks", text_section["subtasks"])
+
+        if "assumptions" not in text_section:
+            with metrics.timer("prompt_build", section="assumptions"):
+                prompt = self.prompt_assumptions(
+                    text_section["description"],
+                    self.compact_context(text_section["acceptance_criteria"], sections=2),
+                    self.compact_context(text_section["subtasks"], sections=2),
+                )
+            text_section["assumptions"] = self.get_section_text(model, prompt, "assumptions")
+            self.section_ready("assumptions", text_section["assumptions"])
 
         return text_section
 
@@ -426,31 +1255,108 @@ class Ticket:
         None
         """
 
+        self.classify_issue_type()
+        # fail before any LLM call if Jira would reject the issue
+        self.check_fields()
+
+        # reuse the body of a previous run if it was rendered with the same priority
+        if self.journal is not None:
+            state = self.journal.state(self.title)
+            if state["body"] is not None and state["priority"] == self.priority:
+                self.sections = state["sections"]
+                self.document = self.build_document(self.sections)
+                self.ticket_body = state["body"]
+                return
+
         # get the text sections for the ticket
-        ticket_text_sections = self.generate_response()
+        with metrics.timer("generate"):
+            self.sections = self.generate_response()
 
-        self.ticket_body = f"""
+        self.document = self.build_document(self.sections)
+        self.ticket_body = render_jira_wiki(self.document)
 
-            h2. Task Scope:
-            {{panel:bgColor=#deebff}}
-            {ticket_text_sections['description']}
-            {{panel}}
+        # the accepted ticket becomes an example for similar titles
+        if self.example_index is not None:
+            self.example_index.add(self.document)
 
-            h2. Importance/Urgancy:
-            {{panel:bgColor=#fefae6}}
-            {'Priority: ' + self.priority}
-            {{panel}}
+        if self.journal is not None:
+            self.journal.record_body(self.title, self.priority, self.ticket_body)
 
-            h2. Acceptance Criteria:
-            {ticket_text_sections['acceptance_criteria']}
+    def build_document(self, ticket_text_sections: dict) -> TicketDocument:
+        """
+        Returns the structured ticket. The parsed items of the list sections generated in this run are kept as they are,
+        other list sections (e.g. from the journal or an existing issue) are read from their Jira markup.
 
-            h2. Sub-tasks:
-            {ticket_text_sections['subtasks']}
+        Parameters
+        ----------
+        ticket_text_sections : dict
+            Dictionary which contains the text sections of the ticket
 
-            h2. Assumptions: 
-            {ticket_text_sections['assumptions']}
+        Returns
+        -------
+        document: TicketDocument
+        """
+        sections = {}
+        for name in SECTIONS:
+            if name not in ticket_text_sections:
+                continue
+
+            if name == "description":
+                sections[name] = Section(name, text=ticket_text_sections[name])
+            elif name in self.section_items:
+                sections[name] = Section.from_items(name, self.section_items[name].items())
+            else:
+                sections[name] = Section.from_jira_text(name, ticket_text_sections[name])
 
-            """
+        document = TicketDocument(self.title, self.priority, sections, self.issue_key)
+        return document
+
+    def render_body(self, ticket_text_sections: dict) -> str:
+        """
+        Renders the text sections as the body of the Jira issue (in Jira wiki markup).
+
+        Parameters
+        ----------
+        ticket_text_sections : dict
+            Dictionary which contains the text sections of the ticket
+
+        Returns
+        -------
+        ticket_body: str
+        """
+        ticket_body = render_jira_wiki(self.build_document(ticket_text_sections))
+        return ticket_body
+
+    @staticmethod
+    def body_to_sections(body: str) -> dict:
+        """
+        Splits the body of a Jira issue, as rendered by render_body(), back into its text sections.
+
+        Parameters
+        ----------
+        body : str
+            Description of the Jira issue.
+
+        Returns
+        -------
+        text_section: dict
+            The text of every section found, keyed on its name (see SECTIONS).
+        """
+        text_section = {}
+        headers = list(BODY_HEADER.finditer(body))
+
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            section = BODY_HEADERS.get(header.group(1).strip())
+            if section is None:
+                continue
+
+            end = next_header.start() if next_header is not None else len(body)
+            lines = body[header.end() : end].split("\n")
+            # Remove the panel markup around the description
+            text = "\n".join(line for line in lines if not line.strip().startswith("{panel"))
+            text_section[section] = text.strip()
+
+        return text_section
 
     def get_ticket_prority(self) -> None:
         """
@@ -465,17 +1371,81 @@ class Ticket:
         None
         """
 
+        # Imported on first use, so non-interactive runs never load it
+        import inquirer
+
         questions = [
             inquirer.List(
                 "priority",
                 message="Assign a priority to the ticket",
-                choices=["Highest", "High", "Medium", "Low", "Lowest"],
+                choices=PRIORITIES,
             ),
         ]
         answers = inquirer.prompt(questions)
         self.priority = answers["priority"]
 
-    def upload_ticket_to_jira(self, jira_credentials: dict) -> None:
+    def issue_fields(self, jira_credentials: dict) -> dict:
+        """
+        Returns the fields of the Jira issue that represents this ticket.
+
+        Parameters
+        ----------
+        jira_credentials: dict
+            A dictionary containing the credentials needed to connect with Jira (only the project key is used).
+
+        Returns
+        -------
+        issue_dict: dict
+            Fields accepted by Jira when creating an issue.
+        """
+        issue_dict = {
+            "project": {"key": jira_credentials["key"]},
+            "summary": f"{self.title}",
+            "description": f"{self.ticket_body}",
+            "priority": {"name": f"{self.priority}"},
+            "issuetype": {"name": self.issue_type or DEFAULT_ISSUE_TYPE},
+        }
+        if self.journal is not None:
+            # Lets an interrupted upload be found again, so the issue is never created twice
+            issue_dict["labels"] = [ticket_label(self.title)]
+
+        return issue_dict
+
+    def journaled_issue_key(self, jira_manager) -> str:
+        """
+        Returns the key of the issue already created for the ticket according to the journal.
+        If an upload was started but its key was not journaled (e.g. the process died during the request),
+        Jira is searched for the label of the ticket, and a found issue is journaled.
+
+        Parameters
+        ----------
+        jira_manager: JiraClientManager
+            The Jira client manager of the credentials.
+
+        Returns
+        -------
+        issue_key: str
+            Key of the existing issue. None is returned if there is no journal or the issue was not created yet.
+        """
+        if self.journal is None:
+            return None
+
+        state = self.journal.state(self.title)
+        if state["issue_key"] is not None or not state["upload_started"]:
+            return state["issue_key"]
+
+        try:
+            issue_key = jira_manager.find_issue_by_label(ticket_label(self.title))
+        except Exception as e:
+            # Creating the issue without knowing whether it exists could create a duplicate
+            raise RuntimeError(f"Failed to check for an existing issue of '{self.title}'. Error: {str(e)}")
+
+        if issue_key is not None:
+            self.journal.record_issue(self.title, issue_key)
+
+        return issue_key
+
+    def upload_ticket_to_jira(self, jira_credentials: dict) -> str:
         """
         Create a new ticket in Jira with the content generated by Bard.
 
@@ -490,29 +1460,341 @@ class Ticket:
 
         Returns
         -------
-        None
+        issue_key: str
+            Key of the created issue. None is returned if the issue could not be created.
         """
 
-        # Connect to Jira using provided credentials
-        jira = JIRA(
-            options={"server": jira_credentials["server"]},
-            basic_auth=(jira_credentials["email_address"], jira_credentials["token"]),
-        )
+        # Reuse the Jira connection of the process for the provided credentials
+        jira_manager = get_jira_client_manager(jira_credentials)
+
+        # Do not create the issue again if the journal shows it was already created
+        issue_key = self.journaled_issue_key(jira_manager)
+        if issue_key is not None:
+            print(f"The ticket '{self.title}' was already uploaded to Jira as {issue_key}.")
+            self.issue_key = issue_key
+            # Sub-tasks are still missing if the run was interrupted after the issue was created
+            if self.subtask_issue_type is not None:
+                self.create_subtasks_in_jira(jira_credentials, issue_key)
+            return issue_key
+
+        jira = jira_manager.client()
 
         # Prepare issue data
-        issue_dict = {
-            "project": {"key": jira_credentials["key"]},
-            "summary": f"{self.title}",
-            "description": f"{self.ticket_body}",
-            "priority": {"name": f"{self.priority}"},
-            "issuetype": {"name": "Task"},
-        }
+        issue_dict = self.issue_fields(jira_credentials)
+        if self.journal is not None:
+            self.journal.record_upload(self.title)
 
         try:
             # Create a new issue in Jira
-            jira.create_issue(fields=issue_dict)
+            with metrics.timer("jira_create"), scheduler.jira.request():
+                issue = jira.create_issue(fields=issue_dict)
+            metrics.increment("jira_issues_created")
+            self.issue_key = issue.key
+            if self.document is not None:
+                self.document.issue_key = issue.key
+            if self.journal is not None:
+                self.journal.record_issue(self.title, issue.key)
             print("The following ticket was successfully created and uploaded to Jira:")
             print(f"{self.ticket_body}")
         except Exception as e:
             # Handle any exceptions that may occur during the Jira issue creation
+            metrics.increment("jira_errors")
             print(f"Failed to create Jira issue. Error: {str(e)}")
+            return None
+
+        self.record_duplicate(jira_manager)
+        if self.subtask_issue_type is not None:
+            self.create_subtasks_in_jira(jira_credentials, issue.key)
+        return issue.key
+
+    def record_duplicate(self, jira_manager) -> None:
+        """
+        Adds the created issue to the duplicate index, so later titles of the run are checked against it,
+        and links it to the existing issue it duplicates (policy 'link').
+
+        Parameters
+        ----------
+        jira_manager: JiraClientManager
+            The Jira client manager of the credentials.
+
+        Returns
+        -------
+        None
+        """
+        if self.duplicate_index is not None:
+            self.duplicate_index.add(self.issue_key, self.title)
+
+        if self.duplicate_of is None:
+            return
+
+        try:
+            jira_manager.link_issues(DUPLICATE_LINK_TYPE, self.issue_key, self.duplicate_of)
+            print(f"Linked {self.issue_key} to the similar issue {self.duplicate_of}.")
+        except Exception as e:
+            metrics.increment("jira_errors")
+            print(f"Failed to link {self.issue_key} to {self.duplicate_of}. Error: {str(e)}")
+
+    def journaled_subtask_keys(self, jira_manager) -> dict:
+        """
+        Returns the keys of the sub-tasks already created for the ticket according to the journal.
+        Sub-tasks whose creation was started but whose keys were not journaled (e.g. the process died during
+        the request) are searched in Jira by their labels, and the found sub-tasks are journaled.
+
+        Parameters
+        ----------
+        jira_manager: JiraClientManager
+            The Jira client manager of the credentials.
+
+        Returns
+        -------
+        subtask_keys: dict
+            Keys of the existing sub-tasks, keyed on their titles. Empty if there is no journal.
+        """
+        if self.journal is None:
+            return {}
+
+        state = self.journal.state(self.title)
+        labels = {
+            subtask_label(self.title, subtask_title): subtask_title
+            for subtask_title in state["subtasks_started"]
+            if subtask_title not in state["subtask_keys"]
+        }
+        if not labels:
+            return state["subtask_keys"]
+
+        try:
+            found = jira_manager.find_issues_by_labels(list(labels))
+        except Exception as e:
+            # Creating the sub-tasks without knowing whether they exist could create duplicates
+            raise RuntimeError(f"Failed to check for existing sub-tasks of '{self.title}'. Error: {str(e)}")
+
+        found_keys = {labels[label]: issue_key for label, issue_key in found.items()}
+        if found_keys:
+            self.journal.record_subtasks(self.title, found_keys)
+
+        return {**state["subtask_keys"], **found_keys}
+
+    def subtask_fields(self, jira_credentials: dict, parent_key: str) -> list:
+        """
+        Returns the fields of the Jira sub-tasks of the items of the subtasks section, as parsed from the response
+        of Bard. Items whose sub-task the journal shows as created are left out (see journaled_subtask_keys()),
+        and nothing is returned if the section is not a list.
+
+        Parameters
+        ----------
+        jira_credentials: dict
+            A dictionary containing the credentials needed to connect with Jira (only the project key is used).
+        parent_key : str
+            Key of the issue of the ticket.
+
+        Returns
+        -------
+        field_list: list
+            Fields accepted by Jira when creating an issue, one per sub-task.
+        """
+        section = self.document.sections.get("subtasks") if self.document is not None else None
+        if section is None or section.items is None:
+            return []
+
+        created = self.journal.state(self.title)["subtask_keys"] if self.journal is not None else {}
+
+        field_list = []
+        for title, descriptions in section.items:
+            summary = title[:SUMMARY_MAX_CHARS]
+            if summary in created:
+                continue
+
+            if len(descriptions) == 1:
+                description = descriptions[0]
+            else:
+                description = "\n".join(f"- {description}" for description in descriptions)
+
+            field_list.append(
+                {
+                    "project": {"key": jira_credentials["key"]},
+                    "parent": {"key": parent_key},
+                    "summary": summary,
+                    "description": description,
+                    "priority": {"name": f"{self.priority}"},
+                    "issuetype": {"name": self.subtask_issue_type},
+                }
+            )
+            if self.journal is not None:
+                # Lets an interrupted creation be found again, so the sub-task is never created twice
+                field_list[-1]["labels"] = [subtask_label(self.title, summary)]
+
+        return field_list
+
+    def record_subtasks(self, field_list: list, results: list) -> list:
+        """
+        Journals and reports the outcome of the creation of the sub-tasks of the ticket.
+        Only created sub-tasks are journaled (with their titles), so the failed ones are created on a rerun.
+
+        Parameters
+        ----------
+        field_list : list
+            Fields of the sub-tasks, as returned by subtask_fields().
+        results : list
+            Key or error of every sub-task, as returned by JiraClientManager.create_issues().
+
+        Returns
+        -------
+        subtask_keys: list
+            Keys of the created sub-tasks.
+        """
+        created = {}
+        for fields, result in zip(field_list, results):
+            if result["key"] is not None:
+                created[fields["summary"]] = result["key"]
+            else:
+                metrics.increment("jira_errors")
+                print(f"Failed to create the sub-task '{fields['summary']}' of '{self.title}'. Error: {result['error']}")
+
+        subtask_keys = list(created.values())
+        metrics.increment("jira_subtasks_created", len(subtask_keys))
+
+        if self.journal is not None and created:
+            self.journal.record_subtasks(self.title, created)
+        if subtask_keys:
+            print(f"Created {len(subtask_keys)} sub-tasks of {self.issue_key}: {', '.join(subtask_keys)}")
+
+        return subtask_keys
+
+    def create_subtasks_in_jira(self, jira_credentials: dict, parent_key: str) -> list:
+        """
+        Creates every item of the subtasks section as a Jira sub-task of the issue of the ticket.
+        All sub-tasks are sent in one bulk request (or one per 50 sub-tasks), instead of one request each.
+
+        Parameters
+        ----------
+        jira_credentials: dict
+            A dictionary containing the credentials needed to connect with Jira.
+        parent_key : str
+            Key of the issue of the ticket.
+
+        Returns
+        -------
+        subtask_keys: list
+            Keys of the created sub-tasks.
+        """
+        jira_manager = get_jira_client_manager(jira_credentials)
+        try:
+            self.journaled_subtask_keys(jira_manager)
+        except RuntimeError as e:
+            metrics.increment("jira_errors")
+            print(e)
+            return []
+
+        field_list = self.subtask_fields(jira_credentials, parent_key)
+        if not field_list:
+            return []
+
+        if self.journal is not None:
+            self.journal.record_subtask_upload(self.title, [fields["summary"] for fields in field_list])
+        results = jira_manager.create_issues(field_list, chunk_size=JIRA_BULK_LIMIT)
+
+        return self.record_subtasks(field_list, results)
+
+    def load_from_jira(self, jira_credentials: dict, issue_key: str) -> None:
+        """
+        Loads the title, priority and sections of an existing Jira issue created by this program.
+
+        Parameters
+        ----------
+        jira_credentials: dict
+            A dictionary containing the credentials needed to connect with Jira.
+        issue_key : str
+            Key of the issue, e.g. 'PROJ-123'.
+
+        Returns
+        -------
+        None
+        """
+        jira_manager = get_jira_client_manager(jira_credentials)
+        jira = jira_manager.client()
+
+        with scheduler.jira.request():
+            self.jira_issue = jira.issue(issue_key, fields="summary,description,priority")
+
+        fields = self.jira_issue.fields
+        self.issue_key = issue_key
+        self.title = fields.summary
+        self.priority = fields.priority.name if fields.priority is not None else "Medium"
+        self.loaded_body = fields.description or ""
+        self.ticket_body = self.loaded_body
+        self.sections = self.body_to_sections(self.loaded_body)
+        self.section_items = {}
+        self.document = self.build_document(self.sections)
+
+    def regenerate_sections(self, sections: list, force: bool = False) -> None:
+        """
+        Generates the selected sections of a loaded ticket again and renders the new body.
+        The other sections are kept and used as context of the prompts, so only one LLM request
+        is needed per selected section.
+
+        Parameters
+        ----------
+        sections : list
+            Names of the sections to generate again (see SECTIONS).
+        force : bool
+            If True, an issue whose description has none of the sections of this program (e.g. written by hand)
+            is generated from scratch, replacing its description. Otherwise a ValueError is raised.
+
+        Returns
+        -------
+        None
+        """
+        unknown_sections = [section for section in sections if section not in SECTIONS]
+        if unknown_sections:
+            raise ValueError(f"Unknown sections {unknown_sections}. Choose from {SECTIONS}.")
+        if not self.sections and not force:
+            raise ValueError(
+                f"The description of {self.issue_key} has none of the sections of this program and would be replaced "
+                "by a generated one. Use --force to replace it."
+            )
+
+        existing_sections = {
+            section: text
+            for section, text in (self.sections or {}).items()
+            if section not in sections
+        }
+
+        with metrics.timer("generate"):
+            self.sections = self.generate_response(existing_sections)
+
+        self.document = self.build_document(self.sections)
+        self.ticket_body = render_jira_wiki(self.document)
+
+    def update_issue_in_jira(self) -> bool:
+        """
+        Updates the description of the loaded Jira issue with a single edit request (on the client it was loaded with),
+        only if the rendered body differs from the loaded one (whitespace is ignored).
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        updated: bool
+            True if the issue was updated, False if the body did not change or the update failed.
+        """
+        if self.jira_issue is None:
+            raise RuntimeError("No Jira issue was loaded. Call load_from_jira() first.")
+
+        if self.ticket_body.split() == self.loaded_body.split():
+            print(f"The body of {self.issue_key} did not change. The issue was not updated.")
+            return False
+
+        try:
+            with metrics.timer("jira_update"), scheduler.jira.request():
+                self.jira_issue.update(fields={"description": self.ticket_body})
+            metrics.increment("jira_issues_updated")
+            self.loaded_body = self.ticket_body
+            print(f"The following ticket was successfully updated in Jira ({self.issue_key}):")
+            print(f"{self.ticket_body}")
+            return True
+        except Exception as e:
+            metrics.increment("jira_errors")
+            print(f"Failed to update Jira issue {self.issue_key}. Error: {str(e)}")
+            return False
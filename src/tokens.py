@@ -0,0 +1,173 @@
+import threading
+from model import Section
+
+# Average number of characters per token of English text for the usual LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Returns an estimate of the number of tokens of a text (about four characters per token).
+
+    Parameters
+    ----------
+    text : str
+        Prompt or response.
+
+    Returns
+    -------
+    tokens: int
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_words(text: str, max_chars: int) -> str:
+    """
+    Returns the text cut at the last word that fits into max_chars characters, marked with '...' if it was cut.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    cut = text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,.;:")
+    return f"{cut}..."
+
+
+def compact_list(formatted_text: str, token_budget: int, description_chars: int = 80) -> str:
+    """
+    Returns a condensed form of a section formatted by Ticket.dict_to_str() that fits into a token budget.
+    The Jira markup is removed and every item is reduced to its title and a truncated description.
+    If that is still too long, only the titles are kept, and items are dropped from the end as a last resort.
+
+    Parameters
+    ----------
+    formatted_text : str
+        Text of a list section, as returned by Ticket.dict_to_str().
+    token_budget : int
+        Maximum number of tokens of the condensed text.
+    description_chars : int
+        Maximum number of characters kept of the description of an item.
+
+    Returns
+    -------
+    compact_text: str
+        One line per item, separated by '; '.
+    """
+    section = Section.from_jira_text("context", formatted_text)
+    if section.items is None:
+        # Not a list: keep as many words as fit into the budget
+        return truncate_words(section.text, token_budget * CHARS_PER_TOKEN)
+
+    # Only the first subpoint is kept as the description of an item
+    items = [(title, descriptions[0] if descriptions else "") for title, descriptions in section.items]
+
+    with_descriptions = "; ".join(
+        f"{title}: {truncate_words(description, description_chars)}" if description else title
+        for title, description in items
+    )
+    if estimate_tokens(with_descriptions) <= token_budget:
+        return with_descriptions
+
+    titles = []
+    for title, _ in items:
+        if estimate_tokens("; ".join(titles + [title])) > token_budget:
+            break
+        titles.append(title)
+
+    return "; ".join(titles)
+
+
+class TokenMeter:
+    """
+    A class used to represent the estimated token spend of a run, shared by all its tickets.
+
+    Attributes
+    ----------
+    limit : int
+        Maximum number of tokens (input and output) of the run. None means no limit.
+    input_tokens : int
+        Estimated number of prompt tokens sent so far.
+    output_tokens : int
+        Estimated number of response tokens received so far.
+    calls : int
+        Number of LLM calls so far.
+
+    Methods
+    -------
+    record(input_tokens: int, output_tokens: int) -> None
+        Adds the tokens of one LLM call.
+
+    check() -> None
+        Raises a RuntimeError if the limit of the run has been reached.
+
+    stats() -> dict
+        Returns the calls and tokens spent so far.
+    """
+
+    def __init__(self, limit: int = None):
+        self.limit = limit
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, input_tokens: int, output_tokens: int) -> None:
+        """
+        Adds the tokens of one LLM call.
+
+        Parameters
+        ----------
+        input_tokens : int
+            Estimated tokens of the prompt.
+        output_tokens : int
+            Estimated tokens of the response.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def check(self) -> None:
+        """
+        Raises a RuntimeError if the limit of the run has been reached, so no new section is started.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.limit is None:
+            return
+
+        with self._lock:
+            spent = self.input_tokens + self.output_tokens
+
+        if spent >= self.limit:
+            raise RuntimeError(f"Token limit of the run reached ({spent} of {self.limit} tokens)")
+
+    def stats(self) -> dict:
+        """
+        Returns the calls and tokens spent so far.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        stats: dict
+            calls, input_tokens, output_tokens and limit of the run.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "limit": self.limit,
+            }
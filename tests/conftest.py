@@ -0,0 +1,196 @@
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# The modules of the program are imported by their names, as in the container
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import jira_client  # noqa: E402
+from backends import TemplateBackend  # noqa: E402
+from jira_client import JiraClientManager  # noqa: E402
+
+
+class FakeJiraError(Exception):
+    """
+    Error raised by FakeJira, like the JIRAError of python-jira.
+    """
+
+
+class FakeJira:
+    """
+    In-memory stand-in for the JIRA client of python-jira, with the methods used by the program.
+
+    Attributes
+    ----------
+    issues : dict
+        Raw issues by key: id, key and fields.
+    links : list
+        (type, inward key, outward key) of the created links.
+    fail_summaries : set
+        Summaries whose creation fails.
+    page_cap : int
+        Maximum number of issues returned per search page, whatever maxResults asks for.
+    requests : int
+        Number of calls made to the client.
+    """
+
+    def __init__(self, project_key: str = "TEST"):
+        self.project_key = project_key
+        self.issues = {}
+        self.links = []
+        self.fail_summaries = set()
+        self.page_cap = 1000
+        self.requests = 0
+        self.issue_types = ["Task", "Bug", "Story", "Sub-task"]
+
+    def _create(self, fields: dict) -> SimpleNamespace:
+        if fields.get("summary") in self.fail_summaries:
+            raise FakeJiraError(f"Cannot create '{fields.get('summary')}'")
+        issue_id = str(10000 + len(self.issues))
+        key = f"{self.project_key}-{len(self.issues) + 1}"
+        stored = dict(fields)
+        stored.setdefault("labels", [])
+        stored.setdefault("updated", f"2023-10-01T12:00:{len(self.issues) % 60:02d}.000+0000")
+        self.issues[key] = {"id": issue_id, "key": key, "fields": stored}
+        return SimpleNamespace(key=key, id=issue_id)
+
+    def create_issue(self, fields: dict = None, prefetch: bool = True):
+        self.requests += 1
+        return self._create(fields)
+
+    def create_issues(self, field_list: list, prefetch: bool = True) -> list:
+        self.requests += 1
+        results = []
+        for fields in field_list:
+            try:
+                results.append({"status": "Success", "issue": self._create(fields), "error": None})
+            except FakeJiraError as e:
+                results.append({"status": "Error", "issue": None, "error": str(e)})
+        return results
+
+    def search_issues(self, jql: str, startAt: int = 0, maxResults=50, fields=None):
+        self.requests += 1
+        issues = list(self.issues.values())
+
+        single = re.search(r'labels = "([^"]+)"', jql)
+        several = re.search(r"labels in \(([^)]*)\)", jql)
+        if single:
+            issues = [issue for issue in issues if single.group(1) in issue["fields"]["labels"]]
+        elif several:
+            wanted = set(re.findall(r'"([^"]+)"', several.group(1)))
+            issues = [issue for issue in issues if wanted & set(issue["fields"]["labels"])]
+
+        if maxResults is False:
+            page = issues
+        else:
+            page = issues[startAt : startAt + min(maxResults, self.page_cap)]
+
+        results = _ResultList(_issue(issue) for issue in page)
+        results.total = len(issues)
+        return results
+
+    def issue(self, key: str, fields: str = None):
+        self.requests += 1
+        issue = self.issues.get(key) or next((i for i in self.issues.values() if i["id"] == key), None)
+        if issue is None:
+            raise FakeJiraError(f"Issue Does Not Exist: {key}")
+
+        result = _issue(issue)
+
+        def update(fields: dict = None) -> None:
+            self.requests += 1
+            issue["fields"].update(fields or {})
+
+        result.update = update
+        return result
+
+    def project(self, key: str):
+        self.requests += 1
+        if key != self.project_key:
+            raise FakeJiraError(f"No project could be found with key '{key}'.")
+        return SimpleNamespace(
+            id="1", key=key, name="Test", issueTypes=[SimpleNamespace(name=name) for name in self.issue_types]
+        )
+
+    def priorities(self) -> list:
+        self.requests += 1
+        return [SimpleNamespace(name=name) for name in ["Highest", "High", "Medium", "Low", "Lowest"]]
+
+    def create_issue_link(self, type: str, inwardIssue: str, outwardIssue: str) -> None:
+        self.requests += 1
+        self.links.append((type, inwardIssue, outwardIssue))
+
+
+class RecordingBackend(TemplateBackend):
+    """
+    Template backend that records its prompts and can leave sections out of the answer to the single prompt.
+
+    Attributes
+    ----------
+    prompts : list
+        Prompts received so far.
+    drop_sections : list
+        Headers (e.g. 'SUBTASKS') left out of the answer to the prompt asking for all sections.
+    """
+
+    def __init__(self, drop_sections: list = None):
+        self.prompts = []
+        self.drop_sections = drop_sections or []
+
+    def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        response = super().generate(prompt)
+        for header in self.drop_sections:
+            response = re.sub(rf"=== {header} ===\n.*?(?=\n===|\Z)", "", response, flags=re.S)
+        return response
+
+
+class _ResultList(list):
+    total = 0
+
+
+def _issue(raw: dict) -> SimpleNamespace:
+    fields = raw["fields"]
+    priority = fields.get("priority")
+    return SimpleNamespace(
+        key=raw["key"],
+        id=raw["id"],
+        raw=raw,
+        fields=SimpleNamespace(
+            summary=fields.get("summary"),
+            description=fields.get("description"),
+            priority=SimpleNamespace(name=priority["name"]) if isinstance(priority, dict) else None,
+            labels=list(fields.get("labels", [])),
+            updated=fields.get("updated"),
+        ),
+    )
+
+
+@pytest.fixture
+def fake_jira():
+    return FakeJira()
+
+
+@pytest.fixture
+def jira_credentials(fake_jira):
+    """
+    Credentials whose shared Jira client manager uses the fake client.
+    """
+    credentials = {"server": "https://jira.test", "email_address": "a@test", "token": "t", "key": fake_jira.project_key}
+    manager = JiraClientManager(credentials)
+    manager._client = fake_jira
+    key = (credentials["server"], credentials["email_address"], credentials["key"])
+    jira_client._managers[key] = manager
+    yield credentials
+    jira_client._managers.pop(key, None)
+
+
+@pytest.fixture
+def template_options():
+    """
+    Ticket options of the offline template backend.
+    """
+    return {"backend": "template"}
@@ -0,0 +1,49 @@
+import json
+import runpy
+import sys
+
+import pytest
+
+import app
+
+
+def parse(monkeypatch, *arguments):
+    monkeypatch.setattr(sys, "argv", ["app.py", *arguments])
+    return app.parse_arguments()
+
+
+def test_subtasks_cannot_be_created_in_a_dry_run(monkeypatch):
+    with pytest.raises(SystemExit) as error:
+        parse(monkeypatch, "--title", "Add dark mode", "--dry-run", "--create-subtasks")
+    assert error.value.code == 2
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["--batch", "tickets.csv", "--create-subtasks"],
+        ["--title", "Add dark mode", "--export", "tickets.csv", "--create-subtasks"],
+    ],
+)
+def test_subtasks_are_created_with_a_batch_or_an_export(monkeypatch, arguments):
+    assert parse(monkeypatch, *arguments).create_subtasks == "Sub-task"
+
+
+@pytest.mark.parametrize("mode", [["--update", "TEST-1"], ["--serve"]])
+def test_title_cannot_be_combined_with_update_or_serve(monkeypatch, mode):
+    with pytest.raises(SystemExit) as error:
+        parse(monkeypatch, "--title", "Add dark mode", *mode)
+    assert error.value.code == 2
+
+
+def test_update_of_an_unknown_issue_exits_with_an_error(monkeypatch, tmp_path, jira_credentials, capsys):
+    credentials_file = tmp_path / "jira.json"
+    credentials_file.write_text(json.dumps(jira_credentials))
+    monkeypatch.setenv("JIRA_CREDENTIALS_FILE", str(credentials_file))
+    monkeypatch.setattr(sys, "argv", ["app.py", "--update", "TEST-99", "--backend", "template", "--no-preflight"])
+
+    with pytest.raises(SystemExit) as error:
+        runpy.run_path(app.__file__, run_name="__main__")
+
+    assert error.value.code == 1
+    assert "Failed to load Jira issue 'TEST-99'. Error: Issue Does Not Exist: TEST-99" in capsys.readouterr().out
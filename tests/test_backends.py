@@ -0,0 +1,75 @@
+import sys
+
+import pytest
+
+import backends
+from backends import BACKENDS, CommandBackend, TemplateBackend, create_backend, register_backend, LLMBackend
+
+
+def python_command(code: str) -> str:
+    return f'{sys.executable} -c "{code}"'
+
+
+def test_template_backend_answers_every_section_as_a_list():
+    backend = TemplateBackend()
+    response = backend.generate("List the independent subtasks for the ticket 'Add dark mode'")
+
+    assert response.splitlines()[0].startswith("1. Implementation: ")
+    assert "".join(backend.stream("List the independent subtasks for the ticket 'Add dark mode'")) == response
+
+
+def test_backends_are_created_from_their_specification():
+    assert isinstance(create_backend("template"), TemplateBackend)
+    backend = create_backend("command:llama-cli -m model.gguf")
+    assert backend.command == ["llama-cli", "-m", "model.gguf"]
+
+    with pytest.raises(ValueError, match="Unknown LLM backend"):
+        create_backend("unknown")
+
+
+def test_registered_backend_can_be_selected(monkeypatch):
+    class EchoBackend(LLMBackend):
+        def generate(self, prompt):
+            return prompt
+
+    # the registry of the module is restored after the test
+    monkeypatch.setattr(backends, "BACKENDS", dict(BACKENDS))
+    register_backend("echo", lambda argument, api_key: EchoBackend())
+
+    backend = create_backend("echo")
+    assert backend.generate_batch(["a", "b", "c"]) == ["a", "b", "c"]
+    assert list(backend.stream("a")) == ["a"]
+
+
+def test_command_backend_reads_the_prompt_from_stdin():
+    backend = CommandBackend(python_command("import sys; print(sys.stdin.read().upper())"))
+
+    assert backend.generate("a prompt").strip() == "A PROMPT"
+    assert "".join(backend.stream("a prompt")).strip() == "A PROMPT"
+
+
+def test_command_backend_streams_a_long_prompt_to_a_command_that_answers_first():
+    code = "import sys; print('ready', flush=True); sys.stdin.read()"
+    backend = CommandBackend(python_command(code))
+
+    assert "".join(backend.stream("x" * (1 << 20))).strip() == "ready"
+
+
+@pytest.mark.parametrize("method", ["generate", "stream"])
+def test_command_backend_reports_a_failed_command(method):
+    backend = CommandBackend(python_command("import sys; sys.stderr.write('model not found'); sys.exit(3)"))
+
+    with pytest.raises(RuntimeError, match=r"failed \(3\): model not found"):
+        "".join(getattr(backend, method)("a prompt"))
+
+
+def test_command_backend_stops_a_stream_at_its_timeout():
+    backend = CommandBackend(python_command("import time; time.sleep(30)"), timeout=0.5)
+
+    with pytest.raises(RuntimeError, match="did not finish within 0.5 seconds"):
+        "".join(backend.stream("a prompt"))
+
+
+def test_command_backend_needs_a_command():
+    with pytest.raises(ValueError):
+        CommandBackend("")
@@ -0,0 +1,130 @@
+import csv
+import json
+
+import pytest
+
+import batch
+from export import ExportSink
+
+
+def test_json_array_is_read(tmp_path):
+    path = tmp_path / "tickets.json"
+    path.write_text(json.dumps([
+        {"title": "Add dark mode to settings", "priority": "high"},
+        {"title": "Export monthly reports as PDF", "priority": "Low", "issue_type": "Task"},
+    ]))
+
+    rows = batch.read_ticket_rows(str(path))
+
+    assert rows == [
+        {"title": "Add dark mode to settings", "priority": "High", "issue_type": None},
+        {"title": "Export monthly reports as PDF", "priority": "Low", "issue_type": "Task"},
+    ]
+
+
+def test_pretty_printed_json_array_is_read(tmp_path):
+    path = tmp_path / "tickets.json"
+    path.write_text(json.dumps([{"title": "Add dark mode to settings", "priority": "High"}], indent=4))
+
+    assert [row["title"] for row in batch.read_ticket_rows(str(path))] == ["Add dark mode to settings"]
+
+
+def test_json_object_is_rejected(tmp_path):
+    path = tmp_path / "tickets.json"
+    path.write_text(json.dumps({"title": "Add dark mode to settings", "priority": "High"}))
+
+    with pytest.raises(ValueError, match="JSON array"):
+        batch.read_ticket_rows(str(path))
+
+
+def test_non_object_record_is_rejected_with_its_line_number(tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    path.write_text('{"title": "Add dark mode to settings", "priority": "High"}\n\n["Export reports", "Low"]\n')
+
+    with pytest.raises(ValueError, match="Line 3 of"):
+        batch.read_ticket_rows(str(path))
+
+
+def test_invalid_json_line_is_rejected_with_its_line_number(tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    path.write_text('{"title": "Add dark mode to settings", "priority": "High"}\n{"title": \n')
+
+    with pytest.raises(ValueError, match="Line 2 of"):
+        batch.read_ticket_rows(str(path))
+
+
+def test_invalid_rows_are_skipped(tmp_path, capsys):
+    path = tmp_path / "tickets.csv"
+    path.write_text("title,priority\nAdd dark mode to settings,High\n,High\nExport monthly reports as PDF,Urgent\n")
+
+    rows = batch.read_ticket_rows(str(path))
+
+    assert [row["title"] for row in rows] == ["Add dark mode to settings"]
+    output = capsys.readouterr().out
+    assert "Skipping line 3" in output
+    assert "Skipping line 4" in output
+
+
+def test_callback_error_is_not_reported_as_a_generation_error(template_options, capsys):
+    rows = [{"title": "Add dark mode to settings", "priority": "High"}]
+
+    def on_ticket(ticket):
+        raise OSError("No space left on device")
+
+    tickets = batch.generate_tickets(None, rows, max_workers=1, ticket_options=template_options, on_ticket=on_ticket)
+
+    output = capsys.readouterr().out
+    assert len(tickets) == 1
+    assert "Failed to write ticket 'Add dark mode to settings'. Error: No space left on device" in output
+    assert "Failed to generate" not in output
+
+
+def generated_tickets(titles, template_options):
+    rows = [{"title": title, "priority": "High"} for title in titles]
+    return batch.generate_tickets(None, rows, max_workers=1, ticket_options=template_options)
+
+
+def test_upload_reports_the_issues_that_failed(fake_jira, jira_credentials, template_options, capsys):
+    tickets = generated_tickets(["Add dark mode to settings", "Export monthly reports as PDF"], template_options)
+    fake_jira.fail_summaries.add("Add Dark Mode To Settings")
+
+    issue_keys = batch.upload_tickets_to_jira(tickets, jira_credentials, chunk_size=1)
+
+    assert issue_keys == [None, "TEST-1"]
+    assert tickets[1].issue_key == "TEST-1"
+    assert "Failed to create Jira issue 'Add Dark Mode To Settings'" in capsys.readouterr().out
+
+
+def test_upload_continues_after_a_failed_bulk_request(fake_jira, jira_credentials, template_options):
+    tickets = generated_tickets(["Add dark mode to settings", "Export monthly reports as PDF"], template_options)
+    create_issues = fake_jira.create_issues
+    calls = []
+
+    def create_issues_failing_once(field_list, prefetch=True):
+        calls.append(len(field_list))
+        if len(calls) == 1:
+            raise ConnectionError("Connection reset")
+        return create_issues(field_list, prefetch=prefetch)
+
+    fake_jira.create_issues = create_issues_failing_once
+
+    issue_keys = batch.upload_tickets_to_jira(tickets, jira_credentials, chunk_size=1)
+
+    assert calls == [1, 1]
+    assert issue_keys == [None, "TEST-1"]
+
+
+def test_export_writes_the_subtasks_of_a_ticket(tmp_path, template_options):
+    path = tmp_path / "tickets.csv"
+    path.write_text("title,priority\nAdd dark mode to settings,High\n")
+    sink = ExportSink(str(tmp_path / "export.csv"))
+    options = {**template_options, "subtask_issue_type": "Sub-task"}
+
+    issue_ids = batch.run_batch(str(path), None, None, max_workers=1, ticket_options=options, export_sink=sink)
+    sink.close()
+
+    with open(sink.path, newline="") as file:
+        exported = list(csv.DictReader(file))
+    subtasks = [row for row in exported if row["Issue Type"] == "Sub-task"]
+    assert subtasks
+    assert all(row["Parent Id"] == issue_ids[0] for row in subtasks)
@@ -0,0 +1,57 @@
+import cache
+from cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_responses_are_keyed_on_the_model_and_the_normalized_prompt(tmp_path):
+    response_cache = ResponseCache(str(tmp_path))
+    response_cache.set("bard", "Write the\n   description", "A description")
+
+    assert response_cache.get("bard", "Write the description") == "A description"
+    assert response_cache.get("other", "Write the description") is None
+    assert response_cache.stats()["hits"] == 1
+    assert response_cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_not_returned(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    response_cache = ResponseCache(str(tmp_path), ttl=60)
+    response_cache.set("bard", "prompt", "response")
+
+    clock.now += 59
+    assert response_cache.get("bard", "prompt") == "response"
+    clock.now += 2
+    assert response_cache.get("bard", "prompt") is None
+    assert response_cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    response_cache = ResponseCache(str(tmp_path), max_entries=2)
+
+    response_cache.set("bard", "first", "1")
+    clock.now += 1
+    response_cache.set("bard", "second", "2")
+    clock.now += 1
+    # reading the first entry makes the second one the least recently used
+    response_cache.get("bard", "first")
+    clock.now += 1
+    response_cache.set("bard", "third", "3")
+
+    assert response_cache.get("bard", "first") == "1"
+    assert response_cache.get("bard", "second") is None
+    assert response_cache.get("bard", "third") == "3"
+
+
+def test_entries_are_kept_between_runs(tmp_path):
+    ResponseCache(str(tmp_path)).set("bard", "prompt", "response")
+    assert ResponseCache(str(tmp_path)).get("bard", "prompt") == "response"
@@ -0,0 +1,63 @@
+import pytest
+
+import batch
+from classifier import IssueTypeClassifier, read_training_data
+
+TRAINING = [
+    ("Fix crash when saving a report", "Bug"),
+    ("Fix wrong total in the invoice", "Bug"),
+    ("Fix login error on mobile", "Bug"),
+    ("Error when exporting a report fails", "Bug"),
+    ("Add dark mode to settings", "Story"),
+    ("Add export of reports as PDF", "Story"),
+    ("Add sharing of blog posts", "Story"),
+    ("Add search to the help page", "Story"),
+    ("Update the dependencies of the build", "Task"),
+    ("Update the release documentation", "Task"),
+    ("Rotate the database credentials", "Task"),
+    ("Update the CI configuration", "Task"),
+]
+
+
+def trained_classifier():
+    titles, labels = zip(*TRAINING)
+    return IssueTypeClassifier(n_features=1 << 10).fit(list(titles), list(labels))
+
+
+def test_training_data_leaves_out_subtasks(tmp_path):
+    path = tmp_path / "issues.csv"
+    path.write_text("Summary,Issue Type\nFix crash,Bug\nWrite tests,Sub-task\nAdd search,Story\n")
+
+    assert read_training_data(str(path)) == (["Fix crash", "Add search"], ["Bug", "Story"])
+
+
+def test_titles_are_classified_in_one_batch():
+    classifier = trained_classifier()
+
+    predictions = classifier.predict(["Fix crash when opening a report", "Add dark mode to the editor", "Update the build"])
+
+    assert predictions == ["Bug", "Story", "Task"]
+    assert classifier.predict([]) == []
+    assert classifier.predict_proba(["Fix crash"]).sum() == pytest.approx(1, abs=1e-5)
+
+
+def test_saved_model_gives_the_same_predictions(tmp_path):
+    classifier = trained_classifier()
+    path = str(tmp_path / "model.npz")
+    classifier.save(path)
+
+    loaded = IssueTypeClassifier.load(path)
+
+    titles = [title for title, _ in TRAINING]
+    assert loaded.predict(titles) == classifier.predict(titles)
+
+
+def test_rows_of_a_batch_without_issue_type_are_classified():
+    rows = [
+        {"title": "Fix crash when opening a report", "priority": "High", "issue_type": None},
+        {"title": "Add dark mode to the editor", "priority": "Low", "issue_type": "Task"},
+    ]
+
+    batch.classify_rows(rows, trained_classifier())
+
+    assert [row["issue_type"] for row in rows] == ["Bug", "Task"]
@@ -0,0 +1,64 @@
+import json
+
+import batch
+from duplicates import DuplicateIndex
+from export import ExportSink
+
+
+def write_rows(tmp_path, titles):
+    path = tmp_path / "tickets.csv"
+    path.write_text("title,priority\n" + "".join(f"{title},High\n" for title in titles))
+    return str(path)
+
+
+def test_identical_rows_of_a_batch_are_uploaded_once(tmp_path, fake_jira, jira_credentials, template_options):
+    index = DuplicateIndex()
+    options = {**template_options, "duplicate_index": index, "duplicate_policy": "skip"}
+    rows = write_rows(tmp_path, ["Add dark mode to settings", "Add dark mode to settings"])
+
+    issue_keys = batch.run_batch(rows, None, jira_credentials, max_workers=2, ticket_options=options)
+
+    assert len(issue_keys) == 1
+    assert [issue["fields"]["summary"] for issue in fake_jira.issues.values()] == ["Add Dark Mode To Settings"]
+
+
+def test_identical_rows_are_exported_once(tmp_path, template_options):
+    options = {**template_options, "duplicate_index": DuplicateIndex(), "duplicate_policy": "skip"}
+    rows = write_rows(tmp_path, ["Export monthly reports as PDF", "Export monthly reports as PDF"])
+    sink = ExportSink(str(tmp_path / "export.csv"))
+
+    issue_ids = batch.run_batch(rows, None, None, max_workers=2, ticket_options=options, export_sink=sink)
+    sink.close()
+
+    assert len(issue_ids) == 1
+
+
+def test_link_policy_does_not_link_to_a_title_of_the_same_run(fake_jira, jira_credentials):
+    index = DuplicateIndex()
+    assert index.claim("Add dark mode to settings") == []
+
+    matches = index.claim("Add Dark Mode To Settings")
+
+    assert [match["key"] for match in matches] == [None]
+
+
+def test_claims_are_released_and_not_saved(tmp_path):
+    path = tmp_path / "index.json"
+    index = DuplicateIndex(str(path))
+    index.add("TEST-1", "Export monthly reports as PDF")
+    index.claim("Add dark mode to settings")
+
+    index.save()
+    assert json.loads(path.read_text())["issues"] == {"TEST-1": "Export monthly reports as PDF"}
+    assert len(index) == 1
+
+    index.release("Add dark mode to settings")
+    assert index.claim("Add dark mode to settings") == []
+
+
+def test_created_issue_replaces_the_claim_of_its_title():
+    index = DuplicateIndex()
+    index.claim("Add dark mode to settings")
+    index.add("TEST-7", "Add Dark Mode To Settings")
+
+    assert [match["key"] for match in index.find("Add dark mode to settings")] == ["TEST-7"]
@@ -0,0 +1,52 @@
+import csv
+import json
+
+import pytest
+
+import batch
+from export import ExportSink, CSV_COLUMNS
+
+
+def generated_tickets(titles, template_options, **options):
+    rows = [{"title": title, "priority": "High"} for title in titles]
+    return batch.generate_tickets(None, rows, max_workers=1, ticket_options={**template_options, **options})
+
+
+def test_csv_export_is_complete_after_close(tmp_path, template_options):
+    tickets = generated_tickets(["Add dark mode to settings", "Export monthly reports as PDF"], template_options)
+    path = tmp_path / "export.csv"
+
+    with ExportSink(str(path), buffer_rows=1) as sink:
+        issue_ids = [sink.write(ticket) for ticket in tickets]
+
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert list(rows[0]) == CSV_COLUMNS
+    assert [row["Issue Id"] for row in rows] == issue_ids == ["1", "2"]
+    assert rows[0]["Summary"] == "Add Dark Mode To Settings"
+    assert "h2. Task Scope:" in rows[0]["Description"]
+
+
+def test_json_export_spans_several_blocks_and_links_the_subtasks(tmp_path, template_options):
+    tickets = generated_tickets(
+        ["Add dark mode to settings", "Export monthly reports as PDF"], template_options, subtask_issue_type="Sub-task"
+    )
+    path = tmp_path / "export.json"
+
+    with ExportSink(str(path), project_key="PROJ", buffer_rows=1) as sink:
+        issue_ids = [sink.write(ticket) for ticket in tickets]
+
+    export = json.loads(path.read_text())
+    issues = export["projects"][0]["issues"]
+    assert export["projects"][0]["key"] == "PROJ"
+    assert [issue["externalId"] for issue in issues if issue["issueType"] != "Sub-task"] == issue_ids
+    subtask_ids = {issue["externalId"] for issue in issues if issue["issueType"] == "Sub-task"}
+    assert subtask_ids == {link["sourceId"] for link in export["links"]}
+    assert {link["destinationId"] for link in export["links"]} == set(issue_ids)
+
+
+def test_export_formats_are_checked(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported export file format"):
+        ExportSink(str(tmp_path / "export.xml"))
+    with pytest.raises(ValueError, match="key of the Jira project"):
+        ExportSink(str(tmp_path / "export.json"))
@@ -0,0 +1,71 @@
+from conftest import RecordingBackend
+from fewshot import ExampleIndex
+from model import Section, TicketDocument
+from ticket import Ticket, SECTIONS
+
+
+def make_document(title, subtask="Implementation"):
+    return TicketDocument(
+        title,
+        "High",
+        {
+            "description": Section("description", text=f"We need the {title.lower()}."),
+            "acceptance_criteria": Section.from_items("acceptance_criteria", [("Works", ["It works."])]),
+            "subtasks": Section.from_items("subtasks", [(subtask, ["Build it."])]),
+            "assumptions": Section.from_items("assumptions", [("Support", ["It is supported."])]),
+        },
+    )
+
+
+def make_index(**options):
+    index = ExampleIndex(**options)
+    for title in ["Add dark mode to settings", "Export monthly reports as PDF", "Rotate the database credentials"]:
+        index.add(make_document(title))
+    return index
+
+
+def make_ticket(index, backend):
+    ticket = Ticket(None, model=backend, backend="template", example_index=index)
+    ticket.title = "Add dark mode to the editor"
+    ticket.priority = "High"
+    return ticket
+
+
+def test_most_similar_ticket_comes_first():
+    matches = make_index().search("Add dark mode to the editor")
+
+    assert matches[0][1].title == "Add dark mode to settings"
+    assert all(score >= 0.1 for score, _ in matches)
+    assert make_index().search("Completely unrelated words") == []
+
+
+def test_ticket_of_the_same_title_is_replaced_and_kept_in_the_file(tmp_path):
+    path = str(tmp_path / "examples.jsonl")
+    index = ExampleIndex(path)
+    index.add(make_document("Add dark mode to settings"))
+    index.add(make_document("Add Dark Mode To Settings", subtask="Theme Switch"))
+
+    reloaded = ExampleIndex(path)
+
+    assert len(reloaded) == 1
+    assert reloaded.search("Add dark mode to settings")[0][1].sections["subtasks"].items[0][0] == "Theme Switch"
+
+
+def test_prompts_use_the_similar_tickets_as_examples():
+    backend = RecordingBackend()
+    make_ticket(make_index(), backend).create_ticket_body_text()
+
+    subtasks_prompt = next(prompt for prompt in backend.prompts if "independent subtasks" in prompt)
+    assert "Example for the ticket 'Add dark mode to settings':" in subtasks_prompt
+
+
+def test_sections_of_a_very_similar_ticket_are_reused_without_any_prompt():
+    backend = RecordingBackend()
+    ticket = make_ticket(make_index(reuse_threshold=0.5), backend)
+    ticket.title = "Add dark mode to the settings"
+
+    ticket.create_ticket_body_text()
+
+    assert backend.prompts == []
+    assert set(ticket.sections) == set(SECTIONS)
+    assert "Implementation" in ticket.sections["subtasks"]
@@ -0,0 +1,77 @@
+from duplicates import DuplicateIndex
+from jira_client import get_jira_client_manager
+
+
+def add_issues(fake_jira, count):
+    for number in range(count):
+        fake_jira.create_issue(fields={"summary": f"Issue number {number}", "labels": [f"label-{number}"]})
+
+
+def test_summaries_are_read_past_a_capped_page_size(fake_jira, jira_credentials):
+    add_issues(fake_jira, 25)
+    # the server returns fewer issues than asked for
+    fake_jira.page_cap = 10
+
+    summaries = list(get_jira_client_manager(jira_credentials).iter_issue_summaries(page_size=100))
+
+    assert [key for key, _, _ in summaries] == [f"TEST-{number}" for number in range(1, 26)]
+
+
+def test_duplicate_index_is_filled_from_jira(fake_jira, jira_credentials):
+    add_issues(fake_jira, 3)
+    fake_jira.page_cap = 2
+    index = DuplicateIndex()
+
+    assert index.refresh(get_jira_client_manager(jira_credentials)) == 3
+    assert len(index) == 3
+
+
+def test_issues_are_found_by_their_labels(fake_jira, jira_credentials):
+    add_issues(fake_jira, 3)
+    manager = get_jira_client_manager(jira_credentials)
+
+    assert manager.find_issue_by_label("label-1") == "TEST-2"
+    assert manager.find_issue_by_label("missing") is None
+    assert manager.find_issues_by_labels(["label-0", "label-2", "missing"]) == {"label-0": "TEST-1", "label-2": "TEST-3"}
+
+
+def test_bulk_create_reports_the_error_of_every_issue(fake_jira, jira_credentials):
+    fake_jira.fail_summaries.add("Second")
+    manager = get_jira_client_manager(jira_credentials)
+    field_list = [{"summary": summary} for summary in ["First", "Second", "Third"]]
+
+    results = manager.create_issues(field_list, chunk_size=2)
+
+    assert [result["key"] for result in results] == ["TEST-1", None, "TEST-2"]
+    assert "Cannot create 'Second'" in results[1]["error"]
+
+
+def test_failed_bulk_request_fails_its_chunk_only(fake_jira, jira_credentials):
+    create_issues = fake_jira.create_issues
+
+    def create_issues_failing_first(field_list, prefetch=True):
+        if field_list[0]["summary"] == "First":
+            raise ConnectionError("Connection reset")
+        return create_issues(field_list, prefetch=prefetch)
+
+    fake_jira.create_issues = create_issues_failing_first
+    field_list = [{"summary": summary} for summary in ["First", "Second", "Third"]]
+
+    results = get_jira_client_manager(jira_credentials).create_issues(field_list, chunk_size=2)
+
+    assert results == [
+        {"key": None, "error": "Connection reset"},
+        {"key": None, "error": "Connection reset"},
+        {"key": "TEST-1", "error": None},
+    ]
+
+
+def test_project_metadata_is_cached(fake_jira, jira_credentials):
+    manager = get_jira_client_manager(jira_credentials)
+    manager.project()
+    manager.priorities()
+    requests = fake_jira.requests
+
+    assert manager.project()["key"] == "TEST"
+    assert "High" in manager.priorities()
+    assert fake_jira.requests == requests
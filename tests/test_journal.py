@@ -0,0 +1,62 @@
+import json
+
+import batch
+from journal import Journal, ticket_label
+
+
+def write_rows(tmp_path, titles):
+    path = tmp_path / "tickets.csv"
+    path.write_text("title,priority\n" + "".join(f"{title},High\n" for title in titles))
+    return str(path)
+
+
+def test_state_is_replayed_and_a_torn_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(str(path))
+    journal.record_section("Add Dark Mode", "description", "A description")
+    journal.record_body("Add Dark Mode", "High", "h2. Description")
+    journal.record_upload("Add Dark Mode")
+    journal.close()
+    with open(path, "a") as file:
+        file.write('{"title": "Add Dark Mode", "stage": "iss')
+
+    state = Journal(str(path)).state("Add Dark Mode")
+
+    assert state["sections"] == {"description": "A description"}
+    assert state["body"] == "h2. Description"
+    assert state["priority"] == "High"
+    assert state["upload_started"] is True
+    assert state["issue_key"] is None
+
+
+def test_rerun_of_a_batch_creates_no_issue_twice(tmp_path, fake_jira, jira_credentials, template_options):
+    rows = write_rows(tmp_path, ["Add dark mode to settings", "Export monthly reports as PDF"])
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    first = batch.run_batch(rows, None, jira_credentials, ticket_options={**template_options, "journal": Journal(journal_path)})
+    requests = fake_jira.requests
+    second = batch.run_batch(rows, None, jira_credentials, ticket_options={**template_options, "journal": Journal(journal_path)})
+
+    assert second == first
+    assert len(fake_jira.issues) == 2
+    # the keys come from the journal, Jira is not asked again
+    assert fake_jira.requests == requests
+
+
+def test_interrupted_upload_is_found_by_its_label(tmp_path, fake_jira, jira_credentials, template_options):
+    rows = write_rows(tmp_path, ["Add dark mode to settings"])
+    journal_path = tmp_path / "journal.jsonl"
+    batch.run_batch(rows, None, jira_credentials, ticket_options={**template_options, "journal": Journal(str(journal_path))})
+
+    # the process died after the issue was created, before its key was journaled
+    lines = journal_path.read_text().splitlines()
+    journal_path.write_text("".join(line + "\n" for line in lines if json.loads(line)["stage"] != "issue"))
+
+    issue_keys = batch.run_batch(
+        rows, None, jira_credentials, ticket_options={**template_options, "journal": Journal(str(journal_path))}
+    )
+
+    assert issue_keys == ["TEST-1"]
+    assert len(fake_jira.issues) == 1
+    assert ticket_label("Add Dark Mode To Settings") in fake_jira.issues["TEST-1"]["fields"]["labels"]
+    assert Journal(str(journal_path)).state("Add Dark Mode To Settings")["issue_key"] == "TEST-1"
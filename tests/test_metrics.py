@@ -0,0 +1,57 @@
+import json
+
+from metrics import Metrics
+
+
+def enabled_metrics():
+    metrics = Metrics()
+    metrics.enable()
+    return metrics
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    with metrics.timer("llm_call"):
+        metrics.increment("llm_calls")
+        metrics.observe("prompt_chars", 100)
+
+    assert metrics.summary() == {"timers": [], "counters": [], "observations": [], "gauges": []}
+
+
+def test_summary_has_the_statistics_of_every_series(tmp_path):
+    metrics = enabled_metrics()
+    for value in range(1, 101):
+        metrics.observe("prompt_chars", value, section="subtasks")
+    metrics.increment("llm_calls", section="subtasks")
+    metrics.increment("llm_calls", 2, section="subtasks")
+    with metrics.timer("generate"):
+        pass
+
+    path = tmp_path / "metrics.json"
+    metrics.write_json(str(path))
+    summary = json.loads(path.read_text())
+
+    observation = summary["observations"][0]
+    assert observation["labels"] == {"section": "subtasks"}
+    assert observation["values"]["count"] == 100
+    assert observation["values"]["p50"] == 51
+    assert observation["values"]["max"] == 100
+    assert summary["counters"] == [{"name": "llm_calls", "labels": {"section": "subtasks"}, "value": 3}]
+    assert summary["timers"][0]["seconds"]["count"] == 1
+
+
+def test_prometheus_textfile(tmp_path):
+    metrics = enabled_metrics()
+    metrics.increment("jira_errors", 2)
+    metrics.gauge("rate_limit_concurrency", 4, backend="llm")
+    with metrics.timer("llm_call", section="subtasks"):
+        pass
+
+    path = tmp_path / "metrics.prom"
+    metrics.write_prometheus(str(path))
+    lines = path.read_text().splitlines()
+
+    assert "# TYPE ticket_jira_errors_total counter" in lines
+    assert "ticket_jira_errors_total 2" in lines
+    assert 'ticket_rate_limit_concurrency{backend="llm"} 4' in lines
+    assert 'ticket_llm_call_seconds_count{section="subtasks"} 1' in lines
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.bench_parser import legacy_response_to_dict, load_corpus
+from ticket import Ticket
+
+
+@pytest.fixture(scope="module")
+def ticket():
+    return Ticket(bard_api_key=None)
+
+
+@pytest.mark.parametrize("response", load_corpus())
+def test_same_result_as_the_original_parser(ticket, response):
+    assert ticket.response_to_dict(response) == legacy_response_to_dict(response)
+
+
+def test_sublists_with_alphabetic_enumerations(ticket):
+    response = "1. **Placement**\n   a. Top: above the post\n   b. Bottom: below the post\n2. Platforms\n   a. Twitter"
+
+    assert ticket.response_to_dict(response) == {
+        "Placement": ["Top: above the post", "Bottom: below the post"],
+        "Platforms": ["Twitter"],
+    }
+
+
+def test_abbreviations_are_replaced_like_the_original_parser(ticket):
+    response = "1. Scope\n   a. Formats, e.g. PDF and CSV\n   b. Limits, i.e. 100 pages\n2. Output: a file"
+
+    assert ticket.response_to_dict(response) == legacy_response_to_dict(response)
+
+
+def test_list_without_sublists(ticket):
+    assert ticket.response_to_dict("1. Fast: Loads in 1s\n2. Safe: No data loss") == {
+        "Fast": ["Loads in 1s"],
+        "Safe": ["No data loss"],
+    }
+
+
+def test_response_without_a_list(ticket):
+    assert ticket.response_to_dict("I cannot help with that.") == {}
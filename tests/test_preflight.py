@@ -0,0 +1,44 @@
+import pytest
+
+from jira_client import get_jira_client_manager
+from preflight import JiraMetadata
+
+
+def test_metadata_is_fetched_once_and_cached_in_a_file(tmp_path, fake_jira, jira_credentials):
+    path = str(tmp_path / "metadata.json")
+    manager = get_jira_client_manager(jira_credentials)
+    metadata = JiraMetadata(manager, path=path).load()
+    assert metadata["project"]["key"] == "TEST"
+    assert "Sub-task" in metadata["issue_types"]
+
+    requests = fake_jira.requests
+    assert JiraMetadata(manager, path=path).validate(priority="High", issue_type="Bug") == []
+    assert fake_jira.requests == requests
+
+
+def test_invalid_fields_are_reported(jira_credentials):
+    metadata = JiraMetadata(get_jira_client_manager(jira_credentials))
+
+    errors = metadata.validate(priority="Urgent", issue_type="Task", subtask_issue_type="Subtask")
+
+    assert len(errors) == 2
+    assert "Unknown priority 'Urgent'" in errors[0]
+    assert "Unknown issue type 'Subtask' in project TEST" in errors[1]
+
+
+def test_stale_cache_is_refreshed_before_a_field_is_rejected(tmp_path, fake_jira, jira_credentials):
+    path = str(tmp_path / "metadata.json")
+    JiraMetadata(get_jira_client_manager(jira_credentials), path=path).load()
+
+    # the issue type was added in Jira since the metadata was cached
+    fake_jira.issue_types.append("Epic")
+    metadata = JiraMetadata(get_jira_client_manager(jira_credentials), path=path)
+
+    assert metadata.validate(issue_type="Epic") == []
+
+
+def test_unknown_project_fails_the_preflight(fake_jira, jira_credentials):
+    fake_jira.project_key = "OTHER"
+
+    with pytest.raises(RuntimeError, match="Failed to read the metadata of the Jira project 'TEST'"):
+        JiraMetadata(get_jira_client_manager(jira_credentials)).load()
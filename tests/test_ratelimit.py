@@ -0,0 +1,113 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ratelimit import AdaptiveLimiter, error_status
+
+
+class ThrottledError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+
+def succeed(limiter, count=1):
+    for _ in range(count):
+        with limiter.request():
+            pass
+
+
+def throttle(limiter, status_code=429, retry_after=None):
+    with pytest.raises(ThrottledError):
+        with limiter.request():
+            raise ThrottledError(status_code, retry_after)
+
+
+def test_limit_grows_by_one_per_success_during_slow_start():
+    limiter = AdaptiveLimiter("test", initial_concurrency=2, max_concurrency=16)
+    succeed(limiter, 3)
+    assert limiter.concurrency == 5
+
+
+def test_throttling_halves_the_limit_and_ends_slow_start():
+    limiter = AdaptiveLimiter("test", initial_concurrency=8, max_concurrency=16)
+
+    throttle(limiter, 503)
+    assert limiter.concurrency == 4
+
+    # additive increase: one slot per limit's worth of successes
+    succeed(limiter, 4)
+    assert limiter.concurrency == pytest.approx(5, abs=0.1)
+
+
+def test_limit_stays_within_its_bounds():
+    limiter = AdaptiveLimiter("test", initial_concurrency=2, max_concurrency=3, min_concurrency=1)
+    succeed(limiter, 5)
+    assert limiter.concurrency == 3
+    for _ in range(5):
+        throttle(limiter)
+    assert limiter.concurrency == 1
+
+
+def test_other_errors_do_not_change_the_limit():
+    limiter = AdaptiveLimiter("test", initial_concurrency=4)
+    with pytest.raises(ValueError):
+        with limiter.request():
+            raise ValueError("bad response")
+    assert limiter.concurrency == 4
+
+
+def test_retry_after_pauses_the_requests():
+    limiter = AdaptiveLimiter("test")
+    throttle(limiter, 429, retry_after="30")
+    assert limiter.status()["paused_seconds"] > 25
+
+
+def test_limiter_that_is_not_adaptive_keeps_its_limit():
+    limiter = AdaptiveLimiter("test")
+    limiter.configure(max_concurrency=6, adaptive=False)
+    throttle(limiter, 429, retry_after="30")
+    assert limiter.concurrency == 6
+    assert limiter.status()["paused_seconds"] == 0
+
+
+def test_requests_wait_for_a_free_slot():
+    limiter = AdaptiveLimiter("test", initial_concurrency=2)
+    limiter.configure(max_concurrency=2, adaptive=False)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def work():
+        with limiter.request():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+
+
+def test_rate_spaces_the_requests():
+    limiter = AdaptiveLimiter("test", rate=50)
+    start = time.monotonic()
+    succeed(limiter, 6)
+    assert time.monotonic() - start >= 0.09
+
+
+def test_error_status_reads_the_response_of_the_error():
+    error = Exception("Too Many Requests")
+    error.response = SimpleNamespace(status_code=429, headers={"Retry-After": "12"})
+    assert error_status(error) == (429, 12.0)
+    assert error_status(ValueError("no status")) == (None, None)
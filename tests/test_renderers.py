@@ -0,0 +1,82 @@
+import pytest
+
+import renderers
+from model import Section, TicketDocument
+from renderers import render, register_renderer, render_jira_list
+
+
+def make_document():
+    return TicketDocument(
+        "Add Dark Mode",
+        "High",
+        {
+            "description": Section("description", text="Users can switch the interface to dark colours."),
+            "acceptance_criteria": Section.from_items(
+                "acceptance_criteria", [("Toggle", ["A toggle switches the theme."])]
+            ),
+            "subtasks": Section.from_items(
+                "subtasks", [("Implementation", ["Add the theme.", "Add the toggle."]), ("Tests", ["Add tests."])]
+            ),
+            "assumptions": Section("assumptions", text="Edited by hand"),
+        },
+    )
+
+
+def test_jira_list_puts_single_descriptions_on_the_title_line():
+    text = render_jira_list([("Toggle", ["A toggle."]), ("Implementation", ["Add the theme.", "Add the toggle."])])
+
+    assert text == "*1. Toggle*: A toggle.\n*2. Implementation* \n    - Add the theme.\n    - Add the toggle.\n\n"
+
+
+def test_jira_lists_are_read_back_into_the_same_items():
+    document = make_document()
+
+    for name in ["acceptance_criteria", "subtasks"]:
+        text = renderers.jira_section_text(document.sections[name])
+        assert Section.from_jira_text(name, text).items == document.sections[name].items
+
+
+def test_jira_body_contains_every_section():
+    body = render(make_document(), "jira")
+
+    assert "h2. Task Scope:" in body
+    assert "Priority: High" in body
+    assert "*2. Tests*: Add tests." in body
+    assert "Edited by hand" in body
+
+
+def test_markdown_body():
+    markdown = render(make_document(), "markdown")
+
+    assert markdown.startswith("# Add Dark Mode\n")
+    assert "1. **Implementation**\n    - Add the theme.\n    - Add the toggle." in markdown
+    assert "2. **Tests**: Add tests." in markdown
+
+
+def test_adf_body():
+    adf = render(make_document(), "adf")
+
+    assert adf["type"] == "doc"
+    lists = [node for node in adf["content"] if node["type"] == "orderedList"]
+    assert len(lists) == 2
+    assert lists[1]["content"][0]["content"][1]["type"] == "bulletList"
+    assert {"type": "paragraph", "content": [{"type": "text", "text": "Edited by hand"}]} in adf["content"]
+
+
+def test_documents_are_kept_as_json_lines(tmp_path):
+    path = str(tmp_path / "archive.jsonl")
+    TicketDocument.write_jsonl([make_document(), make_document()], path)
+
+    documents = list(TicketDocument.read_jsonl(path))
+
+    assert len(documents) == 2
+    assert render(documents[0], "markdown") == render(make_document(), "markdown")
+
+
+def test_unknown_and_registered_formats(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown output format"):
+        render(make_document(), "html")
+
+    monkeypatch.setattr(renderers, "RENDERERS", dict(renderers.RENDERERS))
+    register_renderer("title", lambda document: document.title)
+    assert render(make_document(), "title") == "Add Dark Mode"
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from retry import RetryPolicy
+
+
+def test_rejected_responses_are_retried_until_one_is_accepted():
+    policy = RetryPolicy(max_attempts=5, base_delay=0)
+    responses = iter(["", "not a list", "1. Item: description"])
+
+    result = policy.run(lambda candidate: next(responses), lambda response: response if ":" in response else None)
+
+    assert result == "1. Item: description"
+
+
+def test_errors_are_retried_and_the_last_one_is_reported():
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    calls = []
+
+    def request(candidate):
+        calls.append(candidate)
+        raise ConnectionError(f"reset {len(calls)}")
+
+    with pytest.raises(RuntimeError, match=r"after 3 attempts .*last error: reset 3"):
+        policy.run(request, lambda response: response)
+    assert calls == [0, 0, 0]
+
+
+def test_deadline_stops_the_retries():
+    policy = RetryPolicy(max_attempts=100, deadline=0.2, base_delay=0.05, max_delay=0.05)
+    start = time.monotonic()
+
+    with pytest.raises(RuntimeError):
+        policy.run(lambda candidate: "", lambda response: response)
+    assert time.monotonic() - start < 1
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=3)
+    assert all(0 <= policy.backoff(retry) <= 3 for retry in range(1, 10))
+
+
+def test_hedged_requests_use_the_first_accepted_result():
+    policy = RetryPolicy(max_attempts=4, hedge=2, base_delay=0)
+    release = threading.Event()
+
+    def request(candidate):
+        if candidate == 0:
+            # the slow candidate is abandoned
+            release.wait(1)
+            return "slow"
+        return "fast"
+
+    try:
+        assert policy.run(request, lambda response: response) == "fast"
+    finally:
+        release.set()
+
+
+def test_hedge_is_limited_by_the_caller():
+    policy = RetryPolicy(max_attempts=2, hedge=3, base_delay=0)
+    candidates = []
+
+    def request(candidate):
+        candidates.append(candidate)
+        return ""
+
+    with pytest.raises(RuntimeError, match="after 2 attempts"):
+        policy.run(request, lambda response: response, hedge=1)
+    assert candidates == [0, 0]
@@ -0,0 +1,84 @@
+import json
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import service as service_module
+from duplicates import DuplicateIndex
+from service import TicketService
+
+
+def run_job(service: TicketService, title: str) -> dict:
+    job = service.submit(title, "High")
+    assert job["finished"].wait(timeout=30)
+    return service.job_status(job["id"])
+
+
+@pytest.fixture
+def make_service(jira_credentials, template_options):
+    def make(**ticket_options) -> TicketService:
+        service = TicketService(None, jira_credentials, workers=1, ticket_options={**template_options, **ticket_options})
+        service.start()
+        return service
+
+    return make
+
+
+def test_ticket_is_created(make_service, fake_jira):
+    job_status = run_job(make_service(), "Add dark mode to settings")
+
+    assert job_status["status"] == "done"
+    assert job_status["issue_key"] in fake_jira.issues
+
+
+def test_failing_ticket_constructor_fails_the_job_and_keeps_the_worker(make_service, monkeypatch):
+    service = make_service()
+    real_ticket = service_module.Ticket
+
+    class BrokenTicket(real_ticket):
+        def __init__(self, *args, **kwargs):
+            raise ValueError("broken options")
+
+    monkeypatch.setattr(service_module, "Ticket", BrokenTicket)
+
+    job_status = run_job(service, "Add dark mode to settings")
+    assert job_status["status"] == "failed"
+    assert job_status["error"] == "broken options"
+
+    monkeypatch.setattr(service_module, "Ticket", real_ticket)
+    assert run_job(service, "Export monthly reports as PDF")["status"] == "done"
+    assert service.status()["failed"] == 1
+
+
+def test_duplicate_titles_are_skipped(make_service, fake_jira):
+    index = DuplicateIndex()
+    index.add("TEST-99", "Add Dark Mode To Settings")
+    service = make_service(duplicate_index=index, duplicate_policy="skip")
+
+    job_status = run_job(service, "Add dark mode to settings")
+
+    assert job_status["status"] == "skipped"
+    assert fake_jira.issues == {}
+    assert service.status()["skipped"] == 1
+
+
+def test_wait_is_bounded():
+    service = TicketService(None, {}, workers=1, wait_timeout=0.2)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), service_module._ServiceHandler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        # No worker is started, so the ticket stays queued
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/tickets",
+            data=json.dumps({"title": "Add dark mode to settings", "wait": True}).encode("utf-8"),
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 202
+            assert json.loads(response.read())["status"] == "queued"
+    finally:
+        server.shutdown()
+        server.server_close()
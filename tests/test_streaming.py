@@ -0,0 +1,79 @@
+import pytest
+
+from benchmarks.bench_parser import load_corpus
+from streaming import ListStreamParser
+from ticket import Ticket
+
+
+def stream(text: str, chunk_size: int = 7) -> ListStreamParser:
+    parser = ListStreamParser()
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start : start + chunk_size])
+    parser.close()
+    return parser
+
+
+@pytest.mark.parametrize("response", load_corpus())
+def test_streamed_items_match_the_full_parser(response):
+    expected = Ticket(bard_api_key=None).response_to_dict(response)
+    streamed = dict(stream(response).items)
+
+    # Every item of the final section with content was shown while streaming (a preamble ending with a colon,
+    # e.g. 'Sure! Here is the list:', is an item without description for the full parser only)
+    for title, descriptions in expected.items():
+        if any(descriptions):
+            assert streamed.get(title, streamed.get(title.split(":", 1)[0].strip())) is not None
+
+
+def test_items_are_completed_as_lines_arrive():
+    parser = ListStreamParser()
+
+    assert parser.feed("1. **Fast**: Loads in 1s\n2. Safe") == [("Fast", ["Loads in 1s"])]
+    assert parser.feed("\n   a. No data loss\n") == []
+    assert parser.close() == [("Safe", ["No data loss"])]
+
+
+def test_long_preamble_is_not_aborted():
+    preamble = "".join(f"Sure, here is line {number} of a friendly introduction.\n" for number in range(6))
+    parser = ListStreamParser()
+
+    parser.feed(preamble)
+    assert not parser.is_malformed()
+    parser.feed("1. Fast: Loads in 1s\n")
+    assert not parser.is_malformed()
+
+
+def test_response_without_a_list_is_aborted():
+    parser = ListStreamParser(abort_after_chars=200)
+    parser.feed("I am sorry, I cannot write acceptance criteria for this ticket. " * 4)
+
+    assert parser.is_malformed()
+
+
+def test_malformed_stream_is_retried_with_the_template_backend():
+    from backends import TemplateBackend
+    from retry import RetryPolicy
+
+    class RefusingOnce(TemplateBackend):
+        calls = 0
+
+        def stream(self, prompt):
+            RefusingOnce.calls += 1
+            if RefusingOnce.calls == 1:
+                yield "I cannot answer that, sorry. " * 60
+                return
+            yield from super().stream(prompt)
+
+    items = []
+    ticket = Ticket(
+        None,
+        model=RefusingOnce(),
+        retry_policy=RetryPolicy(base_delay=0),
+        on_item=lambda section, title, descriptions: items.append(title),
+    )
+    ticket.title = "Dark mode"
+
+    text = ticket.get_section_text(ticket.model, "Give independent subtasks for 'Dark mode'", "subtasks")
+
+    assert "Implementation" in text
+    assert items == ["Implementation", "Automated Tests", "Rollout"]
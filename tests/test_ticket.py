@@ -0,0 +1,79 @@
+import pytest
+
+from cache import ResponseCache
+from conftest import RecordingBackend
+from preflight import JiraMetadata
+from jira_client import get_jira_client_manager
+from ticket import Ticket, SECTIONS
+
+
+def make_ticket(model, **options):
+    ticket = Ticket(None, model=model, backend="template", **options)
+    ticket.title = "Add Dark Mode To Settings"
+    ticket.priority = "High"
+    return ticket
+
+
+def asked_sections(backend):
+    return ["four sections" in prompt for prompt in backend.prompts]
+
+
+def test_single_call_generates_all_sections_with_one_prompt():
+    backend = RecordingBackend()
+    ticket = make_ticket(backend, single_call=True)
+
+    ticket.create_ticket_body_text()
+
+    assert asked_sections(backend) == [True]
+    assert set(ticket.sections) == set(SECTIONS)
+
+
+def test_single_call_generates_a_missing_section_with_its_own_prompt():
+    backend = RecordingBackend(drop_sections=["SUBTASKS"])
+    ticket = make_ticket(backend, single_call=True)
+
+    ticket.create_ticket_body_text()
+
+    assert asked_sections(backend) == [True, False]
+    assert "independent subtasks" in backend.prompts[1]
+    assert "Automated Tests" in ticket.sections["subtasks"]
+
+
+def test_failed_single_call_falls_back_to_one_prompt_per_section():
+    class FailingSingleCall(RecordingBackend):
+        def generate(self, prompt):
+            if "four sections" in prompt:
+                self.prompts.append(prompt)
+                raise ConnectionError("connection reset")
+            return super().generate(prompt)
+
+    backend = FailingSingleCall()
+    ticket = make_ticket(backend, single_call=True)
+
+    ticket.create_ticket_body_text()
+
+    assert asked_sections(backend) == [True, False, False, False, False]
+    assert set(ticket.sections) == set(SECTIONS)
+
+
+def test_cached_responses_are_not_asked_again(tmp_path):
+    response_cache = ResponseCache(str(tmp_path))
+    make_ticket(RecordingBackend(), response_cache=response_cache).create_ticket_body_text()
+
+    backend = RecordingBackend()
+    ticket = make_ticket(backend, response_cache=response_cache)
+    ticket.create_ticket_body_text()
+
+    assert backend.prompts == []
+    assert set(ticket.sections) == set(SECTIONS)
+
+
+def test_preflight_rejects_a_ticket_before_any_prompt(fake_jira, jira_credentials):
+    backend = RecordingBackend()
+    metadata = JiraMetadata(get_jira_client_manager(jira_credentials))
+    ticket = make_ticket(backend, jira_metadata=metadata)
+    ticket.issue_type = "Epic"
+
+    with pytest.raises(ValueError, match="Unknown issue type 'Epic'"):
+        ticket.create_ticket_body_text()
+    assert backend.prompts == []